@@ -0,0 +1,55 @@
+"""
+bench_cache_payload.py  ──  파싱 결과 캐시 항목: SymPy 피클 vs 압축 JSON (serialize_parsed)
+
+    python -m benchmarks.bench_cache_payload
+
+크기는 캐시 백엔드가 저장하는 피클 바이트 수, 시간은 반복 중 최소값 (ms).
+  /parse/   : 캐시 값 → 응답용 JSON (SymPy 식 복원 없음)
+  +Expr     : 캐시 값 → parse_ode_input 과 같은 형태 (컴파일 경로)
+"""
+import json
+import pickle
+import time
+import zlib
+
+from simulator.compiler import deserialize_parsed, serialize_parsed
+from simulator.parser import parse_ode_input
+
+from .models import TMDD, pbpk_model
+
+REPEATS = 10
+
+
+def _best_ms(fn) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e3
+
+
+def _pack(parsed):
+    blob = zlib.compress(json.dumps(serialize_parsed(parsed), separators=(',', ':')).encode('utf-8'))
+    return pickle.dumps(blob, pickle.HIGHEST_PROTOCOL)
+
+
+def main():
+    print(f"{'model':>10} {'pickle B':>9} {'json B':>8} | {'unpickle':>9} {'/parse/':>8} {'+Expr':>7} | "
+          f"{'pickle set':>10} {'json set':>9}")
+    for name, text in (("TMDD", TMDD), ("PBPK-50", pbpk_model(50)), ("PBPK-150", pbpk_model(150))):
+        parsed = parse_ode_input(text)
+        old = pickle.dumps(parsed, pickle.HIGHEST_PROTOCOL)
+        new = _pack(parsed)
+
+        def view():
+            return json.loads(zlib.decompress(pickle.loads(new)))
+
+        print(f"{name:>10} {len(old):>9} {len(new):>8} | "
+              f"{_best_ms(lambda: pickle.loads(old)):>9.2f} {_best_ms(view):>8.2f} "
+              f"{_best_ms(lambda: deserialize_parsed(view())):>7.2f} | "
+              f"{_best_ms(lambda: pickle.dumps(parsed, pickle.HIGHEST_PROTOCOL)):>10.2f} {_best_ms(lambda: _pack(parsed)):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
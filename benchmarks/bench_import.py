@@ -0,0 +1,70 @@
+"""
+bench_import.py  ──  웹 워커 임포트 시간 프로파일 (단계마다 새 프로세스, python -X importtime)
+
+    python -m benchmarks.bench_import
+
+단계: django.setup() → simulator.views 임포트 → /parse/ 요청 1회 → warmup.import_heavy_modules().
+각 단계의 누적 시간과 그 시점에 로드된 무거운 패키지(SciPy·pandas), 마지막 단계에서
+누적 임포트 시간이 큰 모듈을 출력한다. /parse/ 단계까지 SciPy·pandas 가 없어야 한다.
+"""
+import json
+import os
+import subprocess
+import sys
+
+HEAVY_PACKAGES = ("sympy", "scipy", "pandas")
+TOP_MODULES = 12
+
+STEPS = (
+    ("django.setup()", ""),
+    ("import simulator.views", "import simulator.views"),
+    ("/parse/ request", """
+import simulator.views
+from django.test import RequestFactory
+req = RequestFactory().post('/parse/', json.dumps({'text': 'dA/dt = -k*A'}), content_type='application/json')
+assert json.loads(simulator.views.parse_ode_view(req).content)['status'] == 'ok'
+"""),
+    ("warm-up imports", "import simulator.warmup; simulator.warmup.import_heavy_modules()"),
+)
+
+_SCRIPT = """
+import json, os, sys, time
+t0 = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pk_simulator.settings')
+import django
+django.setup()
+{step}
+print(json.dumps({{"ms": (time.perf_counter() - t0) * 1e3,
+                  "loaded": [p for p in {packages!r} if p in sys.modules]}}))
+"""
+
+
+def _run(step: str):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                           _SCRIPT.format(step=step, packages=HEAVY_PACKAGES)],
+                          cwd=root, capture_output=True, text=True, check=True)
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    cumulative = {}
+    for line in proc.stderr.splitlines():               # "import time: self | cumulative | name"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(cum) / 1e3
+    return result, cumulative
+
+
+def main():
+    print(f"{'step':>24} {'ms':>8}  loaded")
+    for label, step in STEPS:
+        result, cumulative = _run(step)
+        print(f"{label:>24} {result['ms']:>8.0f}  {', '.join(result['loaded']) or '-'}")
+    print(f"\nslowest imports after warm-up (cumulative ms, simulator.* and top-level packages):")
+    ranked = sorted(((ms, name) for name, ms in cumulative.items()
+                     if name.startswith("simulator.") or "." not in name), reverse=True)
+    for ms, name in ranked[:TOP_MODULES]:
+        print(f"{ms:>10.0f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+bench_jacobian.py  ──  유한차분 vs 해석적 Jacobian (RHS 호출 수 · 실행 시간)
+
+    python -m benchmarks.bench_jacobian
+"""
+import time
+
+import numpy as np
+
+from simulator.compiler import CompiledModel
+from simulator.parser import parse_ode_input
+from simulator.solver import solve_ode_system
+
+from .models import TMDD, TMDD_INITIALS, TMDD_PARAMS, pbpk_model, pbpk_params
+
+
+def _run(model, params, initials, doses, t_end, method, use_jac):
+    calls = [0]
+
+    def counted_rhs(t, y, p):
+        calls[0] += 1
+        return model.rhs(t, y, p)
+
+    t0 = time.perf_counter()
+    df = solve_ode_system(
+        equations_callable=counted_rhs,
+        compartments=model.compartments,
+        parameters=model.parameters,
+        init_values=initials,
+        param_values=params,
+        t_span=[0, t_end],
+        t_eval=np.linspace(0, t_end, 200),
+        doses=doses,
+        jac=model.jac_for(method) if use_jac else None,
+        method=method,
+    )
+    return calls[0], time.perf_counter() - t0, df
+
+
+def main():
+    cases = [
+        ("TMDD", TMDD, TMDD_PARAMS, TMDD_INITIALS,
+         [dict(type="bolus", compartment="Lctot", amount=50, start_time=0, repeat_every=24, repeat_until=168)], 200),
+    ]
+    for n in (10, 50, 150):
+        cases.append((f"PBPK-{n}", pbpk_model(n), pbpk_params(n), {},
+                      [dict(type="infusion", compartment="Aven", amount=100, start_time=0, duration=1,
+                            repeat_every=12, repeat_until=48)], 72))
+
+    print(f"{'model':<10} {'method':<6} {'rhs FD':>8} {'rhs jac':>8} {'t FD [s]':>9} {'t jac [s]':>9} {'max rel diff':>13}")
+    for name, text, params, initials, doses, t_end in cases:
+        model = CompiledModel(name, parse_ode_input(text))
+        for method in ("LSODA", "BDF", "Radau"):
+            n_fd, t_fd, df_fd = _run(model, params, initials, doses, t_end, method, use_jac=False)
+            n_j, t_j, df_j = _run(model, params, initials, doses, t_end, method, use_jac=True)
+            a, b = df_fd[model.compartments].to_numpy(), df_j[model.compartments].to_numpy()
+            diff = np.max(np.abs(a - b) / (np.abs(a) + 1e-6))
+            print(f"{name:<10} {method:<6} {n_fd:>8} {n_j:>8} {t_fd:>9.3f} {t_j:>9.3f} {diff:>13.2e}")
+
+
+if __name__ == "__main__":
+    main()
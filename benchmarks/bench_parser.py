@@ -0,0 +1,33 @@
+"""
+bench_parser.py  ──  ODE 텍스트 파싱 시간 vs 모델 크기 (PBPK 조직 수)
+
+    python -m benchmarks.bench_parser
+
+구획당 시간(ms/cmt)이 모델 크기와 무관하게 거의 일정하면 선형 확장.
+"""
+import time
+
+from simulator.parser import parse_ode_input
+
+from .models import pbpk_model
+
+SIZES = (10, 25, 50, 100, 150, 300)
+REPEATS = 3
+
+
+def main():
+    parse_ode_input(pbpk_model(3))             # SymPy 내부 캐시·임포트 예열
+    print(f"{'tissues':>8} {'cmts':>6} {'lines':>6} {'ms':>9} {'ms/cmt':>8}")
+    for n in SIZES:
+        text = pbpk_model(n)
+        best = float("inf")
+        for _ in range(REPEATS):
+            t0 = time.perf_counter()
+            parsed = parse_ode_input(text)
+            best = min(best, time.perf_counter() - t0)
+        n_cmt = len(parsed["compartments"])
+        print(f"{n:>8} {n_cmt:>6} {len(text.splitlines()):>6} {best * 1e3:>9.1f} {best * 1e3 / n_cmt:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
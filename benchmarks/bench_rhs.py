@@ -0,0 +1,52 @@
+"""
+bench_rhs.py  ──  RHS 1회 호출 비용 (매번 새 배열 vs CSE 생성 코드 + 출력 버퍼)
+
+    python -m benchmarks.bench_rhs
+"""
+import timeit
+
+import numpy as np
+
+from simulator.compiler import CompiledModel
+from simulator.parser import parse_ode_input
+from simulator.solver import bind_params_into
+
+from .models import TMDD, TMDD_INITIALS, TMDD_PARAMS
+
+N_CALLS = 100_000
+
+
+def main():
+    model = CompiledModel("TMDD", parse_ode_input(TMDD))
+    p_arr = model.param_array(TMDD_PARAMS)
+    y = np.array([5.0, TMDD_INITIALS["Rtot"], 1.0])
+    rates = np.array([1.0, 0.0, 0.0])          # 활성 infusion
+    out = np.empty(y.size)
+    fun_into = bind_params_into(model.rhs_into, p_arr)
+
+    def new_array():                            # model.rhs: 호출마다 결과 배열 → 덧셈 (할당 2회)
+        return np.asarray(model.rhs(0.0, y, p_arr)) + rates
+
+    def generated_arrays():                     # 생성 코드, NumPy 스칼라 연산
+        model.rhs_into(0.0, y, p_arr, out)
+        np.add(out, rates, out=out)
+        return out
+
+    def generated_bound():                      # solver 경로: Python float 연산 + 버퍼 재사용
+        fun_into(0.0, y, out)
+        np.add(out, rates, out=out)
+        return out
+
+    reference = new_array()
+    print(model.rhs_source)
+    print(f"{'variant':<22} {'us/call':>8} {'max abs diff':>13}")
+    for name, f in (("new array", new_array),
+                    ("generated (arrays)", generated_arrays),
+                    ("generated (bound)", generated_bound)):
+        per_call = timeit.timeit(f, number=N_CALLS) / N_CALLS * 1e6
+        diff = np.max(np.abs(f() - reference))
+        print(f"{name:<22} {per_call:>8.2f} {diff:>13.2e}")
+
+
+if __name__ == "__main__":
+    main()
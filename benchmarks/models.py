@@ -0,0 +1,63 @@
+"""
+models.py  ──  벤치마크용 ODE 텍스트 모음
+"""
+
+# parser.py 의 TMDD 예제 (quasi-equilibrium)
+TMDD = """
+Kd = koff / kon
+Lc = 0.5*(Lctot - Rtot - Kd + sqrt((Lctot - Rtot - Kd)^2 + 4*Kd*Lctot))
+
+dLctotdt = -(kel + kpt)*Lc - (Rtot*kep*Lc)/(Kd+Lc) + ktp*Lt
+dRtotdt  = kin - kout*Rtot - (kep-kout)*(Rtot*Lc)/(Kd+Lc)
+dLtdt    = -ktp*Lt + kpt*Lc
+"""
+
+TMDD_PARAMS = dict(koff=0.1, kon=1.0, kel=0.2, kpt=0.1, ktp=0.05, kep=0.3, kin=1.0, kout=0.1)
+TMDD_INITIALS = dict(Lctot=0.0, Rtot=10.0, Lt=0.0)
+
+# 1-구획 경구 흡수 (선형)
+ONE_CMT_ORAL = """
+C = A1 / V
+dAgdt = -ka*Ag
+dA1dt = ka*Ag - CL/V*A1
+"""
+
+# 2-구획 경구 흡수 (선형)
+TWO_CMT_ORAL = """
+C1 = A1 / V1
+dAgdt = -ka*Ag
+dA1dt = ka*Ag - (CL/V1)*A1 - (Q/V1)*A1 + (Q/V2)*A2
+dA2dt = (Q/V1)*A1 - (Q/V2)*A2
+"""
+
+TWO_CMT_PARAMS = dict(ka=1.2, CL=3.0, V1=10.0, Q=2.0, V2=25.0)
+
+
+def pbpk_model(n_tissues: int, saturable: bool = True) -> str:
+    """
+    Blood-flow limited PBPK text with ``n_tissues`` tissue compartments.
+
+    Every tissue exchanges only with arterial/venous blood, so the Jacobian is
+    sparse (an "arrow" pattern). With ``saturable`` the first tissue carries a
+    Michaelis-Menten clearance term, which makes the system nonlinear.
+    """
+    lines = ["Cv = Aven / Vven", "Ca = Aart / Vart"]
+    inflow = []
+    for i in range(1, n_tissues + 1):
+        lines.append(f"C{i} = A{i} / V{i}")
+        elim = f" - Vmax*C{i}/(Km + C{i})" if (saturable and i == 1) else ""
+        lines.append(f"dA{i}dt = Q{i}*(Ca - C{i}/Kp{i}){elim}")
+        inflow.append(f"Q{i}*C{i}/Kp{i}")
+    qtot = " + ".join(f"Q{i}" for i in range(1, n_tissues + 1))
+    lines.append(f"dAvendt = {' + '.join(inflow)} - ({qtot})*Cv")
+    lines.append(f"dAartdt = ({qtot})*(Cv - Ca)")
+    return "\n".join(lines)
+
+
+def pbpk_params(n_tissues: int) -> dict:
+    params = dict(Vven=3.0, Vart=1.5, Vmax=50.0, Km=2.0)
+    for i in range(1, n_tissues + 1):
+        params[f"V{i}"] = 0.5 + 0.1 * i
+        params[f"Q{i}"] = 1.0 + 0.05 * i
+        params[f"Kp{i}"] = 0.5 + 0.2 * (i % 7)
+    return params
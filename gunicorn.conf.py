@@ -0,0 +1,15 @@
+"""
+gunicorn.conf.py  ──  gunicorn 이 작업 디렉터리에서 자동으로 읽는 설정 (Procfile 의 web 프로세스)
+
+post_worker_init : 워커가 앱을 불러온 뒤, 요청을 받기 전에 simulator.warmup.warm_up() 실행
+                   (SciPy/pandas 모듈 임포트 + SIMULATOR_WARM_MODELS 모델 컴파일·저장소 적재)
+"""
+
+
+def post_worker_init(worker):
+    from simulator.warmup import warm_up
+
+    report = warm_up(notify=worker.notify)
+    loaded = sum("error" not in entry for entry in report["models"])
+    worker.log.info("Warm-up: imports %.0f ms, %d/%d models, total %.0f ms",
+                    report["imports_ms"], loaded, len(report["models"]), report["total_ms"])
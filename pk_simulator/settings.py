@@ -131,6 +131,21 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 # STATICFILES_DIRS = [os.path.join(BASE_DIR, 'simulator/static'), os.path.join(BASE_DIR, 'static')]
 
+# Simulator engine
+# 피팅 그룹 병렬 계산 등에 사용할 프로세스 풀 크기 (1 이면 풀 없이 순차 실행)
+SIMULATOR_WORKERS = int(os.environ.get('SIMULATOR_WORKERS', os.cpu_count() or 1))
+# 비동기 피팅 작업(/fit_jobs/)을 실행할 스레드 수 (웹 워커 프로세스당)
+SIMULATOR_JOB_WORKERS = int(os.environ.get('SIMULATOR_JOB_WORKERS', 2))
+# 실행 중 작업의 진행 보고가 이 시간(초) 이상 끊기면 실패로 처리 (워커 재시작 등)
+SIMULATOR_JOB_STALE_SECONDS = int(os.environ.get('SIMULATOR_JOB_STALE_SECONDS', 600))
+# 프로세스당 보관할 피팅 결과 수 (같은 요청은 즉시 반환, 비슷한 요청은 이전 해에서 시작)
+SIMULATOR_FIT_CACHE_SIZE = int(os.environ.get('SIMULATOR_FIT_CACHE_SIZE', 128))
+# 컴파일 모델 디스크 저장소 (워커·재시작 간 공유, 빈 값이면 사용 안 함) 와 최대 크기 (바이트)
+SIMULATOR_MODEL_STORE_DIR = os.environ.get('SIMULATOR_MODEL_STORE_DIR', os.path.join(BASE_DIR, 'model_store'))
+SIMULATOR_MODEL_STORE_MAX_BYTES = int(os.environ.get('SIMULATOR_MODEL_STORE_MAX_BYTES', 256 * 1024 * 1024))
+# 워커 예열 때 미리 컴파일할 모델 파일 (경로·glob 패턴, os.pathsep 구분, 파일 하나 = ODE 텍스트 하나)
+SIMULATOR_WARM_MODELS = [p for p in os.environ.get('SIMULATOR_WARM_MODELS', '').split(os.pathsep) if p]
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,653 @@
+"""
+compiler.py  ──  파싱 결과 → 즉시 호출 가능한 수치 모델 (프로세스 전역 캐시)
+───────────────────────────────────────────────
+  get_parsed_model(text)   : Django 캐시를 거친 parse_ode_input 결과
+  get_parsed_payload(text) : 같은 결과의 JSON 형태 (SymPy 식 없이, /parse/ 응답용)
+  get_compiled_model(text) : CompiledModel (RHS·Jacobian·파생 변수 평가기·인덱스 맵)
+                             레지스트리 → 디스크 저장소(model_store) → 파싱·컴파일 순
+  registry_stats()         : 레지스트리 hit/miss 카운터
+  parse_cache_stats()      : Django 캐시(파싱 결과) hit/miss 카운터
+
+모델 키는 원문이 아니라 parser.model_fingerprint (정규화된 행) 로 만들어, 공백·행 순서·
+^/** 만 다른 텍스트는 같은 파싱·컴파일 결과를 공유한다.
+CompiledModel 은 프로세스 메모리에만 존재하며 LRU 로 관리된다.
+lambdify 코드 생성과 SymPy 식 복원은 모델당 한 번만 일어난다.
+Django 캐시에는 SymPy 피클 대신 zlib 압축 JSON (필드 + 식 트리, serialize_parsed) 을 저장한다.
+"""
+import inspect
+import json
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import sympy
+from sympy import Symbol, cse, numbered_symbols, symbols, lambdify, parse_expr, srepr
+from sympy.printing.numpy import NumPyPrinter
+from django.core.cache import cache
+
+from . import model_store
+from .parser import model_fingerprint, parse_ode_input, _BUILTIN
+
+CACHE_TIMEOUT = 3600        # Django 캐시 (파싱 결과) 유지 시간 [s]
+REGISTRY_SIZE = 64          # 프로세스당 보관할 컴파일 모델 수
+SPARSE_JAC_MIN_SIZE = 30    # 이 크기 이상 & 밀도 이하이면 BDF/Radau 에 희소 Jacobian 전달
+SPARSE_JAC_MAX_DENSITY = 0.2
+
+_SYMPY_NAMESPACE = {"__builtins__": {}, **vars(sympy)}
+_PARSED_FIELDS = ("compartments", "parameters", "derived_expressions", "processed_ode")
+
+
+# ───────────────────────────────────────────────
+# 1. 식 직렬화 (캐시·디스크 저장소 공용, SymPy 피클 없음)
+# ───────────────────────────────────────────────
+def encode_expr(expr):
+    """
+    SymPy 식 → JSON 트리. 심볼은 이름 문자열, 정수는 int, 그 밖의 원자(Float·Rational·pi 등)와
+    최상위 sympy 이름으로 찾을 수 없는 노드는 ["#", srepr], 나머지는 [클래스 이름, *인자].
+    """
+    if expr.is_Symbol:
+        return expr.name
+    if expr.is_Integer:
+        return int(expr)
+    if not expr.args or _SYMPY_NAMESPACE.get(type(expr).__name__) is not type(expr):
+        return ["#", srepr(expr)]
+    return [type(expr).__name__, *(encode_expr(a) for a in expr.args)]
+
+def decode_expr(node, symtbl: Dict[str, Any]):
+    """
+    encode_expr 의 역. 저장된 인자는 이미 정규형이므로 evaluate=False 로 노드만
+    다시 만든다 (재정렬·재평가 없음). ``symtbl`` 은 같은 모델의 식끼리 심볼 객체를 공유.
+    """
+    if isinstance(node, str):
+        sym = symtbl.get(node)
+        if sym is None:
+            sym = symtbl[node] = Symbol(node)
+        return sym
+    if isinstance(node, int):
+        return sympy.Integer(node)
+    head = node[0]
+    if head == "#":
+        return eval(node[1], _SYMPY_NAMESPACE)
+    cls = _SYMPY_NAMESPACE[head]
+    args = [decode_expr(a, symtbl) for a in node[1:]]
+    try:
+        return cls(*args, evaluate=False)
+    except TypeError:
+        return cls(*args)
+
+def serialize_parsed(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """parse_ode_input 결과 → JSON 형태 (equations 는 표시용 문자열, expressions 는 식 트리)"""
+    payload = {k: parsed[k] for k in _PARSED_FIELDS}
+    # 표시용 문자열은 processed_ode 의 "d{comp}dt = {expr}" 행을 재사용 (str() 재출력 비용 회피)
+    payload["equations"] = {}
+    for line in parsed["processed_ode"].splitlines():
+        lhs, rhs = line.split(" = ", 1)
+        payload["equations"][lhs[1:-2]] = rhs
+    payload["expressions"] = {c: encode_expr(e) for c, e in parsed["equations"].items()}
+    return payload
+
+def deserialize_parsed(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """serialize_parsed 의 역: parse_ode_input 과 같은 형태 (equations = SymPy 식)"""
+    symtbl: Dict[str, Any] = {}
+    parsed = {k: payload[k] for k in _PARSED_FIELDS}
+    parsed["equations"] = {c: decode_expr(node, symtbl) for c, node in payload["expressions"].items()}
+    return parsed
+
+
+# ───────────────────────────────────────────────
+# 1-2. 캐시 키 & 파싱 결과
+# ───────────────────────────────────────────────
+def _hit_rate(hits: int, misses: int):
+    return hits / (hits + misses) if hits + misses else None
+
+def model_key(ode_text: str) -> str:
+    return 'parsed_ode_v3_' + model_fingerprint(ode_text)
+
+_parse_lock = threading.Lock()
+_parse_counts = {"hits": 0, "misses": 0}
+
+def _parsed_entry(ode_text: str):
+    """
+    Django 캐시의 직렬화된 파싱 결과 (zlib 압축 JSON) → (payload, None).
+    없으면 파싱 후 저장하고 (payload, 방금 만든 parse_ode_input 결과) 를 돌려준다.
+    """
+    cache_key = model_key(ode_text)
+    blob = cache.get(cache_key)
+    payload = None
+    if blob is not None:
+        try:
+            payload = json.loads(zlib.decompress(blob))
+        except (TypeError, ValueError, zlib.error):
+            payload = None                  # 다른 형식의 값 → 다시 파싱해 덮어씀
+    with _parse_lock:
+        _parse_counts["misses" if payload is None else "hits"] += 1
+    if payload is not None:
+        return payload, None
+    parsed = parse_ode_input(ode_text)
+    payload = serialize_parsed(parsed)
+    cache.set(cache_key, zlib.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8')),
+              timeout=CACHE_TIMEOUT)
+    return payload, parsed
+
+def get_parsed_payload(ode_text: str) -> Dict[str, Any]:
+    """JSON 형태의 파싱 결과 (/parse/ 응답용, SymPy 식을 만들지 않음)"""
+    return _parsed_entry(ode_text)[0]
+
+def get_parsed_model(ode_text: str) -> Dict[str, Any]:
+    """Django 캐시에서 파싱 결과를 가져오고, 없으면 파싱 후 저장 (equations = SymPy 식)"""
+    payload, parsed = _parsed_entry(ode_text)
+    return parsed if parsed is not None else deserialize_parsed(payload)
+
+def parse_cache_stats() -> Dict[str, Any]:
+    with _parse_lock:
+        return {**_parse_counts, "hit_rate": _hit_rate(_parse_counts["hits"], _parse_counts["misses"])}
+
+
+# ───────────────────────────────────────────────
+# 2. 코드 생성 (CSE + 출력 버퍼)
+# ───────────────────────────────────────────────
+def _as_tuple(syms) -> tuple:
+    return tuple(syms) if isinstance(syms, (list, tuple)) else (syms,)
+
+def generate_into_source(name: str, exprs, t_sym, y_args, p_args) -> str:
+    """
+    Python source of ``name(t, y, p, out)`` that evaluates ``exprs`` into
+    ``out[i]`` after common-subexpression elimination across all of them.
+
+    Symbols are renamed to ``_t`` / ``_y{i}`` / ``_p{i}`` so user names cannot
+    clash with Python keywords or the ``numpy`` module name. ``y`` and ``p``
+    are unpacked along their first axis, so the same function serves a single
+    state vector (n,) and stacked states (n, B) with ``out`` of matching shape.
+    """
+    rename = {t_sym: Symbol('_t')}
+    rename.update({s: Symbol(f'_y{i}') for i, s in enumerate(y_args)})
+    rename.update({s: Symbol(f'_p{i}') for i, s in enumerate(p_args)})
+    replacements, reduced = cse([e.xreplace(rename) for e in exprs], symbols=numbered_symbols('_x'))
+
+    printer = NumPyPrinter({'fully_qualified_modules': True, 'inline': True})
+    lines = [f"def {name}(_t, y, p, out):"]
+    if y_args:
+        lines.append(f"    [{', '.join(f'_y{i}' for i in range(len(y_args)))}] = y")
+    if p_args:
+        lines.append(f"    [{', '.join(f'_p{i}' for i in range(len(p_args)))}] = p")
+    for sym, expr in replacements:
+        lines.append(f"    {sym} = {printer.doprint(expr)}")
+    for i, expr in enumerate(reduced):
+        lines.append(f"    out[{i}] = {printer.doprint(expr)}")
+    lines.append("    return out")
+    return "\n".join(lines) + "\n"
+
+def compile_source(name: str, source: str) -> Callable:
+    namespace = {'numpy': np}
+    exec(compile(source, f"<generated {name}>", "exec"), namespace)
+    return namespace[name]
+
+_lambdify_namespace: Dict[str, Any] = {}
+
+def compile_lambdified(name: str, source: str) -> Callable:
+    """lambdify(..., modules='numpy') 가 만든 소스를 같은 네임스페이스에서 다시 컴파일"""
+    if not _lambdify_namespace:
+        _lambdify_namespace.update(lambdify((), 0, modules='numpy').__globals__)
+    namespace = dict(_lambdify_namespace)
+    exec(compile(source, f"<generated {name}>", "exec"), namespace)
+    return namespace['_lambdifygenerated']
+
+
+# ───────────────────────────────────────────────
+# 3. 컴파일된 모델
+# ───────────────────────────────────────────────
+
+class CompiledModel:
+    """
+    A parsed ODE model compiled into numerical callables.
+
+    Attributes
+    ----------
+    compartments, parameters : list
+        State and input-parameter names (order defines array layout).
+    comp_index, param_index : dict
+        Name → position in the state / parameter arrays.
+    rhs : Callable
+        f(t, y_arr, p_arr) -> dy/dt, ready to pass to solve_ode_system.
+    rhs_into : Callable
+        f(t, y_arr, p_arr, out) writing dy/dt into ``out`` (CSE-optimized,
+        no intermediate list); ``rhs_source`` holds the generated code.
+    jac : Callable
+        Analytic Jacobian J(t, y_arr, p_arr) -> (n, n) ndarray; the non-zero
+        entries come from the lambdified ``jac_source``.
+    jac_sparsity : ndarray
+        Boolean (n, n) structural non-zero pattern of the Jacobian.
+    is_linear : bool
+        True for linear time-invariant systems dy/dt = A(p) y + b(p).
+    derived : dict
+        Derived-variable name → g(t, y_rows, p_arr) evaluator; evaluate_derived
+        computes all of them at once with the CSE'd ``derived_source``.
+    derived_errors : dict
+        Derived-variable name → message for expressions that did not compile.
+
+    ``to_payload`` / ``from_payload`` convert the model to and from a JSON-ready
+    dict (generated sources, index maps and ``encode_expr`` trees) for the
+    on-disk model store.
+    """
+
+    def __init__(self, key: str, parsed: Dict[str, Any]):
+        self.key = key
+        self._init_layout(parsed)
+        self._equations = parsed["equations"]
+
+        rhs_exprs = self._rhs_exprs
+        self.rhs_source = generate_into_source('rhs_into', rhs_exprs, self._t_sym, self._y_args, self._p_args)
+        self._compile_jacobian(rhs_exprs)
+        self._compile_derived()
+        self._bind()
+
+    def _init_layout(self, parsed: Dict[str, Any]) -> None:
+        self.compartments: List[str] = list(parsed["compartments"])
+        self.parameters: List[str] = list(parsed["parameters"])
+        self.derived_expressions: Dict[str, str] = dict(parsed.get("derived_expressions", {}))
+        self.processed_ode: str = parsed.get("processed_ode", "")
+        self.comp_index = {c: i for i, c in enumerate(self.compartments)}
+        self.param_index = {p: i for i, p in enumerate(self.parameters)}
+
+        self._t_sym = symbols('t')
+        self._y_args = _as_tuple(symbols(self.compartments))
+        self._p_args = _as_tuple(symbols(self.parameters))
+        self._stored: Dict[str, Any] = {}
+        self._symtbl: Dict[str, Any] = {}
+        self._equations = self._jac_exprs = self._derived_symbolic = None
+
+    def _bind(self) -> None:
+        """생성된 소스 → 호출 가능한 함수 (파생 변수별 평가기는 처음 쓸 때 lambdify)"""
+        self.rhs_into: Callable = compile_source('rhs_into', self.rhs_source)
+        self._jac_values: Callable = compile_lambdified('jac_values', self.jac_source)
+        self._derived_into = compile_source('derived_into', self.derived_source) if self.derived_source else None
+        self._derived_funcs: Dict[str, Callable] = {}
+        self.derived: Dict[str, Callable] = {name: self._derived_evaluator(name) for name in self.derived_names}
+        self._sensitivities: Dict[tuple, "SensitivityModel"] = {}
+
+    # ── 직렬화 (model_store) ──
+    def to_payload(self) -> Dict[str, Any]:
+        """JSON 으로 저장할 수 있는 형태: 생성 소스 + 인덱스 + 식 트리 (encode_expr, SymPy 피클 없음)"""
+        return {
+            "compartments": self.compartments,
+            "parameters": self.parameters,
+            "derived_expressions": self.derived_expressions,
+            "processed_ode": self.processed_ode,
+            "expressions": {c: encode_expr(e) for c, e in self.equations.items()},
+            "is_linear": bool(self.is_linear),
+            "rhs_source": self.rhs_source,
+            "jac_source": self.jac_source,
+            "jac_rows": self._jac_rows.tolist(),
+            "jac_cols": self._jac_cols.tolist(),
+            "jac_entries": [encode_expr(d) for d in self._jac_entries],
+            "derived_names": self.derived_names,
+            "derived_source": self.derived_source,
+            "derived_exprs": {name: encode_expr(e) for name, e in self._derived_exprs.items()},
+            "derived_errors": self.derived_errors,
+        }
+
+    @classmethod
+    def from_payload(cls, key: str, payload: Dict[str, Any]) -> "CompiledModel":
+        """
+        Rebuild a model from ``to_payload`` output without parsing or code
+        generation: only the generated sources are exec'd. Symbolic
+        expressions (needed for sensitivities and derived gradients) are
+        decoded from their ``encode_expr`` trees the first time they are used.
+        """
+        self = cls.__new__(cls)
+        self.key = key
+        self._init_layout(payload)
+        self._stored = payload
+        self.is_linear = bool(payload["is_linear"])
+        self.rhs_source = payload["rhs_source"]
+        self.jac_source = payload["jac_source"]
+        self._jac_rows = np.array(payload["jac_rows"], dtype=int)
+        self._jac_cols = np.array(payload["jac_cols"], dtype=int)
+        n = len(self.compartments)
+        self.jac_sparsity = np.zeros((n, n), dtype=bool)
+        self.jac_sparsity[self._jac_rows, self._jac_cols] = True
+        self.derived_names = list(payload["derived_names"])
+        self.derived_source = payload["derived_source"]
+        self.derived_errors = dict(payload["derived_errors"])
+        self._bind()
+        return self
+
+    @property
+    def equations(self) -> Dict[str, Any]:
+        if self._equations is None:
+            self._equations = {c: decode_expr(node, self._symtbl) for c, node in self._stored["expressions"].items()}
+        return self._equations
+
+    @property
+    def _rhs_exprs(self) -> list:
+        return [self.equations[c] for c in self.compartments]
+
+    @property
+    def _jac_entries(self) -> list:
+        if self._jac_exprs is None:
+            self._jac_exprs = [decode_expr(node, self._symtbl) for node in self._stored["jac_entries"]]
+        return self._jac_exprs
+
+    @property
+    def _derived_exprs(self) -> Dict[str, Any]:
+        if self._derived_symbolic is None:
+            self._derived_symbolic = {name: decode_expr(node, self._symtbl)
+                                      for name, node in self._stored["derived_exprs"].items()}
+        return self._derived_symbolic
+
+    def rhs(self, t, y_arr, p_arr) -> np.ndarray:
+        """f(t, y_arr, p_arr) -> dy/dt (새 배열에 rhs_into)"""
+        return self.rhs_into(t, y_arr, p_arr, np.empty(np.shape(y_arr)))
+
+    def _compile_jacobian(self, rhs_exprs) -> None:
+        """∂f_i/∂y_j 를 기호 미분, 구조적 0 이 아닌 항만 lambdify (소스는 jac_source 로 보관)"""
+        n = len(self.compartments)
+        rows, cols, entries = [], [], []
+        for i, expr in enumerate(rhs_exprs):
+            for j, y in enumerate(self._y_args):
+                d = expr.diff(y)
+                if d != 0:
+                    rows.append(i)
+                    cols.append(j)
+                    entries.append(d)
+        self._jac_exprs = entries
+        self._jac_rows = np.array(rows, dtype=int)
+        self._jac_cols = np.array(cols, dtype=int)
+        self.jac_sparsity = np.zeros((n, n), dtype=bool)
+        self.jac_sparsity[self._jac_rows, self._jac_cols] = True
+        self.jac_source = inspect.getsource(
+            lambdify((self._t_sym, self._y_args, self._p_args), entries, modules='numpy', cse=True))
+
+        # Jacobian 이 상태·시간에 무관하고 상수항에 t 가 없으면 LTI: A = J, b = f(0)
+        state_syms = set(self._y_args) | {self._t_sym}
+        zero = {y: 0 for y in self._y_args}
+        self.is_linear = n > 0 and \
+            all(not (d.free_symbols & state_syms) for d in entries) and \
+            all(self._t_sym not in expr.xreplace(zero).free_symbols for expr in rhs_exprs)
+
+    def jac(self, t, y_arr, p_arr) -> np.ndarray:
+        n = len(self.compartments)
+        out = np.zeros((n, n))
+        out[self._jac_rows, self._jac_cols] = self._jac_values(t, y_arr, p_arr)
+        return out
+
+    def linear_system(self, p_arr):
+        """(A, b) of an LTI model evaluated at ``p_arr`` (valid only if ``is_linear``)."""
+        y0 = np.zeros(len(self.compartments))
+        A = self.jac(0.0, y0, p_arr)
+        b = np.asarray(self.rhs(0.0, y0, p_arr), dtype=float)
+        return A, b
+
+    def jac_sparse(self, t, y_arr, p_arr):
+        from scipy.sparse import csc_matrix
+        n = len(self.compartments)
+        vals = np.asarray(self._jac_values(t, y_arr, p_arr), dtype=float)
+        return csc_matrix((np.broadcast_to(vals, self._jac_rows.shape), (self._jac_rows, self._jac_cols)), shape=(n, n))
+
+    def jac_for(self, method: str) -> Callable:
+        """
+        Jacobian callable suited to ``method``.
+
+        BDF/Radau accept sparse Jacobians, which pay off for large, sparsely
+        coupled (PBPK-style) systems; LSODA always needs a dense array.
+        """
+        n = len(self.compartments)
+        if method in ('BDF', 'Radau') and n >= SPARSE_JAC_MIN_SIZE and \
+                self.jac_sparsity.sum() <= SPARSE_JAC_MAX_DENSITY * n * n:
+            return self.jac_sparse
+        return self.jac
+
+    def _compile_derived(self) -> None:
+        """
+        파생 표현식을 상태·파라미터 심볼만 남도록 치환한 뒤, 전체를 CSE 로 묶은
+        단일 함수 (derived_into) 소스를 생성. 변수별 평가기 (실패 원인 확인용) 는
+        처음 쓸 때 lambdify. 컴파일할 수 없는 식은 derived_errors 에 이름 → 메시지로 기록.
+        """
+        symtbl = {str(s): s for s in (*self._y_args, *self._p_args, self._t_sym)}
+        symtbl.update({name: symbols(name) for name in self.derived_expressions})
+        symtbl.update(_BUILTIN)
+        self.derived_errors: Dict[str, str] = {}
+
+        exprs = {}
+        for name, expr_str in self.derived_expressions.items():
+            try:
+                exprs[symbols(name)] = parse_expr(expr_str, local_dict=symtbl)
+            except Exception as e:
+                self.derived_errors[name] = f"Could not compile derived expression '{name} = {expr_str}': {e}"
+
+        known = {*self._y_args, *self._p_args, self._t_sym}
+        args = (self._t_sym, self._y_args, self._p_args)
+        self._derived_symbolic = {}
+        for sym, expr in exprs.items():
+            name = str(sym)
+            # 다른 파생 변수 참조가 없어질 때까지 치환
+            for _ in range(len(exprs)):
+                if not expr.free_symbols & exprs.keys():
+                    break
+                expr = expr.xreplace(exprs)
+            unknown = expr.free_symbols - known
+            if unknown:
+                what = "circular reference to" if unknown & exprs.keys() else "unknown symbol(s)"
+                self.derived_errors[name] = f"Could not compile derived expression '{name} = " \
+                    f"{self.derived_expressions[name]}': {what} {', '.join(sorted(map(str, unknown)))}"
+                continue
+            self._derived_symbolic[name] = expr
+
+        # 모든 파생 변수를 한 번에 (공통 부분식 공유) 계산하는 함수
+        self.derived_names: List[str] = list(self._derived_symbolic)
+        self.derived_source = generate_into_source(
+            'derived_into', [self._derived_symbolic[n] for n in self.derived_names], *args) if self.derived_names else None
+
+    def _derived_evaluator(self, name: str) -> Callable:
+        """g(t, y_rows, p_arr) for one derived variable, lambdified on first call"""
+        def evaluate(t, y_rows, p_arr):
+            func = self._derived_funcs.get(name)
+            if func is None:
+                func = self._derived_funcs[name] = lambdify(
+                    (self._t_sym, self._y_args, self._p_args), self._derived_exprs[name], modules='numpy')
+            return func(t, y_rows, p_arr)
+        return evaluate
+
+    def sensitivity(self, names) -> "SensitivityModel":
+        """Forward sensitivity system w.r.t. the parameters ``names`` (compiled once per name tuple)."""
+        key = tuple(names)
+        sens = self._sensitivities.get(key)
+        if sens is None:
+            sens = self._sensitivities[key] = SensitivityModel(self, key)
+        return sens
+
+    def param_array(self, param_values: Dict[str, float]) -> np.ndarray:
+        return np.array([param_values.get(p, 0) for p in self.parameters], dtype=float)
+
+    def evaluate_derived(self, t: np.ndarray, y_rows: np.ndarray, p_arr: np.ndarray,
+                         names=None, errors: Dict[str, str] = None) -> Dict[str, np.ndarray]:
+        """
+        Evaluate the derived variables on a simulated trajectory in one pass of
+        the generated ``derived_into`` (only ``names`` are returned if given).
+
+        ``y_rows`` has shape (n_compartments, *shape), usually (n, len(t)).
+        Scalar results (derived quantities that depend only on parameters) are
+        broadcast to ``shape``. If the single pass raises, variables are
+        evaluated one by one and the failing ones are left out; their messages
+        (and those of variables that failed to compile) go into ``errors``.
+        """
+        wanted = self.derived_names if names is None else [n for n in names if n in self.derived]
+        if errors is not None:
+            errors.update({n: msg for n, msg in self.derived_errors.items() if names is None or n in names})
+        if not wanted:
+            return {}
+
+        shape = np.shape(y_rows)[1:]
+        buf = np.empty((len(self.derived_names),) + shape)
+        try:
+            self._derived_into(t, y_rows, p_arr, buf)
+            return {name: buf[i] for i, name in enumerate(self.derived_names) if name in wanted}
+        except Exception:
+            pass  # 어떤 식이 실패했는지 변수별로 확인
+
+        out = {}
+        for name in wanted:
+            try:
+                out[name] = np.broadcast_to(np.asarray(self.derived[name](t, y_rows, p_arr), dtype=float), shape)
+            except Exception as e:
+                if errors is not None:
+                    errors[name] = f"Could not evaluate derived expression '{name} = {self.derived_expressions[name]}': {e}"
+        return out
+
+
+# ───────────────────────────────────────────────
+# 4. 전진 민감도 (forward sensitivity) 시스템
+# ───────────────────────────────────────────────
+class SensitivityModel:
+    """
+    States augmented with their sensitivities S = ∂y/∂θ for θ = ``names``:
+    z = [y, S[:, 0], ..., S[:, q-1]] with dS_k/dt = J S_k + ∂f/∂θ_k, S(t0) = 0.
+
+    Doses add parameter-independent amounts/rates, so S is continuous across
+    dose events and the augmented system reuses the model's dose timeline
+    (padded with zeros). Names that are not model parameters get S ≡ 0.
+
+    Attributes
+    ----------
+    names : tuple
+        Parameters, in sensitivity-column order.
+    rhs_into : Callable
+        Generated f_aug(t, z, p_arr, out) (CSE across states and sensitivities).
+    """
+
+    def __init__(self, model: CompiledModel, names):
+        self.model = model
+        self.names = tuple(names)
+        n, q = len(model.compartments), len(self.names)
+        self.n, self.q = n, q
+
+        self._s_args = tuple(symbols(f'_s{i}_{k}') for k in range(q) for i in range(n))
+        S = [[self._s_args[k * n + i] for i in range(n)] for k in range(q)]
+        J = [[0] * n for _ in range(n)]
+        for r, c, d in zip(model._jac_rows, model._jac_cols, model._jac_entries):
+            J[r][c] = d
+        theta = [model._p_args[model.param_index[name]] if name in model.param_index else None for name in self.names]
+
+        exprs = list(model._rhs_exprs)
+        for k in range(q):
+            for i in range(n):
+                d_theta = model._rhs_exprs[i].diff(theta[k]) if theta[k] is not None else 0
+                exprs.append(sum((J[i][j] * S[k][j] for j in range(n) if J[i][j] != 0), d_theta))
+        self._z_args = model._y_args + self._s_args
+        self.rhs_source = generate_into_source('sens_rhs_into', exprs, model._t_sym, self._z_args, model._p_args)
+        self.rhs_into: Callable = compile_source('sens_rhs_into', self.rhs_source)
+        self._theta = theta
+        self._derived_grad: Dict[str, Callable] = {}
+
+    def jac(self, t, z, p_arr) -> np.ndarray:
+        """
+        Block-diagonal approximation kron(I, J(y)) of the augmented Jacobian
+        (the ∂(J S)/∂y coupling is dropped, as in staggered sensitivity solvers);
+        only Newton convergence uses it, not the solution.
+        """
+        J = self.model.jac(t, z[:self.n], p_arr)
+        return np.kron(np.eye(self.q + 1), J)
+
+    def linear_system(self, p_arr):
+        """(A_aug, b_aug) for an LTI model; the augmented system is then LTI too."""
+        m = self.n * (self.q + 1)
+        b = self.rhs_into(0.0, np.zeros(m), p_arr, np.empty(m)).copy()
+        A = np.empty((m, m))
+        for j in range(m):
+            e = np.zeros(m)
+            e[j] = 1.0
+            A[:, j] = self.rhs_into(0.0, e, p_arr, np.empty(m)) - b
+        return A, b
+
+    def split(self, z_rows: np.ndarray):
+        """(n·(q+1), T) → y (n, T), S (n, q, T)"""
+        n, q = self.n, self.q
+        return z_rows[:n], z_rows[n:].reshape(q, n, -1).transpose(1, 0, 2)
+
+    def derived_gradient(self, name: str, t, z_rows: np.ndarray, p_arr) -> np.ndarray:
+        """∂g/∂θ (q, T) of derived variable ``name`` along the trajectory."""
+        func = self._derived_grad.get(name)
+        if func is None:
+            g = self.model._derived_exprs[name]
+            n = self.n
+            grads = []
+            for k, th in enumerate(self._theta):
+                d = sum((g.diff(y) * self._s_args[k * n + i] for i, y in enumerate(self.model._y_args)),
+                        g.diff(th) if th is not None else 0)
+                grads.append(d)
+            func = lambdify((self.model._t_sym, self._z_args, self.model._p_args), grads, modules='numpy', cse=True)
+            self._derived_grad[name] = func
+        shape = np.shape(z_rows)[1:]
+        return np.array([np.broadcast_to(np.asarray(v, dtype=float), shape) for v in func(t, z_rows, p_arr)])
+
+
+# ───────────────────────────────────────────────
+# 5. LRU 레지스트리
+# ───────────────────────────────────────────────
+class ModelRegistry:
+    """Thread-safe LRU map of model key → CompiledModel with hit/miss counters."""
+
+    def __init__(self, maxsize: int = REGISTRY_SIZE):
+        self.maxsize = maxsize
+        self._models: "OrderedDict[str, CompiledModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                self.misses += 1
+                return None
+            self._models.move_to_end(key)
+            self.hits += 1
+            return model
+
+    def put(self, key: str, model: CompiledModel) -> None:
+        with self._lock:
+            self._models[key] = model
+            self._models.move_to_end(key)
+            while len(self._models) > self.maxsize:
+                self._models.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"size": len(self._models), "maxsize": self.maxsize,
+                    "hits": self.hits, "misses": self.misses, "hit_rate": _hit_rate(self.hits, self.misses)}
+
+
+_registry = ModelRegistry()
+
+def _load_stored_model(key: str, fingerprint: str):
+    payload = model_store.load(fingerprint)
+    if payload is None:
+        return None
+    try:
+        return CompiledModel.from_payload(key, payload)
+    except Exception as e:                  # 형식이 맞지 않는 항목 → 다시 컴파일해 덮어씀
+        print(f"Warning: Could not load stored model {fingerprint}: {e}")
+        return None
+
+def get_compiled_model(ode_text: str) -> CompiledModel:
+    """모델 키로 레지스트리 조회 → 디스크 저장소 → (캐시된) 파싱 결과로 컴파일 후 저장"""
+    key = model_key(ode_text)
+    model = _registry.get(key)
+    if model is None:
+        fingerprint = model_fingerprint(ode_text)
+        model = _load_stored_model(key, fingerprint)
+        if model is None:
+            model = CompiledModel(key, get_parsed_model(ode_text))
+            model_store.save(fingerprint, model.to_payload())
+        _registry.put(key, model)
+    return model
+
+def registry_stats() -> Dict[str, Any]:
+    return _registry.stats()
@@ -0,0 +1,194 @@
+"""
+fit_cache.py  ──  피팅 결과 LRU 캐시 (프로세스 전역) 와 warm start
+───────────────────────────────────────────────
+  canonical_hash(obj)      : 숫자·키 순서·관측 데이터 형식을 정규화한 JSON 의 sha256
+  problem_keys(data)       : (정확 키, 문제 키, 계열 키)
+  get_fit_cache()          : 프로세스 전역 FitCache
+  fit_cache_stats()        : hit / warm / miss 카운터
+
+정확 키   = 문제 키 + 피팅 파라미터의 시작값 (공통 값·그룹별 값) → 같으면 저장된 응답을 그대로 반환.
+문제 키   = 모델 지문(parser.model_fingerprint)·관측 데이터·초기값·가중치·솔버 옵션 + 피팅 파라미터·경계·고정 파라미터
+            값·분석 옵션. 문제 키가 같은 항목이 있으면(시작값만 바꾼 수동 재시작) warm start 하지 않고
+            요청한 시작값에서 새로 피팅한다.
+계열 키   = 문제 키에서 피팅 파라미터 구성·경계·고정값·분석 옵션을 뺀 것 (같은 목적함수 계열)
+            → 경계 변경, 피팅 파라미터 추가 등은 같은 계열에서 가장 가까운 해로 warm start.
+            단 그 항목의 요청과 시작값이 다른 파라미터는 요청한 시작값을 그대로 둔다.
+"""
+import copy
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .parser import model_fingerprint
+
+FIT_CACHE_SIZE = 128        # 프로세스당 보관할 피팅 결과 수 (settings.SIMULATOR_FIT_CACHE_SIZE 로 변경)
+
+# 분석 방식만 바꾸는 옵션: 정확 키에는 포함, 계열 키에는 제외
+_ANALYSIS_OPTIONS = ("multistart", "profile", "bootstrap", "mixed_effects")
+
+
+# ───────────────────────────────────────────────
+# 1. 정규화 & 키
+# ───────────────────────────────────────────────
+def _canonical(obj):
+    """키 정렬은 json.dumps 에 맡기고, 숫자(1 vs 1.0)·NaN·tuple 을 통일"""
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, bool) or obj is None or isinstance(obj, str):
+        return obj
+    if isinstance(obj, (int, float)):
+        value = float(obj)
+        return None if math.isnan(value) else value
+    return str(obj)
+
+
+def canonical_hash(obj) -> str:
+    canonical = json.dumps(_canonical(obj), sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _canonical_group(group: dict) -> dict:
+    """관측 데이터는 dict-of-lists / list-of-dicts 어느 형식이든 같은 열 딕셔너리로 (그룹 parameters 는 시작값이라 제외)"""
+    import pandas as pd                     # /fit_jobs/ 조회·/cache_stats/ 는 pandas 없이
+
+    observed = pd.DataFrame(group.get("observed", {}))
+    observed = {col: pd.to_numeric(observed[col], errors="coerce").tolist() for col in observed.columns}
+    return {
+        "observed": observed,
+        "mappings": group.get("mappings") or {},
+        "doses": group.get("doses") or [],
+    }
+
+
+def problem_keys(data: dict):
+    """피팅 요청 → (정확 키, 문제 키, 계열 키)"""
+    fit_keys = list(data.get("fit_params") or [])
+    group_params = list(data.get("group_params") or [])
+    family = {
+        "equations": model_fingerprint(data.get("equations", "")),
+        "initials": data.get("initials") or {},
+        "groups": [_canonical_group(g) for g in data.get("fitting_groups") or []],
+        "weighting": data.get("weighting", "none"),
+        "solver_options": data.get("solver_options") or {},
+        "jacobian": data.get("jacobian", "sensitivity"),
+        "group_params": group_params,
+    }
+    free = set(fit_keys) | set(group_params)
+    bounds = data.get("bounds") or {}
+    parameters = data.get("parameters") or {}
+    problem = {
+        **family,
+        "fit_params": fit_keys,
+        "bounds": {k: v for k, v in bounds.items() if k in free or k.split("[")[0] in free},
+        "fixed": {k: v for k, v in parameters.items() if k not in free},
+        **{name: data.get(name) for name in _ANALYSIS_OPTIONS},
+    }
+    exact = {
+        **problem,
+        "start": {k: v for k, v in parameters.items() if k in free},
+        "group_start": [{k: v for k, v in (g.get("parameters") or {}).items() if k in group_params}
+                        for g in data.get("fitting_groups") or []],
+    }
+    return canonical_hash(exact), canonical_hash(problem), canonical_hash(family)
+
+
+# ───────────────────────────────────────────────
+# 2. LRU 캐시
+# ───────────────────────────────────────────────
+class FitCache:
+    """
+    Thread-safe LRU map of exact key → fit entry with hit/warm/miss counters.
+
+    An entry keeps the response (returned as a deep copy on exact hits), the
+    fitted values and requested starting values by fit key (including group
+    keys such as ``F[1]``), the fixed parameter values, and the problem and
+    family keys used to find warm starts.
+    """
+
+    def __init__(self, maxsize: int = FIT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.warm = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry["response"])
+
+    def put(self, key: str, problem: str, family: str, response: dict, fitted: Dict[str, float],
+            fixed: Dict[str, float], start: Dict[str, float]) -> None:
+        with self._lock:
+            self._entries[key] = {"problem": problem, "family": family, "response": copy.deepcopy(response),
+                                  "fitted": dict(fitted), "fixed": dict(fixed), "start": dict(start)}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def closest(self, problem: str, family: str, fit_keys, fixed: Dict[str, float],
+                start: Dict[str, float]) -> Optional[Dict[str, float]]:
+        """
+        같은 계열에서 가장 가까운 항목의 피팅 값 (없으면 None, miss 로 집계).
+        거리 = 이 요청의 피팅 키 중 그 항목에서 피팅되지 않은 수 + 값이 다른 고정 파라미터 수;
+        동점이면 최근 항목. 문제 키까지 같은 항목이 하나라도 있으면(시작값만 바꾼 요청) None.
+        반환값에는 그 항목의 요청과 시작값이 같은 피팅 키만 담는다 (사용자가 바꾼 시작값은 유지).
+        """
+        best, best_distance = None, None
+        with self._lock:
+            for entry in reversed(self._entries.values()):
+                if entry["problem"] == problem:
+                    best = None
+                    break
+                if entry["family"] != family:
+                    continue
+                distance = sum(k not in entry["fitted"] for k in fit_keys)
+                distance += sum(entry["fixed"].get(k) != v for k, v in fixed.items())
+                if best_distance is None or distance < best_distance:
+                    best, best_distance = entry, distance
+            warm = {k: best["fitted"][k] for k in fit_keys
+                    if k in best["fitted"] and best["start"].get(k) == start.get(k)} if best else {}
+            if not warm:
+                self.misses += 1
+                return None
+            self.warm += 1
+            return warm
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.warm = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.warm + self.misses
+            return {"size": len(self._entries), "maxsize": self.maxsize,
+                    "hits": self.hits, "warm_starts": self.warm, "misses": self.misses,
+                    "hit_rate": self.hits / total if total else None}
+
+
+_fit_cache: Optional[FitCache] = None
+_init_lock = threading.Lock()
+
+
+def get_fit_cache() -> FitCache:
+    global _fit_cache
+    with _init_lock:
+        if _fit_cache is None:
+            from django.conf import settings
+            _fit_cache = FitCache(int(getattr(settings, 'SIMULATOR_FIT_CACHE_SIZE', FIT_CACHE_SIZE)))
+        return _fit_cache
+
+
+def fit_cache_stats() -> Dict[str, Any]:
+    return get_fit_cache().stats()
@@ -3,91 +3,821 @@
 import numpy as np
 import pandas as pd
 from scipy.optimize import least_squares
-from sympy import symbols, lambdify
-from django.core.cache import cache
-import hashlib
+from scipy.stats import f as f_dist, qmc, t
 import math
+import time
+from functools import partial
 
 # 프로젝트의 다른 모듈 임포트
-from .solver import solve_ode_system
-from .parser import parse_ode_input
+from .solver import parse_solver_options, resolve_method, simulate_states, solve_sensitivities
+from .compiler import get_compiled_model
+from .parallel import get_executor, run_chunked, run_ordered
+from .fit_cache import get_fit_cache, problem_keys
 
+# 잔차 Jacobian (민감도 방정식 또는 유한차분) 의 정확도가 적분 오차에 좌우되므로
+# 시뮬레이션 기본값보다 엄격한 허용오차를 사용 (요청으로 덮어쓰기 가능)
+FIT_SOLVER_DEFAULTS = {"rtol": 1e-6, "atol": 1e-9}
 
-def _residuals(vec, fit_keys, fixed_param, equations_callable, all_parameters, comps, initials, fitting_groups, weighting, derived_expressions):
+# 다중 시작점 피팅: 시작점 수 기본값/상한, 선별 단계의 잔차 평가 예산,
+# 선별 후 비용이 최저값의 DOMINANCE_FACTOR 배를 넘는 시작점은 중단
+MULTISTART_DEFAULT_STARTS = 8
+MULTISTART_MAX_STARTS = 200
+MULTISTART_SCREEN_NFEV = 15
+DOMINANCE_FACTOR = 10.0
+# 하한이 양수이고 상한/하한 비가 이 값 이상이면 로그 척도에서 표본 추출 (속도 상수 등)
+LOG_SAMPLING_RATIO = 100.0
+
+# 프로파일 우도: 방향당 최대 점 수, 초기 스텝 (Wald 표준오차 배수)
+PROFILE_MAX_STEPS = 30
+PROFILE_STEP_SE = 0.5
+
+# 부트스트랩: 반복 수 기본값/상한
+BOOTSTRAP_DEFAULT_REPLICATES = 200
+BOOTSTRAP_MAX_REPLICATES = 2000
+
+
+class FitGroup:
+    """
+    A fitting group compiled once per fit: observation times, the mapped model
+    variables, validity masks, observed values and the weights of every
+    weighting scheme as NumPy arrays, so residual evaluations never touch pandas.
+
+    ``targets`` holds one (model_var, comp_idx, valid, observed, weights, offset)
+    per usable mapping: ``comp_idx`` is the compartment row (None for derived
+    variables), ``valid`` the indices of non-NaN observations, ``weights`` a
+    dict weighting → array and ``offset`` the target's start in the group's
+    residual vector (length ``n_res``).
+
+    ``local_params`` maps model parameters estimated separately for this group
+    to their fit keys (e.g. {"F": "F[1]"}); see group_param_values.
+    """
+    __slots__ = ("t_eval", "t_span", "doses", "targets", "derived", "n_res", "local_params")
+
+    def __init__(self, model, group: dict):
+        obs_df = pd.DataFrame(group.get("observed", {}))
+        self.doses = group.get("doses", [])
+        self.targets = []
+        self.derived = []
+        self.n_res = 0
+        self.local_params = {}
+        if "Time" not in obs_df.columns or obs_df["Time"].empty:
+            self.t_eval, self.t_span = np.empty(0), (0.0, 0.0)
+            return
+
+        self.t_eval = pd.to_numeric(obs_df["Time"], errors="coerce").to_numpy(dtype=float)
+        self.t_span = (float(np.nanmin(self.t_eval)), float(np.nanmax(self.t_eval)))
+
+        for data_col, model_var in (group.get("mappings") or {}).items():
+            # 관측 데이터 컬럼과 매핑된 모델 변수가 모두 존재하는지 확인
+            if data_col not in obs_df.columns:
+                continue
+            if model_var in model.comp_index:
+                comp_idx = model.comp_index[model_var]
+            elif model_var in model.derived:
+                comp_idx = None
+                if model_var not in self.derived:
+                    self.derived.append(model_var)
+            else:
+                continue
+
+            observed_values = pd.to_numeric(obs_df[data_col], errors="coerce").to_numpy(dtype=float)
+            valid = np.flatnonzero(~np.isnan(observed_values))
+            if valid.size == 0:
+                continue
+            observed = observed_values[valid]
+            weights = {
+                "none": np.ones(valid.size),
+                "1/Y": 1.0 / np.maximum(np.abs(observed), 1e-9),
+                "1/Y2": 1.0 / np.maximum(np.abs(observed**2), 1e-9),
+            }
+            self.targets.append((model_var, comp_idx, valid, observed, weights, self.n_res))
+            self.n_res += valid.size
+
+
+    def with_targets(self, targets) -> "FitGroup":
+        """같은 시간축·투여의 사본에 (model_var, comp_idx, valid, observed, weights) 목록을 넣어 반환 (offset 재계산)"""
+        clone = object.__new__(FitGroup)
+        clone.t_eval, clone.t_span, clone.doses, clone.derived = self.t_eval, self.t_span, self.doses, self.derived
+        clone.local_params = self.local_params
+        clone.targets, clone.n_res = [], 0
+        for model_var, comp_idx, valid, observed, weights in targets:
+            clone.targets.append((model_var, comp_idx, valid, observed, weights, clone.n_res))
+            clone.n_res += valid.size
+        return clone
+
+
+def compile_groups(model, fitting_groups) -> list:
+    return [FitGroup(model, group) for group in fitting_groups]
+
+
+# ───────────────────────────────────────────────
+# 그룹별 파라미터 (블록 희소 Jacobian)
+# ───────────────────────────────────────────────
+def group_fit_key(name: str, index: int) -> str:
+    """그룹별로 추정하는 파라미터의 피팅 키: 'F' · 그룹 1 → 'F[1]'"""
+    return f"{name}[{index}]"
+
+
+def group_param_values(all_param_values: dict, group: FitGroup) -> dict:
+    """공통 값에 그룹별 파라미터 값을 덮어쓴 이 그룹의 파라미터 딕셔너리"""
+    if not group.local_params:
+        return all_param_values
+    return {**all_param_values,
+            **{name: all_param_values[key] for name, key in group.local_params.items() if key in all_param_values}}
+
+
+def group_columns(model, fit_keys, group: FitGroup):
+    """
+    그룹 잔차가 의존하는 피팅 키 → (모델 파라미터 이름 tuple, fit_keys 열 인덱스 배열).
+    잔차 Jacobian 은 그룹 행 블록 × 이 열들에서만 0 이 아니며, 다른 그룹 전용 키
+    (모델 파라미터가 아닌 'F[0]' 등)의 열은 이 그룹에서 항상 0.
+    """
+    index = {key: j for j, key in enumerate(fit_keys)}
+    names, cols = [], []
+    for key, j in index.items():
+        if key in model.param_index and key not in group.local_params:
+            names.append(key)
+            cols.append(j)
+    for name, key in group.local_params.items():
+        if key in index:
+            names.append(name)
+            cols.append(index[key])
+    return tuple(names), np.array(cols, dtype=int)
+
+
+class FitCancelled(Exception):
+    """진행 보고 콜백이 취소를 요청함"""
+
+
+class FitProgress:
+    """
+    Progress of one least_squares run, updated from inside the residual and
+    Jacobian callbacks: residual evaluations (``nfev``), the best cost so far
+    and, with sensitivity Jacobians, the iteration count (trf evaluates the
+    Jacobian once per accepted step). With finite differences the Jacobian
+    columns are ordinary residual calls, so ``iteration`` stays None.
+
+    Stages that run on the process pool (multi-start, profile, bootstrap,
+    mixed-effects E-step) count finished work items in ``done`` out of
+    ``total`` via ``task_done``, so the report keeps firing while the parent
+    waits for the pool.
+
+    ``report(state)`` is called at most every ``interval`` seconds (and on
+    every ``enter_stage``); if it returns True the fit is aborted with
+    FitCancelled.
+    """
+
+    def __init__(self, report=None, interval: float = 0.5):
+        self.report = report
+        self.interval = interval
+        self.nfev = 0
+        self.iteration = None
+        self.cost = None
+        self.stage = None
+        self.done = self.total = None
+        self._last_report = 0.0
+
+    def state(self) -> dict:
+        return {"stage": self.stage, "iteration": self.iteration, "nfev": self.nfev, "cost": self.cost,
+                "done": self.done, "total": self.total}
+
+    def enter_stage(self, stage: str, total: int = None) -> None:
+        """다중 시작점 등 풀에서 실행되는 단계 경계: 즉시 보고하고 취소 여부 확인 (total = 단계의 작업 수)"""
+        self.stage = stage
+        self.done, self.total = (0, total) if total is not None else (None, None)
+        self._last_report = 0.0
+        self._maybe_report()
+
+    def task_done(self, n: int = 1) -> None:
+        """풀 단계의 작업 n 개 완료 (parallel.run_ordered/run_chunked 의 on_done): heartbeat 유지·취소 확인"""
+        self.done = (self.done or 0) + n
+        self._maybe_report()
+
+    def residuals_evaluated(self, res: np.ndarray) -> None:
+        self.nfev += 1
+        cost = 0.5 * float(np.dot(res, res))
+        if np.isfinite(cost) and (self.cost is None or cost < self.cost):
+            self.cost = cost
+        self._maybe_report()
+
+    def jacobian_evaluated(self) -> None:
+        self.iteration = (self.iteration or 0) + 1
+        self._maybe_report()
+
+    def _maybe_report(self) -> None:
+        if self.report is None:
+            return
+        now = time.monotonic()
+        if now - self._last_report < self.interval:
+            return
+        self._last_report = now
+        if self.report(self.state()):
+            raise FitCancelled()
+
+
+def _group_residuals(model, all_param_values, initials, group, weighting, solver_options=None, sensitivity_keys=None):
+    """
+    한 '피팅 그룹'을 시뮬레이션하고 ((가중) 잔차 벡터, 잔차 Jacobian, 솔버 통계) 를 반환합니다.
+    - group: FitGroup (compile_groups 로 미리 변환된 관측 데이터)
+    - weighting: 'none', '1/Y', or '1/Y2'
+    - solver_options: parse_solver_options() 결과 (method, rtol, atol, ...)
+    - sensitivity_keys: 주어지면 전진 민감도 방정식을 함께 적분해 ∂잔차/∂θ (len(res), q) 를 계산
+                        (없으면 Jacobian 자리는 None)
+    """
+    n_keys = len(sensitivity_keys or ())
+    res = np.empty(group.n_res)
+    jac = np.empty((group.n_res, n_keys)) if sensitivity_keys else None
+    if group.n_res == 0:
+        return res, jac, {}
+
+    t_eval = group.t_eval
+    p_arr = model.param_array(all_param_values)
+
+    # 1. 시뮬레이션 (선형 모델은 해석해로 계산) — 민감도 요청 시 상태와 ∂y/∂θ 를 함께 적분
+    if sensitivity_keys:
+        sens = model.sensitivity(sensitivity_keys)
+        z, solver_stats = solve_sensitivities(sens, initials, all_param_values, group.t_span, t_eval,
+                                              group.doses, solver_options)
+        y_rows, S = sens.split(z)
+    else:
+        y_rows, solver_stats = simulate_states(model, initials, all_param_values, group.t_span, t_eval,
+                                               group.doses, solver_options)
+
+    # 2. 매핑된 파생 변수만 계산 (시뮬레이션 직후). 평가에 실패하면 어떤 변수인지 알리고 중단
+    #    (NaN 잔차로 계속하면 least_squares 가 원인 없이 실패)
+    derived_errors = {}
+    derived_values = model.evaluate_derived(t_eval, y_rows, p_arr, names=group.derived,
+                                            errors=derived_errors) if group.derived else {}
+    if derived_errors:
+        raise ValueError("; ".join(derived_errors.values()))
+
+    # 3. 매핑 정보를 기반으로 잔차 계산 (미리 계산된 인덱스·가중치 사용)
+    for model_var, comp_idx, valid, observed, weights, offset in group.targets:
+        out = slice(offset, offset + valid.size)
+        w = weights.get(weighting, weights["none"])
+        if comp_idx is not None:
+            simulated = y_rows[comp_idx, valid]
+        else:
+            simulated = derived_values[model_var][valid]
+        np.multiply(np.subtract(simulated, observed), w, out=res[out])
+
+        if sensitivity_keys:
+            # 가중치는 관측값에만 의존하므로 ∂r/∂θ = w · ∂sim/∂θ
+            grad = S[comp_idx][:, valid] if comp_idx is not None \
+                else sens.derived_gradient(model_var, t_eval, z, p_arr)[:, valid]
+            np.multiply(grad.T, w[:, None], out=jac[out])
+
+    return res, jac, solver_stats
+
+
+def _group_residuals_task(ode_text, all_param_values, initials, group, weighting, solver_options=None,
+                          sensitivity_keys=None):
+    """프로세스 풀 워커용: 워커의 레지스트리에서 모델을 가져와(최초 1회 컴파일) 그룹 잔차 계산"""
+    model = get_compiled_model(ode_text)
+    return _group_residuals(model, all_param_values, initials, group, weighting, solver_options, sensitivity_keys)
+
+
+def _residuals(vec, fit_keys, fixed_param, model, initials, fitting_groups, weighting, ode_text=None, executor=None,
+               solver_options=None, solver_stats=None, sensitivity_keys=None, jac_cache=None, progress=None):
     """
     여러 '피팅 그룹'을 순회하며 전체 잔차를 계산합니다.
-    - fitting_groups: 각 그룹은 'doses', 'observed', 'mappings' 데이터를 포함하는 딕셔너리입니다.
+    - model: compiler.CompiledModel (RHS 및 파생 변수 평가기 포함)
+    - fitting_groups: compile_groups() 로 변환된 FitGroup 목록
     - weighting: 'none', '1/Y', or '1/Y2'
-    - derived_expressions: 파생 변수 표현식 딕셔너리
+    - executor: 주어지면 그룹들을 프로세스 풀에서 병렬로 계산 (결과는 그룹 순서대로 결합)
+    - solver_stats: 주어지면 그룹별 ODE 적분 횟수(nfev/njev)를 누적
+    - sensitivity_keys, jac_cache: 마지막 (x, 잔차) 와 민감도로 계산한 잔차 Jacobian 을 jac_cache 에 보관
+                                   (least_squares 가 같은 x 로 Jacobian 콜백을 호출할 때 재사용)
+    - progress: FitProgress (평가 횟수·최저 비용 갱신, 취소 확인)
     """
-    # 1. 현재 추정치로 전체 파라미터 딕셔너리 재구성
+    # 1. 현재 추정치로 전체 파라미터 딕셔너리 재구성 (그룹별 파라미터는 그룹마다 덮어씀)
     fit_param = dict(zip(fit_keys, vec))
     all_param_values = {**fixed_param, **fit_param}
+    columns = [group_columns(model, fit_keys, group) for group in fitting_groups]
+    tasks = [(group_param_values(all_param_values, group), initials, group, weighting, solver_options,
+              names if sensitivity_keys else None)
+             for group, (names, _) in zip(fitting_groups, columns)]
 
-    res_all = []
     # 2. 각 피팅 그룹에 대해 시뮬레이션 수행 및 잔차 계산
-    for group in fitting_groups:
-        obs_df = pd.DataFrame(group['observed'])
-        group_doses = group['doses']
-        mappings = group.get('mappings', {}) # 매핑 정보 가져오기
+    if executor is not None and ode_text is not None:
+        parts = run_ordered(_group_residuals_task, [(ode_text, *task) for task in tasks], executor)
+    else:
+        parts = [_group_residuals(model, *task) for task in tasks]
+
+    if solver_stats is not None:
+        for _, _, stats in parts:
+            for k in ('nfev', 'njev'):
+                solver_stats[k] += stats.get(k, 0)
+            if stats.get('method'):
+                solver_stats['method'] = stats['method']
+
+    res_all = np.concatenate([res for res, _, _ in parts]) if parts else np.empty(0)
+    jac_all = None
+    if res_all.size == 0:
+        res_all = np.array([1e6] * len(vec))
+        jac_all = np.zeros((len(vec), len(vec)))
+    elif sensitivity_keys:
+        # 그룹별 민감도 블록을 해당 열에만 배치 (나머지는 구조적 0)
+        jac_all = np.zeros((res_all.size, len(vec)))
+        row = 0
+        for (res, jac, _), (_, cols) in zip(parts, columns):
+            if jac is not None:
+                jac_all[row:row + res.size, cols] = jac
+            row += res.size
+
+    if jac_cache is not None:
+        jac_cache.update(x=np.array(vec, dtype=float), res=res_all, jac=jac_all)
+    if progress is not None:
+        progress.residuals_evaluated(res_all)
+    return res_all
+
+
+def _cached_residuals(vec, jac_cache, kwargs):
+    if jac_cache.get("x") is None or not np.array_equal(jac_cache["x"], vec):
+        _residuals(vec, jac_cache=jac_cache, **kwargs)
+    return jac_cache
+
+
+def _residual_jacobian(vec, jac_cache=None, progress=None, **kwargs):
+    """least_squares 의 jac 콜백: 같은 x 의 잔차 계산에서 보관한 민감도 Jacobian 을 반환 (없으면 계산)"""
+    jac = _cached_residuals(vec, jac_cache, kwargs)["jac"]
+    if progress is not None:
+        progress.jacobian_evaluated()
+    return jac
+
+
+def _fd_steps(x0: np.ndarray, bounds) -> np.ndarray:
+    """least_squares '2-point' 와 같은 전진 차분 스텝 (경계를 넘으면 반대 방향 또는 넓은 쪽 거리)"""
+    lb, ub = (np.broadcast_to(np.asarray(b, dtype=float), x0.shape) for b in (bounds or (-np.inf, np.inf)))
+    h = np.finfo(float).eps ** 0.5 * np.where(x0 >= 0, 1.0, -1.0) * np.maximum(1.0, np.abs(x0))
+    lower_dist, upper_dist = x0 - lb, ub - x0
+    violated = (x0 + h < lb) | (x0 + h > ub)
+    fitting = np.abs(h) <= np.maximum(lower_dist, upper_dist)
+    h[violated & fitting] *= -1
+    forward = (upper_dist >= lower_dist) & ~fitting
+    h[forward] = upper_dist[forward]
+    backward = (upper_dist < lower_dist) & ~fitting
+    h[backward] = -lower_dist[backward]
+    return h
+
 
-        if "Time" not in obs_df.columns or obs_df["Time"].empty or not mappings:
+def _grouped_fd_jacobian(vec, bounds=None, jac_cache=None, progress=None, **kwargs):
+    """
+    그룹별 파라미터가 있을 때의 유한차분 Jacobian: 각 열을 섭동할 때 그 열에 의존하는
+    그룹만 다시 적분한다 (group_columns 의 블록 구조). 기준 잔차는 jac_cache 에서 재사용.
+    """
+    x0 = np.asarray(vec, dtype=float)
+    f0 = _cached_residuals(x0, jac_cache, kwargs)["res"]
+    model, fit_keys, groups = kwargs["model"], kwargs["fit_keys"], kwargs["fitting_groups"]
+    J = np.zeros((f0.size, x0.size))
+    if f0.size != sum(g.n_res for g in groups):        # 잔차가 없는 경우의 대체 벡터
+        return J
+    h = _fd_steps(x0, bounds)
+
+    tasks, where = [], []
+    row = 0
+    for group in groups:
+        _, cols = group_columns(model, fit_keys, group)
+        for j in cols if group.n_res else ():
+            x = x0.copy()
+            x[j] += h[j]
+            values = group_param_values({**kwargs["fixed_param"], **dict(zip(fit_keys, x))}, group)
+            tasks.append((values, kwargs["initials"], group, kwargs["weighting"], kwargs.get("solver_options")))
+            where.append((slice(row, row + group.n_res), j, x[j] - x0[j]))
+        row += group.n_res
+
+    executor, ode_text = kwargs.get("executor"), kwargs.get("ode_text")
+    if executor is not None and ode_text is not None:
+        parts = run_ordered(_group_residuals_task, [(ode_text, *task) for task in tasks], executor)
+    else:
+        parts = [_group_residuals(model, *task) for task in tasks]
+
+    solver_stats = kwargs.get("solver_stats")
+    for (res, _, stats), (rows, j, dx) in zip(parts, where):
+        J[rows, j] = (res - f0[rows]) / dx
+        if solver_stats is not None:
+            for k in ('nfev', 'njev'):
+                solver_stats[k] += stats.get(k, 0)
+    if progress is not None:
+        progress.jacobian_evaluated()
+    return J
+
+
+def _fit_once(model, x0, bounds, problem, max_nfev=None, **extra):
+    """
+    least_squares 1회 실행.
+    - problem: 피팅 동안 고정된 잔차 입력 (fit_keys, fixed_param, initials, fitting_groups,
+               weighting, solver_options, sensitivity_keys) — 프로세스 풀로 그대로 전달 가능
+    - extra: 호출 측 전용 인자 (ode_text, executor, solver_stats, progress)
+    """
+    if problem.get("sensitivity_keys"):
+        jac = _residual_jacobian
+    elif any(group.local_params for group in problem["fitting_groups"]):
+        jac = partial(_grouped_fd_jacobian, bounds=bounds)
+    else:
+        jac = '2-point'
+    return least_squares(
+        _residuals,
+        x0,
+        jac=jac,
+        kwargs=dict(model=model, jac_cache={}, **problem, **extra),
+        bounds=bounds,
+        max_nfev=max_nfev,
+        verbose=0
+    )
+
+
+def _local_fit_task(ode_text, problem, bounds, x0, max_nfev=None) -> dict:
+    """프로세스 풀 워커용: 워커 레지스트리의 모델로 한 시작점에서 국소 피팅"""
+    model = get_compiled_model(ode_text)
+    try:
+        result = _fit_once(model, np.asarray(x0, dtype=float), bounds, problem, max_nfev=max_nfev)
+    except Exception as e:
+        return {"x": np.asarray(x0, dtype=float), "cost": np.inf, "nfev": 0, "status": None, "message": str(e)}
+    cost = float(result.cost) if np.isfinite(result.cost) else np.inf
+    return {"x": result.x, "cost": cost, "nfev": int(result.nfev), "status": int(result.status),
+            "message": result.message}
+
+
+# ───────────────────────────────────────────────
+# 다중 시작점 (multi-start) 피팅
+# ───────────────────────────────────────────────
+def parse_multistart_options(raw) -> dict:
+    """
+    요청의 'multistart' 값 → {"n_starts", "seed", "screen_nfev"} (끄면 None).
+    정수만 주면 시작점 수로 해석. 잘못된 값은 ValueError.
+    """
+    if raw in (None, False, 0):
+        return None
+    if raw is True:
+        raw = {}
+    elif isinstance(raw, (int, float, str)):
+        raw = {"n_starts": raw}
+    if not isinstance(raw, dict):
+        raise ValueError("multistart must be a number of starts or an options object.")
+    try:
+        n_starts = int(raw.get("n_starts", MULTISTART_DEFAULT_STARTS))
+        screen_nfev = int(raw.get("screen_nfev", MULTISTART_SCREEN_NFEV))
+        seed = raw.get("seed")
+        seed = None if seed is None else int(seed)
+    except (TypeError, ValueError):
+        raise ValueError("multistart n_starts, screen_nfev and seed must be integers.")
+    if not 2 <= n_starts <= MULTISTART_MAX_STARTS:
+        raise ValueError(f"multistart n_starts must be between 2 and {MULTISTART_MAX_STARTS}.")
+    if screen_nfev < 1:
+        raise ValueError("multistart screen_nfev must be positive.")
+    return {"n_starts": n_starts, "seed": seed, "screen_nfev": screen_nfev}
+
+
+def latin_hypercube_starts(p0, bounds, n_starts: int, seed=None) -> np.ndarray:
+    """
+    Starting points of shape (n_starts, len(p0)): ``p0`` first, then a Latin
+    hypercube sample within ``bounds``. Parameters whose bounds are positive
+    and span at least LOG_SAMPLING_RATIO are sampled on a log scale.
+    """
+    lb, ub = (np.asarray(b, dtype=float) for b in bounds)
+    if not (np.all(np.isfinite(lb)) and np.all(np.isfinite(ub))):
+        raise ValueError("Multi-start fitting needs finite lower and upper bounds for every fitted parameter.")
+    log_scale = (lb > 0) & (ub >= lb * LOG_SAMPLING_RATIO)
+    lo = np.where(log_scale, np.log(np.where(log_scale, lb, 1.0)), lb)
+    hi = np.where(log_scale, np.log(np.where(log_scale, ub, 1.0)), ub)
+
+    unit = qmc.LatinHypercube(d=len(lb), seed=seed).random(n_starts - 1)
+    sample = lo + unit * (hi - lo)
+    sample[:, log_scale] = np.exp(sample[:, log_scale])
+    sample = np.clip(sample, lb, ub)
+    return np.vstack([np.asarray(p0, dtype=float), sample])
+
+
+def _distinct_solutions(fit_keys, runs, rtol=1e-2) -> list:
+    """수렴한 국소해를 파라미터가 (상대 rtol 내에서) 같은 것끼리 묶어 비용순으로 정리"""
+    solutions = []
+    for idx in sorted(range(len(runs)), key=lambda i: runs[i]["cost"]):
+        run = runs[idx]
+        if run["outcome"] != "converged":
             continue
+        for sol in solutions:
+            if np.allclose(run["x"], sol["_x"], rtol=rtol, atol=1e-12):
+                sol["starts"].append(idx)
+                break
+        else:
+            solutions.append({"_x": run["x"], "params": dict(zip(fit_keys, run["x"].tolist())),
+                              "cost": run["cost"], "starts": [idx]})
+    for sol in solutions:
+        del sol["_x"]
+    return solutions
+
+
+def _multistart(ode_text, problem, bounds, p0, options, executor=None, progress=None):
+    """
+    Run local fits from Latin-hypercube starts in two rounds on the process pool
+    and return (best x, summary).
+
+    Every start first gets ``screen_nfev`` residual evaluations; starts whose
+    cost is then more than DOMINANCE_FACTOR times the best are dropped
+    ("dominated"), and the rest resume from where they stopped until
+    least_squares converges (or, as "budget_exhausted", stops at its own
+    max_nfev).
+    """
+    starts = latin_hypercube_starts(p0, bounds, options["n_starts"], options["seed"])
+
+    on_done = progress.task_done if progress is not None else None
+    if progress is not None:
+        progress.enter_stage("multistart screening", len(starts))
+    runs = run_ordered(_local_fit_task, [(ode_text, problem, bounds, x0, options["screen_nfev"]) for x0 in starts],
+                       executor, on_done)
+    best = min(run["cost"] for run in runs)
+    resume = [i for i, run in enumerate(runs)
+              if run["status"] == 0 and np.isfinite(run["cost"]) and run["cost"] <= DOMINANCE_FACTOR * best]
+
+    if progress is not None:
+        progress.enter_stage("multistart refinement", len(resume))
+    refined = run_ordered(_local_fit_task, [(ode_text, problem, bounds, runs[i]["x"], None) for i in resume],
+                          executor, on_done)
+    for i, run in zip(resume, refined):
+        run["nfev"] += runs[i]["nfev"]
+        runs[i] = run
+
+    resumed = set(resume)
+    for i, run in enumerate(runs):
+        if run["status"] is None or not np.isfinite(run["cost"]):
+            run["outcome"] = "failed"
+        elif run["status"] == 0 and i in resumed:
+            run["outcome"] = "budget_exhausted"  # 재개했지만 least_squares 의 max_nfev 에서 멈춤
+        elif run["status"] == 0:
+            run["outcome"] = "dominated"     # 선별 예산 안에 수렴하지 못했고 비용이 크게 뒤처짐
+        else:
+            run["outcome"] = "converged"
+
+    finite = [i for i, run in enumerate(runs) if np.isfinite(run["cost"])]
+    if not finite:
+        raise ValueError("Every multi-start local fit failed: " + runs[0].get("message", ""))
+    best_idx = min(finite, key=lambda i: runs[i]["cost"])
+    fit_keys = problem["fit_keys"]
+    summary = {
+        "n_starts": len(runs),
+        "best_start": best_idx,
+        "n_converged": sum(run["outcome"] == "converged" for run in runs),
+        "n_dominated": sum(run["outcome"] == "dominated" for run in runs),
+        "n_budget_exhausted": sum(run["outcome"] == "budget_exhausted" for run in runs),
+        "n_failed": sum(run["outcome"] == "failed" for run in runs),
+        "nfev": sum(run["nfev"] for run in runs),
+        "solutions": _distinct_solutions(fit_keys, runs),
+        "starts": [{"start": dict(zip(fit_keys, starts[i].tolist())), "cost": run["cost"],
+                    "outcome": run["outcome"], "nfev": run["nfev"]} for i, run in enumerate(runs)],
+    }
+    return runs[best_idx]["x"], summary
+
+
+# ───────────────────────────────────────────────
+# 프로파일 우도 신뢰 구간
+# ───────────────────────────────────────────────
+def parse_profile_options(raw) -> dict:
+    """요청의 'profile' 값 → {"max_steps"} (끄면 None). 잘못된 값은 ValueError."""
+    if not raw:
+        return None
+    if raw is True:
+        raw = {}
+    if not isinstance(raw, dict):
+        raise ValueError("profile must be true or an options object.")
+    try:
+        max_steps = int(raw.get("max_steps", PROFILE_MAX_STEPS))
+    except (TypeError, ValueError):
+        raise ValueError("profile max_steps must be an integer.")
+    if max_steps < 1:
+        raise ValueError("profile max_steps must be positive.")
+    return {"max_steps": max_steps}
+
+
+def _profile_task(ode_text, problem, bounds, x_hat, j, cost_hat, cost_limit, step, max_steps) -> dict:
+    """
+    프로세스 풀 워커용: j 번째 파라미터를 고정값으로 옮겨 가며 나머지를 다시 피팅하고,
+    비용이 cost_limit 를 넘는 지점을 양방향으로 찾는다. 각 점은 직전 점의 해에서 시작
+    (warm start) 하고, 비용 증가가 작으면 스텝을 두 배로 늘린다.
+    """
+    model = get_compiled_model(ode_text)
+    keys = problem["fit_keys"]
+    key = keys[j]
+    others = [k for k in keys if k != key]
+    sub = dict(problem, fit_keys=others,
+               sensitivity_keys=tuple(others) if problem.get("sensitivity_keys") and others else None)
+    lb, ub = (np.broadcast_to(np.asarray(b, dtype=float), x_hat.shape) for b in bounds)
+    sub_bounds = (np.delete(lb, j), np.delete(ub, j))
+
+    def profile_cost(value, x_rest):
+        sub_problem = dict(sub, fixed_param={**problem["fixed_param"], key: float(value)})
+        if not others:
+            res = _residuals(x_rest, model=model, **sub_problem)
+            return 0.5 * float(np.dot(res, res)), x_rest
+        result = _fit_once(model, x_rest, sub_bounds, sub_problem)
+        return float(result.cost), result.x
 
-        t_start = obs_df["Time"].min()
-        t_end = obs_df["Time"].max()
-        t_eval = obs_df["Time"].to_numpy()
-
-        # 3. solve_ode_system 호출
-        sim_df = solve_ode_system(
-            equations_callable=equations_callable,
-            compartments=comps,
-            parameters=all_parameters,
-            init_values=initials,
-            param_values=all_param_values,
-            t_span=[t_start, t_end],
-            t_eval=t_eval,
-            doses=group_doses
-        )
-
-        # 4. 파생 변수 계산 (시뮬레이션 직후)
-        available_vars_for_eval = {**sim_df.to_dict(orient='series'), **all_param_values}
-        for new_col, expr_str in derived_expressions.items():
+    points = [(float(x_hat[j]), cost_hat)]
+    limits = []
+    for direction in (-1.0, 1.0):
+        value, cost, x_rest, h = x_hat[j], cost_hat, np.delete(x_hat, j), step
+        limit = None
+        for _ in range(max_steps):
+            nxt = float(np.clip(value + direction * h, lb[j], ub[j]))
+            if nxt == value:            # 경계 도달: 이 방향은 구간이 경계에서 잘림
+                break
             try:
-                sim_df[new_col] = pd.eval(expr_str, local_dict=available_vars_for_eval, engine='python')
-            except Exception as e:
-                print(f"Warning: Could not evaluate derived expression during fitting: '{new_col} = {expr_str}': {e}")
+                nxt_cost, x_rest = profile_cost(nxt, x_rest)
+            except Exception:
+                break
+            if not np.isfinite(nxt_cost):
+                break
+            points.append((nxt, nxt_cost))
+            if nxt_cost >= cost_limit:
+                # 직전 점과 선형 보간으로 임계 비용을 지나는 값 추정
+                limit = value + (cost_limit - cost) * (nxt - value) / (nxt_cost - cost)
+                break
+            if nxt_cost - cost < 0.1 * (cost_limit - cost_hat):
+                h *= 2.0
+            value, cost = nxt, nxt_cost
+        limits.append(limit)
 
-        # 5. 매핑 정보를 기반으로 잔차 계산
-        for data_col, model_var in mappings.items():
-            # 관측 데이터 컬럼과 매핑된 모델 변수가 모두 존재하는지 확인
-            if data_col not in obs_df.columns or model_var not in sim_df.columns:
-                continue
-            
-            observed_values = obs_df[data_col].to_numpy()
-            simulated_values = sim_df[model_var].to_numpy()
-            
-            valid_indices = ~np.isnan(observed_values)
-            if not np.any(valid_indices):
-                continue
+    points.sort()
+    return {"lower": limits[0], "upper": limits[1],
+            "values": [v for v, _ in points], "cost": [c for _, c in points]}
 
-            raw_residuals = simulated_values[valid_indices] - observed_values[valid_indices]
-            
-            if weighting == '1/Y':
-                weights = 1.0 / np.maximum(np.abs(observed_values[valid_indices]), 1e-9)
-                weighted_residuals = raw_residuals * weights
-            elif weighting == '1/Y2':
-                weights = 1.0 / np.maximum(np.abs(observed_values[valid_indices]**2), 1e-9)
-                weighted_residuals = raw_residuals * weights
-            else: # 'none'
-                weighted_residuals = raw_residuals
 
-            res_all.extend(weighted_residuals)
+def profile_likelihood(ode_text, problem, bounds, result, options, alpha=0.05, executor=None, progress=None) -> dict:
+    """
+    Profile-likelihood confidence intervals around a least_squares ``result``.
+
+    Each fitted parameter is profiled on its own pool worker. The interval ends
+    where the refitted cost exceeds ``cost * (1 + F(1-alpha; 1, dof) / dof)``.
+    An end is None when the profile stays below that level up to the bound or
+    within ``max_steps`` points. Returns {"level", "cost_limit", "profiles"},
+    with one profile per parameter giving lower/upper and the sampled
+    values/cost. ``progress`` (FitProgress) gets ``task_done`` per profiled
+    parameter.
+    """
+    x_hat = np.asarray(result.x, dtype=float)
+    n_params = x_hat.size
+    dof = result.fun.size - n_params
+    if dof <= 0:
+        raise ValueError("Profile likelihood needs more observations than fitted parameters.")
+    cost_hat = float(result.cost)
+    cost_limit = cost_hat * (1.0 + f_dist.ppf(1.0 - alpha, 1, dof) / dof)
+
+    # 초기 스텝: 가중 잔차 기준 Wald 표준오차의 일부 (계산할 수 없으면 값의 10%)
+    try:
+        cov = np.linalg.inv(result.jac.T @ result.jac) * (2.0 * cost_hat / dof)
+        se = np.sqrt(np.maximum(np.diag(cov), 0.0))
+    except np.linalg.LinAlgError:
+        se = np.full(n_params, np.nan)
+    fallback = 0.1 * np.maximum(np.abs(x_hat), 1e-6)
+    steps = np.where(np.isfinite(se) & (se > 0), PROFILE_STEP_SE * se, fallback)
+
+    profiles = run_ordered(_profile_task,
+                           [(ode_text, problem, bounds, x_hat, j, cost_hat, cost_limit, float(steps[j]),
+                             options["max_steps"]) for j in range(n_params)],
+                           executor, progress.task_done if progress is not None else None)
+    return {"level": 1.0 - alpha, "cost_limit": cost_limit,
+            "profiles": dict(zip(problem["fit_keys"], profiles))}
 
-    if not res_all:
-        return np.array([1e6] * len(vec)) 
 
-    return np.asarray(res_all)
+# ───────────────────────────────────────────────
+# 부트스트랩
+# ───────────────────────────────────────────────
+def parse_bootstrap_options(raw) -> dict:
+    """
+    요청의 'bootstrap' 값 → {"n_replicates", "method", "seed"} (끄면 None).
+    정수만 주면 반복 수로 해석, method 는 'case' (기본) 또는 'residual'. 잘못된 값은 ValueError.
+    """
+    if not raw:
+        return None
+    if raw is True:
+        raw = {}
+    elif isinstance(raw, (int, float, str)):
+        raw = {"n_replicates": raw}
+    if not isinstance(raw, dict):
+        raise ValueError("bootstrap must be a number of replicates or an options object.")
+    method = raw.get("method", "case")
+    if method not in ("case", "residual"):
+        raise ValueError(f"Unknown bootstrap method '{method}'. Use 'case' or 'residual'.")
+    try:
+        n_replicates = int(raw.get("n_replicates", BOOTSTRAP_DEFAULT_REPLICATES))
+        seed = raw.get("seed")
+        seed = None if seed is None else int(seed)
+    except (TypeError, ValueError):
+        raise ValueError("bootstrap n_replicates and seed must be integers.")
+    if not 2 <= n_replicates <= BOOTSTRAP_MAX_REPLICATES:
+        raise ValueError(f"bootstrap n_replicates must be between 2 and {BOOTSTRAP_MAX_REPLICATES}.")
+    return {"n_replicates": n_replicates, "method": method, "seed": seed}
+
+
+def _case_resample(group: FitGroup, rng) -> FitGroup:
+    """그룹의 관측 시점(행)을 복원 추출: 모든 매핑이 같은 행 표본을 공유"""
+    rows = rng.integers(0, group.t_eval.size, group.t_eval.size)
+    targets = []
+    for model_var, comp_idx, valid, observed, weights, _ in group.targets:
+        picked = rows[np.isin(rows, valid)]
+        pos = np.searchsorted(valid, picked)
+        targets.append((model_var, comp_idx, picked, observed[pos], {k: w[pos] for k, w in weights.items()}))
+    return group.with_targets(targets)
+
+
+def _residual_resample(group: FitGroup, res: np.ndarray, weighting: str, rng) -> FitGroup:
+    """
+    적합값에 그룹 내 (가중) 잔차를 복원 추출해 더한 관측값으로 교체.
+    res = (sim - obs)·w 이므로 새 관측값 obs* = sim - r*/w = obs + (res - r*)/w (가중치는 원래 값 유지)
+    """
+    drawn = res[rng.integers(0, res.size, res.size)]
+    targets = []
+    for model_var, comp_idx, valid, observed, weights, offset in group.targets:
+        out = slice(offset, offset + valid.size)
+        w = weights.get(weighting, weights["none"])
+        targets.append((model_var, comp_idx, valid, observed + (res[out] - drawn[out]) / w, weights))
+    return group.with_targets(targets)
+
+
+def _bootstrap_task(ode_text, problem, bounds, x0, replicate_groups) -> list:
+    """프로세스 풀 워커용: 재표본 그룹 목록마다 원래 추정치에서 시작해 다시 피팅 → 추정치 (실패 시 None)"""
+    model = get_compiled_model(ode_text)
+    estimates = []
+    for groups in replicate_groups:
+        try:
+            result = _fit_once(model, x0, bounds, dict(problem, fitting_groups=groups))
+            estimates.append(result.x if result.success and np.all(np.isfinite(result.x)) else None)
+        except Exception:
+            estimates.append(None)
+    return estimates
+
+
+def bootstrap(ode_text, problem, bounds, result, options, alpha=0.05, executor=None, progress=None) -> dict:
+    """
+    Bootstrap the fit in ``result``: resample within each fitting group, refit
+    every replicate warm-started from the original estimate (in chunks on the
+    process pool, see parallel.run_chunked) and return percentile intervals, bootstrap standard errors
+    and the parameter correlation matrix.
+
+    'case' resamples observation times with replacement; 'residual' adds
+    resampled weighted residuals to the fitted values. ``progress``
+    (FitProgress) gets ``task_done`` per finished chunk of replicates.
+    """
+    rng = np.random.default_rng(options["seed"])
+    groups = problem["fitting_groups"]
+    x_hat = np.asarray(result.x, dtype=float)
+
+    # result.fun 은 그룹 순서대로 이어 붙인 가중 잔차
+    edges = np.cumsum([0] + [g.n_res for g in groups])
+    group_res = [result.fun[a:b] for a, b in zip(edges[:-1], edges[1:])]
+
+    def resample():
+        if options["method"] == "residual":
+            return [_residual_resample(g, r, problem["weighting"], rng) if g.n_res else g
+                    for g, r in zip(groups, group_res)]
+        return [_case_resample(g, rng) if g.n_res else g for g in groups]
+
+    replicates = [resample() for _ in range(options["n_replicates"])]
+
+    estimates = run_chunked(_bootstrap_task, replicates, (ode_text, problem, bounds, x_hat), executor,
+                            progress.task_done if progress is not None else None)
+
+    ok = np.array([e for e in estimates if e is not None])
+    n_ok = len(ok)
+    if n_ok < 2:
+        raise ValueError("Fewer than two bootstrap replicates converged.")
+    lower, upper = np.percentile(ok, [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = np.corrcoef(ok, rowvar=False) if ok.shape[1] > 1 else np.ones((1, 1))
+    fit_keys = problem["fit_keys"]
+    return {
+        "method": options["method"],
+        "level": 1.0 - alpha,
+        "n_replicates": len(replicates),
+        "n_converged": n_ok,
+        "lower": dict(zip(fit_keys, lower.tolist())),
+        "upper": dict(zip(fit_keys, upper.tolist())),
+        "median": dict(zip(fit_keys, np.median(ok, axis=0).tolist())),
+        "stderr": dict(zip(fit_keys, ok.std(axis=0, ddof=1).tolist())),
+        "correlation": {"names": list(fit_keys), "matrix": np.atleast_2d(corr).tolist()},
+    }
+
+
+def fit_solver_options(model, raw, initials, param_values, groups) -> dict:
+    """피팅용 솔버 옵션: FIT_SOLVER_DEFAULTS 위에 요청 값 ('auto' 는 여기서 한 번만 결정)"""
+    solver_options = {**FIT_SOLVER_DEFAULTS, **parse_solver_options(raw)}
+    if solver_options.get("method") == "auto":
+        # 반복마다 방법이 바뀌면 잔차가 불연속이 되므로 초기 추정치·첫 그룹 기준으로 한 번만 결정
+        solver_options["method"] = resolve_method(model, initials, param_values, groups[0].t_span, groups[0].doses)
+    return solver_options
+
+
+def parse_bounds(fit_keys, param_bounds_dict):
+    """요청의 bounds ({name: [lb, ub]}, 빈 값은 무한대) → least_squares 용 (하한 배열, 상한 배열)"""
+    lower_bounds, upper_bounds = np.array([-np.inf] * len(fit_keys)), np.array([np.inf] * len(fit_keys))
+    for i, key in enumerate(fit_keys):
+        # 그룹별 키('F[1]')에 경계가 없으면 파라미터 이름('F')의 경계를 사용
+        bound_key = key if key in param_bounds_dict else key.split("[")[0]
+        if bound_key in param_bounds_dict:
+            lb_raw, ub_raw = param_bounds_dict[bound_key]
+            if lb_raw is not None and str(lb_raw).strip() != '': lower_bounds[i] = float(lb_raw)
+            if ub_raw is not None and str(ub_raw).strip() != '': upper_bounds[i] = float(ub_raw)
+    return lower_bounds, upper_bounds
 
 
 def _clean_nan(obj):
@@ -103,31 +833,93 @@ def _clean_nan(obj):
     return obj
 
 
-def fit(data: dict) -> dict:
+def _warm_started(data: dict, fitted: dict) -> dict:
+    """캐시된 해(fit key → 값)를 이 요청의 시작값으로 (새 경계 안으로 잘라서) 넣은 사본"""
+    fit_keys = list(data.get("fit_params") or [])
+    group_params = list(data.get("group_params") or [])
+    bounds = data.get("bounds", {})
+    params = dict(data.get("parameters") or {})
+    for key, lb, ub in zip(fit_keys, *parse_bounds(fit_keys, bounds)):
+        if fitted.get(key) is not None and key not in group_params:
+            params[key] = float(np.clip(fitted[key], lb, ub))
+    groups = []
+    for i, group in enumerate(data.get("fitting_groups") or []):
+        starts = dict(group.get("parameters") or {})
+        for name in group_params:
+            key = group_fit_key(name, i)
+            if fitted.get(key) is not None:
+                (lb,), (ub,) = parse_bounds([key], bounds)
+                starts[name] = float(np.clip(fitted[key], lb, ub))
+        groups.append({**group, "parameters": starts} if starts else group)
+    return {**data, "parameters": params, "fitting_groups": groups}
+
+
+def _requested_starts(data: dict) -> dict:
+    """요청의 시작값 (fit key → 값; 그룹 파라미터는 그룹 값, 없으면 공통 값)"""
+    params = data.get("parameters") or {}
+    group_params = list(data.get("group_params") or [])
+    starts = {k: params.get(k) for k in data.get("fit_params") or [] if k not in group_params}
+    for i, group in enumerate(data.get("fitting_groups") or []):
+        for name in group_params:
+            starts[group_fit_key(name, i)] = (group.get("parameters") or {}).get(name, params.get(name))
+    return starts
+
+
+def fit(data: dict, progress: FitProgress = None) -> dict:
     """
     여러 실험 그룹 데이터를 사용하여 파라미터 피팅을 수행합니다.
+    - progress: 주어지면 반복 수·평가 횟수·비용을 갱신하고, 취소 요청 시 status 'cancelled' 반환
+    - mixed_effects 가 주어지면 그룹 = 대상자로 보는 혼합효과 추정 (nlme.fit_mixed_effects)
+    - 결과 캐시 (fit_cache): 같은 문제·시작값은 저장된 결과를 바로 반환하고, 같은 계열(경계·피팅 파라미터만
+      다른 요청)의 이전 해가 있으면 그 해에서 시작 (시작값만 바꾼 요청, 그리고 그 해의 요청과 시작값이 다른
+      파라미터는 요청한 시작값 그대로).
+      "cache": false 면 사용하지 않음.
     """
-    # 1) 캐싱을 사용하여 ODE 파싱 및 lambdify (기존과 동일)
+    use_cache = data.get("cache", True)
+    cache_info = {"status": "off"}
+    if use_cache:
+        try:
+            cache = get_fit_cache()
+            key, problem_key, family = problem_keys(data)
+        except Exception as e:                  # 정규화 실패 (잘못된 관측 데이터 등) → 캐시 없이 진행
+            print(f"Warning: Fit cache disabled for this request: {e}")
+            use_cache = False
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            cached["cache"] = {"status": "hit"}
+            return cached
+        free = set(data.get("fit_params") or []) | set(data.get("group_params") or [])
+        fixed = {k: v for k, v in (data.get("parameters") or {}).items() if k not in free}
+        fit_keys = [k for k in data.get("fit_params") or [] if k not in (data.get("group_params") or [])]
+        fit_keys += [group_fit_key(name, i) for name in data.get("group_params") or []
+                     for i in range(len(data.get("fitting_groups") or []))]
+        start = _requested_starts(data)
+        warm = cache.closest(problem_key, family, fit_keys, fixed, start)
+        cache_info = {"status": "warm" if warm else "miss"}
+        run_data = _warm_started(data, warm) if warm else data
+    else:
+        run_data = data
+
+    if run_data.get("mixed_effects"):
+        from .nlme import fit_mixed_effects
+        res = fit_mixed_effects(run_data, progress=progress)
+    else:
+        res = _fit(run_data, progress)
+
+    if use_cache and res.get("status") == "ok":
+        cache.put(key, problem_key, family, res, {p["name"]: p["value"] for p in res.get("params", [])}, fixed,
+                  start)
+    if res.get("status") == "ok":
+        res["cache"] = cache_info
+    return res
+
+
+def _fit(data: dict, progress: FitProgress = None) -> dict:
+    """fit() 의 본체: 캐시 없이 한 번 피팅"""
+    # 1) 컴파일된 모델 레지스트리에서 RHS·파생 변수 평가기 가져오기
     try:
-        ode_text = data["equations"]
-        cache_key = 'parsed_ode_sympy_' + hashlib.md5(ode_text.encode('utf-8')).hexdigest()
-        parsed = cache.get(cache_key)
-        if parsed is None:
-            parsed = parse_ode_input(ode_text)
-            cache.set(cache_key, parsed, timeout=3600)
-        
-        all_compartments = parsed["compartments"]
-        all_parameters = parsed["parameters"]
-        equations = parsed["equations"]
-        derived_expressions = parsed.get("derived_expressions", {}) # 파생 변수 정보 추출
-
-        comp_syms, param_syms, t_sym = symbols(all_compartments), symbols(all_parameters), symbols('t')
-        y_args = tuple(comp_syms) if isinstance(comp_syms, (list, tuple)) else (comp_syms,)
-        p_args = tuple(param_syms) if isinstance(param_syms, (list, tuple)) else (param_syms,)
-        rhs_exprs = [equations[c] for c in all_compartments]
-        
-        rhs_callable_lambdified = lambdify((t_sym, y_args, p_args), rhs_exprs, modules='numpy')
-        def equations_callable(t, y_array, p_array): return rhs_callable_lambdified(t, y_array, p_array)
+        model = get_compiled_model(data["equations"])
     except Exception as e:
         return {"status": "error", "message": f"ODE Parsing/Compilation Error: {e}"}
 
@@ -143,40 +935,83 @@ def fit(data: dict) -> dict:
 
         param_bounds_dict = data.get("bounds", {})
         weighting = data.get("weighting", "none")
+        # 영속 프로세스 풀: 그룹이 여러 개면 그룹별 시뮬레이션을, 다중 시작점이면 시작점별 피팅을 병렬 수행
+        pool = get_executor() if data.get("parallel", True) else None
+        executor = pool if len(fitting_groups) > 1 else None
+        multistart = parse_multistart_options(data.get("multistart"))
+        profile = parse_profile_options(data.get("profile"))
+        bootstrap_options = parse_bootstrap_options(data.get("bootstrap"))
+
+        # 그룹별 파라미터: 그룹 i 마다 'name[i]' 키로 따로 추정 (초기값은 그룹의 parameters 또는 공통값)
+        group_params = list(data.get("group_params") or [])
+        unknown = [name for name in group_params if name not in model.param_index]
+        if unknown:
+            raise ValueError(f"Unknown group parameter(s): {', '.join(unknown)}")
+        local_keys = [group_fit_key(name, i) for name in group_params for i in range(len(fitting_groups))]
+        fit_keys = [k for k in fit_keys if k not in group_params] + local_keys
+        local_start = {group_fit_key(name, i): (group.get("parameters") or {}).get(name, full_param[name])
+                       for name in group_params for i, group in enumerate(fitting_groups)}
+
+        fixed_param = {k: v for k, v in full_param.items() if k not in fit_keys and k not in group_params}
+        p0 = np.array([local_start[k] if k in local_start else full_param[k] for k in fit_keys], dtype=float)
 
-        fixed_param = {k: v for k, v in full_param.items() if k not in fit_keys}
-        p0 = np.array([full_param[k] for k in fit_keys], dtype=float)
+        # 관측 데이터는 피팅 중 변하지 않으므로 한 번만 NumPy 구조로 변환
+        groups = compile_groups(model, fitting_groups)
+        for i, group in enumerate(groups):
+            group.local_params = {name: group_fit_key(name, i) for name in group_params}
+        mapped = {var for group in fitting_groups for var in (group.get("mappings") or {}).values()}
+        warnings = [msg for name, msg in model.derived_errors.items() if name in mapped]
+
+        solver_options = fit_solver_options(model, data.get("solver_options"), initials, full_param, groups)
+        
+
+        # 잔차 Jacobian: 기본은 전진 민감도 (정확, 반복당 ODE 1회), "fd" 면 유한차분
+        jacobian = data.get("jacobian", "sensitivity")
+        if jacobian not in ("sensitivity", "fd"):
+            raise ValueError(f"Unknown jacobian option '{jacobian}'. Use 'sensitivity' or 'fd'.")
+        sensitivity_keys = None
+        if jacobian == "sensitivity":
+            try:
+                for group in groups:
+                    names = group_columns(model, fit_keys, group)[0]
+                    if names:
+                        model.sensitivity(names)
+                sensitivity_keys = tuple(fit_keys)
+            except Exception as e:
+                print(f"Warning: Could not derive sensitivity equations, using finite differences: {e}")
+                jacobian = "fd"
         
-        lower_bounds, upper_bounds = np.array([-np.inf] * len(fit_keys)), np.array([np.inf] * len(fit_keys))
-        for i, key in enumerate(fit_keys):
-            if key in param_bounds_dict:
-                lb_raw, ub_raw = param_bounds_dict[key]
-                if lb_raw is not None and str(lb_raw).strip() != '': lower_bounds[i] = float(lb_raw)
-                if ub_raw is not None and str(ub_raw).strip() != '': upper_bounds[i] = float(ub_raw)
-        actual_bounds = (lower_bounds, upper_bounds)
+        actual_bounds = parse_bounds(fit_keys, param_bounds_dict)
+        lower_bounds, upper_bounds = actual_bounds
+        if multistart and not (np.all(np.isfinite(lower_bounds)) and np.all(np.isfinite(upper_bounds))):
+            raise ValueError("Multi-start fitting needs finite lower and upper bounds for every fitted parameter.")
     except (KeyError, ValueError) as e:
         return {"status": "error", "message": f"Error preparing fitting parameters: {e}"}
 
 
     # 3) least-squares 피팅 수행
+    solver_stats = {"method": solver_options.get("method", "LSODA"), "nfev": 0, "njev": 0}
+    problem = dict(
+        fit_keys=fit_keys,
+        fixed_param=fixed_param,
+        initials=initials,
+        fitting_groups=groups,
+        weighting=weighting,
+        solver_options=solver_options,
+        sensitivity_keys=sensitivity_keys,
+    )
+    multistart_summary = None
     try:
-        result = least_squares(
-            _residuals,
-            p0,
-            kwargs=dict(
-                fit_keys=fit_keys,
-                fixed_param=fixed_param,
-                equations_callable=equations_callable,
-                all_parameters=all_parameters,
-                comps=all_compartments,
-                initials=initials,
-                fitting_groups=fitting_groups,
-                weighting=weighting,
-                derived_expressions=derived_expressions # <-- 파생 변수 정보 전달
-            ),
-            bounds=actual_bounds,
-            verbose=0
-        )
+        if multistart:
+            # 시작점별 국소 피팅을 풀에서 병렬 수행 → 최적 해에서 아래 피팅으로 마무리 (Jacobian·통계 계산)
+            p0, multistart_summary = _multistart(data["equations"], problem, actual_bounds, p0, multistart,
+                                                 executor=pool, progress=progress)
+            if progress is not None:
+                progress.enter_stage("final fit")
+        result = _fit_once(model, p0, actual_bounds, problem, ode_text=data["equations"], executor=executor,
+                           solver_stats=solver_stats, progress=progress)
+    except FitCancelled:
+        return {"status": "cancelled", "message": "Fit was cancelled."}
     except Exception as e:
          return {"status": "error", "message": f"Optimization algorithm failed: {e}"}
 
@@ -184,7 +1019,8 @@ def fit(data: dict) -> dict:
     fitted_params = dict(zip(fit_keys, result.x))
 
     # 4) 최종 파라미터와 잔차, 자유도, 신뢰 구간 계산
-    final_residuals_unweighted = _residuals(result.x, fit_keys, fixed_param, equations_callable, all_parameters, all_compartments, initials, fitting_groups, 'none', derived_expressions)
+    final_residuals_unweighted = _residuals(result.x, fit_keys, fixed_param, model, initials, groups, 'none', data["equations"], executor,
+                                            solver_options, solver_stats)
     ssr_total = np.sum(np.square(final_residuals_unweighted))
 
     n_params = len(fit_keys)
@@ -196,7 +1032,6 @@ def fit(data: dict) -> dict:
 
     if dof > 0:
         try:
-            from scipy.stats import t
             residual_variance = ssr_total / dof
             J = result.jac
             covariance_matrix = np.linalg.inv(J.T @ J) * residual_variance
@@ -215,16 +1050,49 @@ def fit(data: dict) -> dict:
         except Exception as e:
             print(f"Warning: Could not calculate confidence intervals: {e}")
 
+    # 프로파일 우도 구간 (요청 시): 파라미터별로 풀에서 병렬 계산
+    profile_result = None
+    if profile:
+        try:
+            if progress is not None:
+                progress.enter_stage("profile likelihood", len(fit_keys))
+            profile_result = profile_likelihood(data["equations"], problem, actual_bounds, result, profile,
+                                                executor=pool, progress=progress)
+        except FitCancelled:
+            return {"status": "cancelled", "message": "Fit was cancelled."}
+        except Exception as e:
+            warnings.append(f"Could not calculate profile likelihood intervals: {e}")
+
+    # 부트스트랩 (요청 시): 재표본 피팅을 묶음 단위로 풀에서 병렬 계산
+    bootstrap_result = None
+    if bootstrap_options:
+        try:
+            if progress is not None:
+                progress.enter_stage("bootstrap", bootstrap_options["n_replicates"])
+            bootstrap_result = bootstrap(data["equations"], problem, actual_bounds, result, bootstrap_options,
+                                         executor=pool, progress=progress)
+        except FitCancelled:
+            return {"status": "cancelled", "message": "Fit was cancelled."}
+        except Exception as e:
+            warnings.append(f"Could not calculate bootstrap intervals: {e}")
+
     # params_with_stats를 if 문 바깥에서 생성하여 UnboundLocalError를 방지합니다.
     params_with_stats = []
     for i, key in enumerate(fit_keys):
-        params_with_stats.append({
+        entry = {
             "name": key,
             "value": fitted_params[key],
             "stderr": standard_errors[i],
             "ci_lower": conf_intervals[i][0],
             "ci_upper": conf_intervals[i][1]
-        })
+        }
+        if profile_result:
+            entry["profile_lower"] = profile_result["profiles"][key]["lower"]
+            entry["profile_upper"] = profile_result["profiles"][key]["upper"]
+        if bootstrap_result:
+            entry["bootstrap_lower"] = bootstrap_result["lower"][key]
+            entry["bootstrap_upper"] = bootstrap_result["upper"][key]
+        params_with_stats.append(entry)
 
     final_result = {
         "status": "ok",
@@ -232,9 +1100,20 @@ def fit(data: dict) -> dict:
         "cost": result.cost,
         "ssr_total": ssr_total,
         "nfev": result.nfev,
+        "njev": result.njev,
+        "jacobian": jacobian,
+        "solver": solver_stats,
         "message": result.message,
         "status_code": result.status,
     }
+    if multistart_summary:
+        final_result["multistart"] = multistart_summary
+    if profile_result:
+        final_result["profile"] = profile_result
+    if bootstrap_result:
+        final_result["bootstrap"] = bootstrap_result
+    if warnings:
+        final_result["warnings"] = warnings
 
     # 최종 반환 전에 _clean_nan 함수를 호출하여 모든 NaN/inf 값을 None으로 변환합니다.
     return _clean_nan(final_result)
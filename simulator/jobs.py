@@ -0,0 +1,178 @@
+"""
+jobs.py  ──  비동기 피팅 작업 실행 (브로커 없이 DB + 로컬 스레드 풀)
+───────────────────────────────────────────────
+  submit_fit(data)   : 작업 생성 (같은 입력의 활성 작업이 있으면 그것을 반환) → (job, created)
+  get_job(job_id)    : 작업 조회 (멈춘 실행 작업은 실패로 정리)
+  cancel_job(job_id) : 대기 중이면 즉시 취소, 실행 중이면 취소 요청 표시
+
+작업은 요청을 받은 웹 워커 프로세스의 스레드 풀에서 실행되고, 상태·진행률·
+결과는 FitJob 행에 기록된다. 실행 스레드는 진행 보고 때마다 heartbeat 를
+갱신하고 cancel_requested 를 읽어 least_squares 를 중단한다. 피팅 내부의
+그룹 병렬 계산은 기존 프로세스 풀(parallel.py)을 그대로 사용한다.
+
+대기 작업은 그 프로세스의 메모리 큐에만 있으므로, 같은 프로세스의 실행 작업이
+진행을 보고할 때 대기 작업의 heartbeat 도 함께 갱신한다. 프로세스가 죽어 갱신이
+끊긴 대기 작업은 _reap_stale_jobs 를 호출한 프로세스가 넘겨받아 다시 실행하고,
+갱신이 끊긴 실행 작업은 실패로 정리한다.
+"""
+import json
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .fit_cache import canonical_hash
+from .models import FitJob
+
+PROGRESS_INTERVAL = 1.0      # 진행률 DB 기록 최소 간격 (초)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+_pending = set()             # 이 프로세스의 스레드 풀에 들어가 아직 시작하지 않은 작업 id
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            workers = max(1, int(getattr(settings, 'SIMULATOR_JOB_WORKERS', 2)))
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fit-job')
+        return _executor
+
+
+def _enqueue(job_id) -> None:
+    with _lock:
+        _pending.add(job_id)
+    _get_executor().submit(_run_job, job_id)
+
+
+def fingerprint(data: dict) -> str:
+    """요청 본문의 정규화 JSON (키 정렬·숫자 통일) sha256 → 동일 제출 판별용"""
+    return canonical_hash(data)
+
+
+def _reap_stale_jobs() -> None:
+    """
+    heartbeat 가 끊긴 작업 정리 (프로세스 종료 등). 실행 중이던 작업은 실패로 표시해 중복 제거를
+    풀어 주고, 시작 전이던 대기 작업은 이 프로세스가 넘겨받아 다시 실행한다 (행 단위 조건부 갱신으로
+    여러 프로세스 중 하나만 가져감).
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=int(getattr(settings, 'SIMULATOR_JOB_STALE_SECONDS', 600)))
+    FitJob.objects.filter(status=FitJob.RUNNING, heartbeat_at__lt=cutoff).update(
+        status=FitJob.FAILED, error="Fit worker stopped responding.", finished_at=now)
+    orphaned = FitJob.objects.filter(status=FitJob.QUEUED, heartbeat_at__lt=cutoff).values_list("pk", flat=True)
+    for job_id in list(orphaned):
+        claimed = FitJob.objects.filter(pk=job_id, status=FitJob.QUEUED, heartbeat_at__lt=cutoff).update(
+            heartbeat_at=now)
+        if claimed:
+            print(f"Warning: Re-queuing fit job {job_id}; the worker that queued it stopped responding.")
+            transaction.on_commit(lambda job_id=job_id: _enqueue(job_id))
+
+
+# ───────────────────────────────────────────────
+# 1. 제출 · 조회 · 취소
+# ───────────────────────────────────────────────
+def submit_fit(data: dict) -> Tuple[FitJob, bool]:
+    """
+    Queue a fit for ``data`` (the /fit/ request body) and return (job, created).
+    If an identical submission is already queued or running, that job is
+    returned instead and no new work is started.
+    """
+    from .fitting import _clean_nan
+
+    key = fingerprint(data)
+    _reap_stale_jobs()
+    existing = FitJob.objects.filter(fingerprint=key, status__in=FitJob.ACTIVE_STATUSES).first()
+    if existing is not None:
+        return existing, False
+    try:
+        with transaction.atomic():
+            # NaN/inf 는 JSON 이 아니므로 (SQLite JSON_VALID 검사 실패) /fit/ 결과처럼 None 으로
+            job = FitJob.objects.create(fingerprint=key, payload=_clean_nan(data), heartbeat_at=timezone.now())
+    except IntegrityError:
+        # 다른 요청이 동시에 같은 작업을 만든 경우 (unique_active_fit_job 제약) 만 처리
+        existing = FitJob.objects.filter(fingerprint=key, status__in=FitJob.ACTIVE_STATUSES).first()
+        if existing is None:
+            raise
+        return existing, False
+    transaction.on_commit(lambda: _enqueue(job.id))
+    return job, True
+
+
+def get_job(job_id) -> FitJob:
+    _reap_stale_jobs()
+    return FitJob.objects.get(pk=job_id)
+
+
+def cancel_job(job_id) -> FitJob:
+    """대기 중인 작업은 바로 취소하고, 실행 중인 작업에는 다음 진행 보고 때 중단하도록 표시"""
+    now = timezone.now()
+    FitJob.objects.filter(pk=job_id, status=FitJob.QUEUED).update(
+        status=FitJob.CANCELLED, cancel_requested=True, finished_at=now)
+    FitJob.objects.filter(pk=job_id, status=FitJob.RUNNING).update(cancel_requested=True)
+    return FitJob.objects.get(pk=job_id)
+
+
+# ───────────────────────────────────────────────
+# 2. 실행 (스레드 풀)
+# ───────────────────────────────────────────────
+def _report_progress(job_id, state: dict) -> bool:
+    """진행률·heartbeat 기록 (이 프로세스의 대기 작업 heartbeat 포함) 후 취소 요청 여부 반환 (FitProgress.report 콜백)"""
+    now = timezone.now()
+    FitJob.objects.filter(pk=job_id).update(progress=state, heartbeat_at=now)
+    with _lock:
+        pending = list(_pending)
+    if pending:
+        FitJob.objects.filter(pk__in=pending, status=FitJob.QUEUED).update(heartbeat_at=now)
+    return FitJob.objects.filter(pk=job_id, cancel_requested=True).exists()
+
+
+def _finish(job_id, status: str, **fields) -> None:
+    """
+    실행 결과 기록. 실행 중에 heartbeat 가 끊겨 _reap_stale_jobs 가 실패로 표시한 작업도
+    (이 스레드만 그 작업을 실행하므로) 늦게 나온 결과로 덮어쓴다.
+    """
+    now = timezone.now()
+    fields.setdefault("error", "")          # reaper 가 남긴 메시지 제거
+    updated = FitJob.objects.filter(pk=job_id, status__in=(FitJob.RUNNING, FitJob.FAILED)).update(
+        status=status, finished_at=now, heartbeat_at=now, **fields)
+    if not updated:
+        print(f"Warning: Discarding the {status} result of fit job {job_id}; the job is no longer running.")
+
+
+def _run_job(job_id) -> None:
+    from .fitting import FitProgress, fit
+
+    with _lock:
+        _pending.discard(job_id)
+    close_old_connections()
+    try:
+        now = timezone.now()
+        started = FitJob.objects.filter(pk=job_id, status=FitJob.QUEUED, cancel_requested=False).update(
+            status=FitJob.RUNNING, started_at=now, heartbeat_at=now)
+        if not started:                     # 실행 전에 취소됨
+            return
+        job = FitJob.objects.get(pk=job_id)
+        progress = FitProgress(report=lambda state: _report_progress(job_id, state), interval=PROGRESS_INTERVAL)
+        try:
+            res = fit(job.payload, progress=progress)
+        except Exception as e:
+            traceback.print_exc()
+            _finish(job_id, FitJob.FAILED, progress=progress.state(), error=f"An unexpected error occurred: {e}")
+            return
+
+        status = res.get("status")
+        if status == "cancelled":
+            _finish(job_id, FitJob.CANCELLED, progress=progress.state())
+        elif status == "error":
+            _finish(job_id, FitJob.FAILED, progress=progress.state(), error=res.get("message", ""))
+        else:
+            _finish(job_id, FitJob.SUCCEEDED, progress=progress.state(), result=json.loads(json.dumps(res, default=float)))
+    finally:
+        connection.close()
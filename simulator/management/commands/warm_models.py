@@ -0,0 +1,33 @@
+"""
+python manage.py warm_models [path|glob ...]
+
+SIMULATOR_WARM_MODELS (또는 인자로 준 파일) 의 모델을 미리 컴파일해 디스크 저장소에 넣는다.
+배포 시 한 번 실행해 두면 gunicorn 워커의 예열(post_worker_init) 은 저장소 적재만 하게 된다.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from simulator.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = "Pre-compile the warm-up models (SIMULATOR_WARM_MODELS or the given files) into the model store."
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="*",
+                            help="ODE model files or glob patterns (default: settings.SIMULATOR_WARM_MODELS)")
+
+    def handle(self, *args, **options):
+        report = warm_up(options["paths"] or None)
+        self.stdout.write(f"Imported simulator modules in {report['imports_ms']:.0f} ms")
+        for entry in report["models"]:
+            if "error" in entry:
+                self.stderr.write(self.style.ERROR(f"{entry['path']}: {entry['error']}"))
+            else:
+                self.stdout.write(f"{entry['path']}: {entry['compartments']} compartments, "
+                                  f"{entry['source']} in {entry['ms']:.0f} ms")
+        if not report["models"]:
+            self.stdout.write("No warm-up models configured.")
+        failed = sum("error" in entry for entry in report["models"])
+        if failed:
+            raise CommandError(f"{failed} model(s) failed to compile.")
+        self.stdout.write(self.style.SUCCESS(f"Warm-up finished in {report['total_ms']:.0f} ms"))
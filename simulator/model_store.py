@@ -0,0 +1,141 @@
+"""
+model_store.py  ──  컴파일 모델 디스크 저장소 (gunicorn 워커·재시작 간 공유)
+───────────────────────────────────────────────
+  load(fingerprint)          : 저장된 CompiledModel.to_payload() 또는 None
+  save(fingerprint, payload) : 원자적 기록 후 용량 초과분 정리
+  store_stats()              : hit / miss / write / eviction 카운터
+
+경로  = <SIMULATOR_MODEL_STORE_DIR>/v<STORE_FORMAT>-sympy<버전>/<fp[:2]>/<fp>.json
+        (fp = parser.model_fingerprint → 같은 모델은 같은 파일, 내용 주소 방식)
+형식  = JSON (생성 소스·인덱스·식 트리), SymPy 피클 없음. 형식이나 SymPy 버전이 바뀌면
+        새 디렉터리를 쓰고, 예전 디렉터리 파일은 더 이상 읽히지 않는다.
+정리  = 전체 크기가 SIMULATOR_MODEL_STORE_MAX_BYTES 를 넘으면 예전 버전 디렉터리 파일부터, 그다음
+        최근 사용(mtime) 이 오래된 파일부터 삭제.
+        SIMULATOR_MODEL_STORE_DIR 이 비어 있으면 저장소를 쓰지 않는다.
+"""
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+import sympy
+
+STORE_FORMAT = 2
+STORE_MAX_BYTES = 256 * 1024 * 1024
+
+_lock = threading.Lock()
+_counts = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+
+def _settings():
+    from django.conf import settings
+    root = getattr(settings, 'SIMULATOR_MODEL_STORE_DIR', None)
+    max_bytes = int(getattr(settings, 'SIMULATOR_MODEL_STORE_MAX_BYTES', STORE_MAX_BYTES))
+    return (os.fspath(root) if root else None), max_bytes
+
+
+def _version_dir() -> str:
+    return f"v{STORE_FORMAT}-sympy{sympy.__version__}"
+
+
+def _path(root: str, fingerprint: str) -> str:
+    return os.path.join(root, _version_dir(), fingerprint[:2], f"{fingerprint}.json")
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _counts[name] += 1
+
+
+# ───────────────────────────────────────────────
+# 1. 읽기 · 쓰기
+# ───────────────────────────────────────────────
+def load(fingerprint: str) -> Optional[Dict[str, Any]]:
+    root, _ = _settings()
+    if not root:
+        return None
+    path = _path(root, fingerprint)
+    try:
+        with open(path, encoding='utf-8') as f:
+            payload = json.load(f)
+    except FileNotFoundError:
+        _count("misses")
+        return None
+    except (OSError, ValueError) as e:          # 깨진 파일 → 지우고 다시 컴파일
+        print(f"Warning: Discarding unreadable model store entry {path}: {e}")
+        _remove(path)
+        _count("misses")
+        return None
+    try:
+        os.utime(path)                          # 최근 사용 표시 (정리 순서)
+    except OSError:
+        pass
+    _count("hits")
+    return payload
+
+
+def save(fingerprint: str, payload: Dict[str, Any]) -> None:
+    """같은 디렉터리의 임시 파일에 쓴 뒤 os.replace (동시에 쓰는 워커끼리도 안전)"""
+    root, max_bytes = _settings()
+    if not root:
+        return
+    path = _path(root, fingerprint)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, separators=(',', ':'))
+            os.replace(tmp, path)
+        except BaseException:
+            _remove(tmp)
+            raise
+    except OSError as e:                        # 읽기 전용 파일 시스템 등 → 저장소 없이 계속
+        print(f"Warning: Could not write model store entry {path}: {e}")
+        return
+    _count("writes")
+    _evict(root, max_bytes)
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+# ───────────────────────────────────────────────
+# 2. 용량 정리 & 통계
+# ───────────────────────────────────────────────
+def _evict(root: str, max_bytes: int) -> None:
+    """모든 버전 디렉터리를 합쳐 max_bytes 이하가 될 때까지 삭제: 예전 버전 파일 먼저, 그다음 오래 안 쓴 순"""
+    current = _version_dir()
+    entries = []
+    for dirpath, _, filenames in os.walk(root):
+        is_current = os.path.relpath(dirpath, root).split(os.sep)[0] == current
+        for name in filenames:
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((is_current, st.st_mtime, st.st_size, path))
+    total = sum(size for _, _, size, _ in entries)
+    for _, _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if _remove(path):
+            total -= size
+            _count("evictions")
+
+
+def store_stats() -> Dict[str, Any]:
+    root, max_bytes = _settings()
+    with _lock:
+        hits, misses = _counts["hits"], _counts["misses"]
+        return {"enabled": bool(root), "max_bytes": max_bytes, **_counts,
+                "hit_rate": hits / (hits + misses) if hits + misses else None}
@@ -0,0 +1,72 @@
+"""
+models.py  ──  비동기 피팅 작업 (FitJob)
+───────────────────────────────────────────────
+작업 상태는 기본 DB 에 저장되므로 어느 gunicorn 워커에서든 조회·취소할 수
+있다. 같은 입력(fingerprint)의 활성 작업은 DB 제약으로 하나만 존재한다.
+"""
+import uuid
+
+from django.db import models
+
+
+class FitJob(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+        (CANCELLED, "Cancelled"),
+    ]
+    ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    fingerprint = models.CharField(max_length=64, db_index=True)   # 정규화된 요청 JSON 의 sha256
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED)
+    payload = models.JSONField()
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    progress = models.JSONField(default=dict, blank=True)          # FitProgress.state(): stage, iteration, nfev, cost, done/total
+    cancel_requested = models.BooleanField(default=False)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)     # 진행 보고 시각 (대기 중이면 큐를 가진 프로세스가 갱신)
+
+    class Meta:
+        ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["fingerprint"],
+                condition=models.Q(status__in=["queued", "running"]),
+                name="unique_active_fit_job",
+            ),
+        ]
+
+    def __str__(self):
+        return f"FitJob {self.id} ({self.status})"
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in self.ACTIVE_STATUSES
+
+    def as_dict(self) -> dict:
+        data = {
+            "job_id": str(self.id),
+            "status": self.status,
+            "progress": self.progress,
+            "cancel_requested": self.cancel_requested,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+        if self.status == self.SUCCEEDED:
+            data["result"] = self.result
+        elif self.status == self.FAILED:
+            data["message"] = self.error
+        return data
@@ -0,0 +1,303 @@
+"""
+nlme.py  ──  비선형 혼합효과 (population PK) 추정
+───────────────────────────────────────────────
+  fit_mixed_effects(data, progress=None) : 피팅 그룹 = 대상자, 지정 파라미터에 로그정규 랜덤효과
+
+  θ_i = θ_pop · exp(η_i),  η_i ~ N(0, Ω) (대각),  가중 잔차 r_ij = (f_ij - y_ij)·w_ij ~ N(0, σ²)
+
+FOCE 근사의 EM (반복 2단계) 추정:
+  E 단계  대상자마다 조건부 모드 η̂_i (MAP) 와 Laplace 공분산 C_i = (J_iᵀJ_i/σ² + Ω⁻¹)⁻¹.
+          대상자 묶음을 프로세스 풀에서 병렬 계산하고, 각 워커는 레지스트리의 컴파일된
+          모델·민감도 계를 재사용한다 (J_i 는 전진 민감도, 실패 시 유한차분).
+  M 단계  θ_pop ← θ_pop·exp(mean η̂),  Ω ← mean(η̂η̂ᵀ + C_i) 의 대각,
+          σ² ← Σ(‖r_i‖² + tr(J_i C_i J_iᵀ)) / N,
+          랜덤효과가 없는 고정효과는 η̂ 를 고정한 pooled 최소제곱으로 갱신.
+목적함수 (OFV) 는 조건부 모드에서의 Laplace 근사 -2 log L (가중치 상수항 제외).
+"""
+import numpy as np
+from scipy.optimize import least_squares
+
+from .compiler import get_compiled_model
+from .fitting import (FitCancelled, _clean_nan, _fit_once, _group_residuals, compile_groups, fit_solver_options,
+                      group_fit_key, parse_bounds)
+from .parallel import get_executor, run_chunked
+
+DEFAULT_CV = 0.3             # random_effects 를 목록으로만 주었을 때의 초기 CV
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-4             # 연속 OFV 의 상대 변화가 이보다 작으면 수렴
+
+
+# ───────────────────────────────────────────────
+# 1. 옵션
+# ───────────────────────────────────────────────
+def parse_mixed_effects_options(raw, fit_keys) -> dict:
+    """
+    요청의 'mixed_effects' 값 → {"random_effects": {name: 초기 CV}, "max_iter", "tol"}.
+    random_effects 는 이름 목록 또는 {name: CV}; 모두 fit_params 에 있어야 한다. 잘못된 값은 ValueError.
+    """
+    if raw is True:
+        raw = {}
+    if not isinstance(raw, dict):
+        raise ValueError("mixed_effects must be true or an options object.")
+    effects = raw.get("random_effects") or {}
+    if isinstance(effects, (list, tuple)):
+        effects = {name: DEFAULT_CV for name in effects}
+    if not isinstance(effects, dict) or not effects:
+        raise ValueError("mixed_effects needs at least one parameter in random_effects.")
+    missing = [name for name in effects if name not in fit_keys]
+    if missing:
+        raise ValueError(f"Random-effect parameter(s) must also be fitted: {', '.join(missing)}")
+    try:
+        effects = {name: float(cv) for name, cv in effects.items()}
+        max_iter = int(raw.get("max_iter", MAX_ITERATIONS))
+        tol = float(raw.get("tol", TOLERANCE))
+    except (TypeError, ValueError):
+        raise ValueError("mixed_effects CVs, max_iter and tol must be numbers.")
+    if any(cv <= 0 for cv in effects.values()):
+        raise ValueError("Initial random-effect CVs must be positive.")
+    if max_iter < 1 or tol <= 0:
+        raise ValueError("mixed_effects max_iter and tol must be positive.")
+    return {"random_effects": effects, "max_iter": max_iter, "tol": tol}
+
+
+# ───────────────────────────────────────────────
+# 2. E 단계: 대상자별 조건부 모드
+# ───────────────────────────────────────────────
+def _conditional_mode(model, group, base_values, re_names, theta_re, omega_sd, sigma, eta0, initials,
+                      weighting, solver_options, use_sensitivity) -> dict:
+    """
+    한 대상자의 η̂ = argmin ‖r(η)‖²/σ² + Σ(η/ω)² 와 Laplace 항.
+    반환: eta, cov (C_i), ssr (‖r‖²), trace (tr(J C Jᵀ)), logdet (log|H|), n, nfev, success
+    """
+    cache = {"nfev": 0}
+
+    def evaluate(eta):
+        if cache.get("eta") is None or not np.array_equal(cache["eta"], eta):
+            values = {**base_values, **dict(zip(re_names, (theta_re * np.exp(eta)).tolist()))}
+            res, jac, stats = _group_residuals(model, values, initials, group, weighting, solver_options,
+                                               re_names if use_sensitivity else None)
+            cache.update(eta=np.array(eta, dtype=float), res=res, jac=jac)
+            cache["nfev"] += stats.get("nfev", 0)
+        return cache
+
+    def fun(eta):
+        return np.concatenate([evaluate(eta)["res"] / sigma, eta / omega_sd])
+
+    def jac(eta):
+        # θ_i = θ_pop·exp(η) 이므로 ∂r/∂η = ∂r/∂θ · θ_i
+        c = evaluate(eta)
+        return np.vstack([c["jac"] * (theta_re * np.exp(eta)) / sigma, np.diag(1.0 / omega_sd)])
+
+    n = group.n_res
+    try:
+        result = least_squares(fun, eta0, jac=jac if use_sensitivity else '2-point')
+    except Exception:
+        return {"eta": np.array(eta0, dtype=float), "success": False, "n": n, "nfev": cache["nfev"]}
+
+    J = result.jac[:n] * sigma
+    H = J.T @ J / sigma ** 2 + np.diag(1.0 / omega_sd ** 2)
+    cov = np.linalg.inv(H)
+    r = result.fun[:n] * sigma
+    return {
+        "eta": result.x,
+        "cov": cov,
+        "ssr": float(r @ r),
+        "trace": float(np.trace(J @ cov @ J.T)),
+        "logdet": float(np.linalg.slogdet(H)[1]),
+        "n": n,
+        "nfev": cache["nfev"],
+        "success": bool(np.all(np.isfinite(r))),
+    }
+
+
+def _conditional_task(ode_text, re_names, theta_re, omega_sd, sigma, initials, weighting, solver_options,
+                      use_sensitivity, subjects) -> list:
+    """프로세스 풀 워커용: (group, base_values, eta0) 묶음의 조건부 모드 (레지스트리 모델 재사용)"""
+    model = get_compiled_model(ode_text)
+    return [_conditional_mode(model, group, base_values, re_names, theta_re, omega_sd, sigma, eta0, initials,
+                              weighting, solver_options, use_sensitivity)
+            for group, base_values, eta0 in subjects]
+
+
+# ───────────────────────────────────────────────
+# 3. 추정
+# ───────────────────────────────────────────────
+def fit_mixed_effects(data: dict, progress=None) -> dict:
+    """
+    Nonlinear mixed-effects fit of ``data`` (the /fit/ payload plus a
+    ``mixed_effects`` block): every fitting group is one subject, parameters in
+    ``random_effects`` get log-normal between-subject variability, the other
+    ``fit_params`` are fixed effects. Returns population estimates, Ω (as
+    variance and CV), σ, the OFV history, η-shrinkage and per-subject estimates.
+    """
+    try:
+        model = get_compiled_model(data["equations"])
+    except Exception as e:
+        return {"status": "error", "message": f"ODE Parsing/Compilation Error: {e}"}
+
+    try:
+        initials = data["initials"]
+        full_param = data["parameters"]
+        fit_keys = list(data["fit_params"])
+        fitting_groups = data.get("fitting_groups", [])
+        if len(fitting_groups) < 2:
+            raise ValueError("Mixed-effects fitting needs at least two fitting groups (subjects).")
+        for option in ("group_params", "multistart", "profile", "bootstrap"):
+            if data.get(option):
+                raise ValueError(f"'{option}' cannot be combined with mixed_effects.")
+        options = parse_mixed_effects_options(data.get("mixed_effects"), fit_keys)
+        weighting = data.get("weighting", "none")
+        executor = get_executor() if data.get("parallel", True) else None
+
+        re_names = tuple(options["random_effects"])
+        fixed_keys = [k for k in fit_keys if k not in options["random_effects"]]
+        theta_re = np.array([float(full_param[k]) for k in re_names])
+        if np.any(theta_re <= 0):
+            raise ValueError("Parameters with random effects must have positive initial values.")
+        theta_fixed = np.array([float(full_param[k]) for k in fixed_keys])
+        fixed_param = {k: v for k, v in full_param.items() if k not in fit_keys}
+        re_bounds = parse_bounds(list(re_names), data.get("bounds", {}))
+        fixed_bounds = parse_bounds(fixed_keys, data.get("bounds", {}))
+
+        groups = compile_groups(model, fitting_groups)
+        solver_options = fit_solver_options(model, data.get("solver_options"), initials, full_param, groups)
+
+        use_sensitivity = data.get("jacobian", "sensitivity") == "sensitivity"
+        if use_sensitivity:
+            try:
+                model.sensitivity(re_names)
+                if fixed_keys:
+                    model.sensitivity(tuple(fixed_keys))
+            except Exception as e:
+                print(f"Warning: Could not derive sensitivity equations, using finite differences: {e}")
+                use_sensitivity = False
+    except (KeyError, ValueError) as e:
+        return {"status": "error", "message": f"Error preparing mixed-effects fit: {e}"}
+
+    S, k = len(groups), len(re_names)
+    omega2 = np.log1p(np.array([options["random_effects"][name] for name in re_names]) ** 2)
+    eta = np.zeros((S, k))
+    n_total = sum(g.n_res for g in groups)
+    if n_total == 0:
+        return {"status": "error", "message": "No observations could be mapped to model variables."}
+
+    def population_values():
+        return {**fixed_param, **dict(zip(fixed_keys, theta_fixed.tolist())), **dict(zip(re_names, theta_re.tolist()))}
+
+    # σ 초기값: 랜덤효과 없이 (η = 0) 계산한 가중 잔차의 RMS
+    base = population_values()
+    res0 = np.concatenate([_group_residuals(model, base, initials, g, weighting, solver_options)[0] for g in groups])
+    sigma2 = float(np.nanmean(res0 ** 2)) if np.isfinite(res0).any() else 1.0
+    sigma2 = sigma2 if sigma2 > 0 else 1.0
+
+    history = []
+    ode_nfev = 0
+    converged = False
+    failed = []
+    iteration = 0
+    try:
+        for iteration in range(1, options["max_iter"] + 1):
+            # ── E 단계 (대상자 묶음 병렬, 묶음이 끝날 때마다 진행 보고·취소 확인)
+            if progress is not None:
+                progress.enter_stage("mixed effects", S)
+            base = population_values()
+            omega_sd = np.sqrt(omega2)
+            sigma = np.sqrt(sigma2)
+            modes = run_chunked(_conditional_task, [(g, base, eta[i]) for i, g in enumerate(groups)],
+                                (data["equations"], re_names, theta_re, omega_sd, sigma, initials, weighting,
+                                 solver_options, use_sensitivity),
+                                executor, progress.task_done if progress is not None else None)
+            ode_nfev += sum(m["nfev"] for m in modes)
+            ok = [i for i, m in enumerate(modes) if m["success"]]
+            failed = [i for i in range(S) if i not in ok]
+            if not ok:
+                return {"status": "error", "message": "Conditional estimation failed for every subject."}
+            for i in ok:
+                eta[i] = modes[i]["eta"]
+
+            log_det_omega = float(np.sum(np.log(omega2)))
+            ofv = sum(modes[i]["ssr"] / sigma2 + modes[i]["n"] * np.log(2 * np.pi * sigma2)
+                      + float(np.sum(eta[i] ** 2 / omega2)) + log_det_omega + modes[i]["logdet"] for i in ok)
+            history.append(ofv)
+
+            # ── M 단계
+            shift = eta[ok].mean(axis=0)
+            new_theta = np.clip(theta_re * np.exp(shift), *re_bounds)
+            eta[ok] += np.log(theta_re / new_theta)           # 개인 파라미터 θ_i 는 그대로 유지
+            theta_re = new_theta
+            omega2 = np.maximum(np.mean([eta[i] ** 2 + np.diag(modes[i]["cov"]) for i in ok], axis=0), 1e-8)
+            sigma2 = max(sum(modes[i]["ssr"] + modes[i]["trace"] for i in ok) / sum(modes[i]["n"] for i in ok),
+                         1e-12)
+
+            if fixed_keys:
+                theta_fixed = _update_fixed_effects(model, data["equations"], groups, ok, fixed_keys, theta_fixed,
+                                                    fixed_bounds, fixed_param, re_names, theta_re, eta, initials,
+                                                    weighting, solver_options, use_sensitivity, executor)
+
+            if progress is not None:
+                progress.iteration, progress.cost = iteration, ofv      # 다음 반복의 enter_stage 에서 보고
+            if len(history) > 1 and abs(history[-2] - ofv) <= options["tol"] * (abs(ofv) + 1.0):
+                converged = True
+                break
+    except FitCancelled:
+        return {"status": "cancelled", "message": "Fit was cancelled."}
+
+    omega_sd = np.sqrt(omega2)
+    eta_ok = eta[[i for i in range(S) if i not in failed]]
+    shrinkage = 1.0 - eta_ok.std(axis=0, ddof=1) / omega_sd if len(eta_ok) > 1 else np.full(k, np.nan)
+    population = {**dict(zip(fixed_keys, theta_fixed.tolist())), **dict(zip(re_names, theta_re.tolist()))}
+    individual = []
+    for i in range(S):
+        params = {**population, **dict(zip(re_names, (theta_re * np.exp(eta[i])).tolist()))}
+        individual.append({"group": i, "eta": dict(zip(re_names, eta[i].tolist())),
+                           "params": {name: params[name] for name in fit_keys}, "failed": i in failed})
+
+    result = {
+        "status": "ok",
+        "method": "mixed_effects",
+        "params": [{"name": name, "value": population[name]} for name in fit_keys],
+        "omega": {name: {"variance": float(w2), "cv": float(np.sqrt(np.expm1(w2)))}
+                  for name, w2 in zip(re_names, omega2)},
+        "sigma": float(np.sqrt(sigma2)),
+        "ofv": history[-1],
+        "ofv_history": history,
+        "iterations": iteration,
+        "converged": converged,
+        "shrinkage": dict(zip(re_names, shrinkage.tolist())),
+        "individual": individual,
+        "jacobian": "sensitivity" if use_sensitivity else "fd",
+        "solver": {"method": solver_options.get("method", "LSODA"), "nfev": ode_nfev},
+    }
+    warnings = [msg for name, msg in model.derived_errors.items()
+                if name in {v for g in fitting_groups for v in (g.get("mappings") or {}).values()}]
+    if failed:
+        warnings.append(f"Conditional estimation failed for group(s) {failed} in the last iteration.")
+    if not converged:
+        warnings.append(f"Mixed-effects estimation did not converge within {options['max_iter']} iterations.")
+    if warnings:
+        result["warnings"] = warnings
+    return _clean_nan(result)
+
+
+def _update_fixed_effects(model, ode_text, groups, ok, fixed_keys, theta_fixed, bounds, fixed_param, re_names,
+                          theta_re, eta, initials, weighting, solver_options, use_sensitivity, executor) -> np.ndarray:
+    """η̂ 를 고정하고 랜덤효과가 없는 고정효과를 pooled 최소제곱으로 갱신 (개인 값은 그룹별 파라미터로 전달)"""
+    subjects, individual = [], {}
+    for i in ok:
+        group = groups[i].with_targets([target[:5] for target in groups[i].targets])
+        group.local_params = {name: group_fit_key(name, i) for name in re_names}
+        individual.update({group_fit_key(name, i): float(v) for name, v in zip(re_names, theta_re * np.exp(eta[i]))})
+        subjects.append(group)
+    problem = dict(
+        fit_keys=list(fixed_keys),
+        fixed_param={**fixed_param, **individual},
+        initials=initials,
+        fitting_groups=subjects,
+        weighting=weighting,
+        solver_options=solver_options,
+        sensitivity_keys=tuple(fixed_keys) if use_sensitivity else None,
+    )
+    x0 = np.clip(theta_fixed, *bounds)
+    result = _fit_once(model, x0, bounds, problem, ode_text=ode_text,
+                       executor=executor if len(subjects) > 1 else None)
+    return result.x
@@ -0,0 +1,120 @@
+"""
+parallel.py  ──  피팅/시뮬레이션용 영속 프로세스 풀
+───────────────────────────────────────────────
+  get_executor()            : 프로세스당 하나의 ProcessPoolExecutor (지연 생성)
+  run_ordered(fn, arg_list) : 풀에서 실행하고 입력 순서대로 결과 수집
+  run_chunked(fn, items, …) : 많은 작은 작업을 워커당 몇 개의 묶음으로 나눠 실행
+
+두 함수 모두 on_done(n) 을 받으면 작업(묶음)이 끝날 때마다 완료된 항목 수로 호출한다
+(피팅 진행 보고·취소 확인용). on_done 이 예외를 던지면 아직 시작하지 않은 작업을 취소하고 전파.
+
+워커 프로세스는 요청 사이에도 살아 있으므로, 각 워커는 compiler 의
+레지스트리에 모델을 한 번만 컴파일해 두고 재사용한다. 워커 내부에서는
+다시 풀을 만들지 않는다 (get_executor() → None).
+"""
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional, Sequence
+
+from django.conf import settings
+
+CHUNKS_PER_WORKER = 4        # run_chunked: 워커당 묶음 수 (부하 균형 vs 직렬화 비용)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+_in_worker = False
+
+
+def _init_worker():
+    global _in_worker
+    _in_worker = True
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pk_simulator.settings')
+    import django
+    django.setup()
+
+
+def worker_count() -> int:
+    return int(getattr(settings, 'SIMULATOR_WORKERS', os.cpu_count() or 1))
+
+
+def get_executor() -> Optional[ProcessPoolExecutor]:
+    """Shared process pool, or None inside a worker or when only one worker is configured."""
+    global _executor
+    if _in_worker or worker_count() <= 1:
+        return None
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=worker_count(), initializer=_init_worker)
+        return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+atexit.register(shutdown_executor)
+
+
+def _run_serial(fn: Callable, arg_list: Sequence[tuple], on_done=None, sizes=None) -> List:
+    out = []
+    for i, args in enumerate(arg_list):
+        out.append(fn(*args))
+        if on_done is not None:
+            on_done(sizes[i] if sizes else 1)
+    return out
+
+
+def run_ordered(fn: Callable, arg_list: Sequence[tuple], executor: Optional[ProcessPoolExecutor] = None,
+                on_done: Optional[Callable[[int], None]] = None, sizes: Optional[Sequence[int]] = None) -> List:
+    """
+    Call ``fn(*args)`` for every tuple in ``arg_list`` and return the results in
+    input order. Runs on ``executor`` when given (and there is more than one
+    task); if the pool breaks, it is discarded and the work is redone in-process.
+
+    ``on_done(n)`` is called in the calling process as each task finishes
+    (in completion order), with ``sizes[i]`` (default 1) for task ``i``.
+    """
+    if executor is None or len(arg_list) <= 1:
+        return _run_serial(fn, arg_list, on_done, sizes)
+    futures = []
+    try:
+        futures = [executor.submit(fn, *args) for args in arg_list]
+        index = {f: i for i, f in enumerate(futures)}
+        for f in as_completed(futures):
+            f.result()                                  # 작업 예외는 끝나는 즉시 전파
+            if on_done is not None:
+                on_done(sizes[index[f]] if sizes else 1)
+        return [f.result() for f in futures]
+    except BrokenProcessPool:
+        shutdown_executor()
+        return _run_serial(fn, arg_list, on_done, sizes)
+    except BaseException:
+        for f in futures:
+            f.cancel()
+        raise
+
+
+def run_chunked(fn: Callable, items: Sequence, common: tuple = (), executor: Optional[ProcessPoolExecutor] = None,
+                on_done: Optional[Callable[[int], None]] = None) -> List:
+    """
+    Call ``fn(*common, chunk)`` on interleaved chunks of ``items``, where ``fn``
+    returns one result per item of its chunk, and return the per-item results
+    in input order. Without an executor every item is its own chunk (nothing
+    to serialize, and ``on_done`` fires per item).
+    """
+    items = list(items)
+    n_chunks = len(items) if executor is None else max(1, min(len(items), worker_count() * CHUNKS_PER_WORKER))
+    n_chunks = max(1, n_chunks)
+    chunks = [items[i::n_chunks] for i in range(n_chunks)]
+    out = [None] * len(items)
+    # 묶음은 items[i::n_chunks] 로 나눴으므로 같은 간격으로 되돌려 결합
+    parts = run_ordered(fn, [(*common, chunk) for chunk in chunks], executor, on_done, [len(c) for c in chunks])
+    for i, part in enumerate(parts):
+        out[i::n_chunks] = part
+    return out
@@ -7,15 +7,22 @@ parser.py  ──  ODE 텍스트 → JSON-ready 파싱 결과
   derived_expressions : Dict[str,str]      (자동 계산·표기용)
   processed_ode       : str                (파생 치환된 텍스트)
   equations           : Dict[str,Expr]     (SymPy 수치식)
+
+model_fingerprint(text) : 전처리·분류된 행으로 만든 정규 지문 (공백·행 순서·^/** 차이 무시)
 """
+import hashlib
+import io
 import re
+import tokenize
+from functools import lru_cache
 from collections import defaultdict, deque
 from typing import Dict, List, Set, Tuple, Any
 
 from sympy import (
     symbols, sqrt, sin, cos, tan, exp, log, Abs,
-    asin, acos, atan, sinh, cosh, tanh, parse_expr, Expr
+    asin, acos, atan, sinh, cosh, tanh, parse_expr, Expr, Add
 )
+from sympy.core.parameters import evaluate
 
 # ───────────────────────────────────────────────
 # 0. 상수 & 정규식
@@ -55,6 +62,33 @@ def _classify(lines: List[str]):
             param_rows[lhs] = rhs
     return ode_rows, param_rows
 
+def _canonical_rhs(rhs: str) -> str:
+    """토큰 사이 공백을 하나로 통일 (토큰화 실패 시 원문 그대로 → 오류 모델끼리만 같은 지문)"""
+    try:
+        toks = [tok.string for tok in tokenize.generate_tokens(io.StringIO(rhs).readline)
+                if tok.type not in (tokenize.NEWLINE, tokenize.NL, tokenize.ENDMARKER,
+                                    tokenize.INDENT, tokenize.DEDENT, tokenize.COMMENT)]
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return rhs
+    return " ".join(toks)
+
+@lru_cache(maxsize=256)
+def model_fingerprint(text: str) -> str:
+    """
+    Canonical sha256 of an ODE text, built from the rows ``_classify`` keeps.
+
+    Texts that parse to the same model share a fingerprint: blank or
+    unclassified lines, non-ASCII characters, ``^`` vs ``**``, spacing
+    between tokens and the order of rows do not matter (duplicate rows keep
+    the last definition, as in the parser).
+    """
+    ode_rows, param_rows = _classify(_preprocess(text))
+    odes = dict(ode_rows)
+    canonical = "\n".join(
+        [f"d{c}dt={_canonical_rhs(odes[c])}" for c in sorted(odes)] +
+        [f"{p}={_canonical_rhs(param_rows[p])}" for p in sorted(param_rows)])
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
 # ───────────────────────────────────────────────
 # 2. 심볼 테이블 초기 구축
 # ───────────────────────────────────────────────
@@ -76,56 +110,81 @@ def _initial_symbols(ode_rows, param_rows):
 # ───────────────────────────────────────────────
 # 3. 파라미터 RHS 파싱 + 의존성 그래프
 # ───────────────────────────────────────────────
+def _evaluated(expr):
+    """
+    평가 없이 만든 트리를 아래에서부터 노드당 한 번 평가. 중첩된 Add 사슬은 (재귀 없이)
+    항을 모아 Add 한 번으로 만들고, 나머지 노드는 일반 파싱과 같은 순서로 평가한다.
+    """
+    if not getattr(expr, "args", ()):
+        return expr
+    if expr.func is Add:
+        terms, stack = [], [expr]
+        while stack:
+            node = stack.pop()
+            if node.func is Add:
+                stack.extend(reversed(node.args))
+            else:
+                terms.append(_evaluated(node))
+        return Add(*terms)
+    return expr.func(*[_evaluated(a) for a in expr.args])
+
+def _parse(rhs: str, symtbl) -> Expr:
+    """
+    parse_expr 와 같은 식. 다만 a + b + c + ... 를 왼쪽부터 하나씩 더하면 항이 늘 때마다
+    합 전체를 다시 정렬해 항 수의 제곱이 걸리므로, 평가를 끈 채 트리만 만든 뒤
+    _evaluated 로 합을 한 번에 평가한다 (PBPK 정맥 유입식처럼 구획 수만큼 항이 있는 행).
+    """
+    with evaluate(False):
+        expr = parse_expr(rhs, local_dict=symtbl)
+    return _evaluated(expr)
+
 def _parse_param_defs(param_rows, symtbl):
-    parsed, graph, rev = {}, defaultdict(set), defaultdict(set)
+    """정의 RHS 를 (심볼만 있는 테이블로) 한 번씩 파싱. 실패한 정의는 None + errors 에 예외 보관"""
+    parsed, errors, graph, rev = {}, {}, defaultdict(set), defaultdict(set)
     for p, expr in param_rows.items():
         try:
-            pe = parse_expr(expr, local_dict=symtbl)
-            parsed[p] = pe
+            pe = _parse(expr, symtbl)
             deps = {str(s) for s in pe.free_symbols if str(s) != "t"}
-            graph[p] = deps
-            for d in deps:
-                rev[d].add(p)
-        except Exception:
+        except Exception as e:
             parsed[p] = None          # 파싱 실패 → 값 미정 (숫자 오류 등)
-    return parsed, graph, rev
+            errors[p] = e
+            continue
+        parsed[p] = pe
+        graph[p] = deps
+        for d in deps:
+            rev[d].add(p)
+    return parsed, errors, graph, rev
 
 def _topo(graph, rev):
+    """의존 대상이 먼저 오는 위상 순서 (순환에 걸린 정의는 빠짐 → _resolve_derived 에서 오류)"""
     nodes = set(graph) | {d for deps in graph.values() for d in deps}
-    indeg = {n: 0 for n in nodes}
-    for deps in graph.values():
-        for d in deps:
-            indeg[d] += 1
-    q = deque([n for n in nodes if indeg[n] == 0])
+    indeg = {n: len(graph.get(n, ())) for n in nodes}
+    q = deque(sorted(n for n in nodes if indeg[n] == 0))
     order = []
     while q:
         n = q.popleft()
         order.append(n)
-        for nb in rev.get(n, []):
+        for nb in sorted(rev.get(n, ())):
             indeg[nb] -= 1
             if indeg[nb] == 0:
                 q.append(nb)
     return order
 
+def _cycle(graph, stuck) -> List[str]:
+    """위상 순서에서 빠진 정의들 중 한 순환 경로 [A, B, ..., A] (빠진 정의는 모두 빠진 의존 대상을 가짐)"""
+    path, seen, node = [], {}, min(stuck)
+    while node not in seen:
+        seen[node] = len(path)
+        path.append(node)
+        node = min(d for d in graph[node] if d in stuck)
+    return path[seen[node]:] + [node]
+
 # ───────────────────────────────────────────────
 # 4. 파생/입력 구분
 # ───────────────────────────────────────────────
-def _categorize(param_rows, topo_order, parsed_defs,
-                symtbl, comps) -> Tuple[Set[str], Dict[str,str]]:
+def _categorize(param_rows, symtbl, comps) -> Tuple[Set[str], Dict[str,str]]:
     defined_syms = set(param_rows)           # LHS 등장 → 파생으로 고정
     derived: Dict[str,str] = {k: v for k, v in param_rows.items()}  # 일괄 등록
-    base: Set[str] = set()
-
-    # 위상 정렬 순서대로 정적 파생 수치 평가(원할 때)
-    for p in topo_order:
-        if p not in defined_syms:
-            continue
-        expr = parsed_defs.get(p)
-        if expr is None:
-            continue
-        fsyms = {str(s) for s in expr.free_symbols}
-        if fsyms <= symtbl.keys():
-            symtbl[p] = expr              # 정적 파생 값 갱신
 
     # 입력 파라미터 = 모든 심볼 후보 ─ 컴파트먼트 ─ 파생
     all_syms = set(symtbl) - comps - _BUILTIN.keys()
@@ -133,31 +192,35 @@ def _categorize(param_rows, topo_order, parsed_defs,
     return base, derived
 
 # ───────────────────────────────────────────────
-# 5. ODE 치환 & SymPy 방정식
+# 5. 파생 정의 전개 & ODE 치환
 # ───────────────────────────────────────────────
-def _substitute_odes(ode_rows, derived, symtbl):
-    out = []
-    # 1. 먼저 SymPy expr 로 파생 dict 구성
-    derived_sympy = {symbols(k): parse_expr(v, local_dict=symtbl)
-                     for k, v in derived.items()}
+def _resolve_derived(parsed_defs, errors, graph, topo_order) -> Dict[Any, Expr]:
+    """
+    위상 순서대로 각 정의에 이미 전개된 직접 의존 정의만 대입 (정의당 xreplace 1회)
+    → {Symbol: 입력 파라미터·컴파트먼트만으로 된 식}
+    """
+    for e in errors.values():
+        raise e                       # ODE 에 대입할 수 없는 정의가 있으면 파싱 오류
+    stuck = set(parsed_defs) - set(topo_order)
+    if stuck:                         # 순환 정의 (A = B*2, B = A+1) 는 전개할 수 없음
+        raise ValueError(f"Cyclic derived definitions: {' -> '.join(_cycle(graph, stuck))}")
+    resolved: Dict[str, Expr] = {}
+    for p in topo_order:
+        expr = parsed_defs.get(p)
+        if expr is None:              # 입력 파라미터·컴파트먼트
+            continue
+        subs = {symbols(d): resolved[d] for d in graph[p] if d in resolved}
+        resolved[p] = expr.xreplace(subs) if subs else expr
+    return {symbols(p): expr for p, expr in resolved.items()}
 
+def _substitute_odes(ode_rows, resolved, symtbl):
+    """각 ODE RHS 를 한 번 파싱하고 전개된 정의를 한 번에 대입 → (처리된 행, {comp: Expr})"""
+    out, equations = [], {}
     for comp, rhs in ode_rows:
-        expr = parse_expr(rhs, local_dict=symtbl)
-        # 2. 재귀 치환: derived 기호가 없어질 때까지 반복
-        prev_free = None
-        while prev_free != expr.free_symbols & derived_sympy.keys():
-            prev_free = expr.free_symbols & derived_sympy.keys()
-            expr = expr.xreplace(derived_sympy)
+        expr = _parse(rhs, symtbl).xreplace(resolved)
+        equations[comp] = expr
         out.append(f"d{comp}dt = {expr}")
-    return out
-
-def _build_eq(proc_lines, symtbl):
-    eq = {}
-    for ln in proc_lines:
-        lhs, rhs = map(str.strip, ln.split("=", 1))
-        comp = ODE_PAT.match(lhs).group(1)
-        eq[comp] = parse_expr(rhs, local_dict=symtbl)
-    return eq
+    return out, equations
 
 # ───────────────────────────────────────────────
 # 6. 메인 엔트리
@@ -166,16 +229,14 @@ def parse_ode_input(text: str) -> Dict[str, Any]:
     lines                   = _preprocess(text)
     ode_rows, param_rows    = _classify(lines)
 
-    comps, param_syms, symtbl = _initial_symbols(ode_rows, param_rows)
-    parsed_defs, graph, rev   = _parse_param_defs(param_rows, symtbl)
-    topo_order                = _topo(graph, rev)
+    comps, param_syms, symtbl        = _initial_symbols(ode_rows, param_rows)
+    parsed_defs, errors, graph, rev  = _parse_param_defs(param_rows, symtbl)
+    topo_order                       = _topo(graph, rev)
 
-    base_params, derived_exprs = _categorize(
-        param_rows, topo_order, parsed_defs, symtbl, comps
-    )
+    base_params, derived_exprs = _categorize(param_rows, symtbl, comps)
 
-    proc_lines  = _substitute_odes(ode_rows, derived_exprs, symtbl)
-    equations   = _build_eq(proc_lines, symtbl)
+    resolved               = _resolve_derived(parsed_defs, errors, graph, topo_order)
+    proc_lines, equations  = _substitute_odes(ode_rows, resolved, symtbl)
 
     # 최종 반환 딕셔너리. lambdify 관련 키는 제거됨.
     return {
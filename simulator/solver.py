@@ -1,4 +1,5 @@
-from typing import Callable, Dict, List, Sequence, Union
+from collections import deque
+from typing import Callable, Dict, Iterator, List, NamedTuple, Sequence, Tuple, Union
 import numpy as np
 import pandas as pd
 from sympy import lambdify, symbols, Expr
@@ -41,6 +42,435 @@ def generate_rhs_function(
     
     return dydt
 
+class DoseTimeline(NamedTuple):
+    """
+    Dose events compiled into sorted groups of simultaneous events.
+
+    times[k] is the k-th distinct event time; bolus[k] and infusion[k] are the
+    (n_compartments,) amount jumps and infusion-rate changes applied there.
+    """
+    times: np.ndarray
+    bolus: np.ndarray
+    infusion: np.ndarray
+
+    def first_index(self, t: float) -> int:
+        """Index of the first group at or after ``t`` (np.isclose counts as 'at')."""
+        k = int(np.searchsorted(self.times, t, side='left'))
+        if k > 0 and np.isclose(self.times[k - 1], t):
+            k -= 1
+        return k
+
+
+def _dose_times(start: float, repeat_every, repeat_until, t_end: float) -> np.ndarray:
+    """start, start+every, ... (repeat_until 이하, t_end 이하) 투여 시각"""
+    if repeat_every and repeat_every > 0 and repeat_until and start < repeat_until:
+        n_rep = int(np.floor((repeat_until + 1e-9 - start) / repeat_every))
+        times = start + repeat_every * np.arange(n_rep + 1)
+    else:
+        times = np.array([start], dtype=float)
+    return times[times <= t_end + 1e-9]
+
+def build_dose_timeline(doses: List[Dict], comp_map_idx: Dict[str, int], t_span: Sequence[float]) -> DoseTimeline:
+    """
+    Expand dose specs (bolus / infusion, optional repeat_every/repeat_until) into a
+    DoseTimeline. Events whose times are np.isclose are merged into one group.
+    """
+    n = len(comp_map_idx)
+    ev_times, ev_comp, ev_bolus, ev_rate = [], [], [], []
+    for dose_item in doses or []:
+        comp_name = dose_item.get("compartment")
+        if comp_name not in comp_map_idx: continue
+        comp_idx = comp_map_idx[comp_name]
+        typ = dose_item.get("type")
+        amount = float(dose_item.get("amount", 0))
+        duration = float(dose_item.get("duration", 0) or 0)
+        times = _dose_times(float(dose_item.get("start_time", 0)), dose_item.get("repeat_every"),
+                            dose_item.get("repeat_until"), t_span[1])
+
+        if typ == "bolus":
+            ev_times.append(times); ev_comp.append(np.full(times.size, comp_idx))
+            ev_bolus.append(np.full(times.size, amount)); ev_rate.append(np.zeros(times.size))
+        elif typ == "infusion" and duration > 0:
+            rate = amount / duration
+            ends = times + duration
+            ends = ends[ends <= t_span[1] + 1e-9]
+            ev_times += [times, ends]; ev_comp += [np.full(times.size + ends.size, comp_idx)]
+            ev_bolus.append(np.zeros(times.size + ends.size))
+            ev_rate.append(np.concatenate([np.full(times.size, rate), np.full(ends.size, -rate)]))
+
+    if not ev_times:
+        return DoseTimeline(np.empty(0), np.empty((0, n)), np.empty((0, n)))
+
+    times = np.concatenate(ev_times)
+    order = np.argsort(times, kind='stable')
+    times = times[order]
+    comp = np.concatenate(ev_comp)[order]
+    bolus = np.concatenate(ev_bolus)[order]
+    rate = np.concatenate(ev_rate)[order]
+
+    # 인접 시각이 np.isclose 이면 같은 그룹
+    new_group = np.r_[True, ~np.isclose(times[1:], times[:-1])]
+    group_id = np.cumsum(new_group) - 1
+    n_groups = int(group_id[-1]) + 1
+    bolus_mat = np.zeros((n_groups, n))
+    rate_mat = np.zeros((n_groups, n))
+    np.add.at(bolus_mat, (group_id, comp), bolus)
+    np.add.at(rate_mat, (group_id, comp), rate)
+    return DoseTimeline(times[new_group], bolus_mat, rate_mat)
+
+
+class _EvalCursor:
+    """
+    Hands out t_eval points segment by segment, in time order.
+
+    A point belongs to the first segment whose end is ≥ t - 1e-9, so a point
+    at a dose time gets the pre-dose value. Points before ``t_start`` are never
+    handed out.
+    """
+
+    def __init__(self, t_eval: np.ndarray, t_start: float):
+        self.t_eval = t_eval
+        self.order = np.argsort(t_eval, kind='stable')
+        self.sorted = t_eval[self.order]
+        self.pos = int(np.searchsorted(self.sorted, t_start - 1e-9, side='left'))
+
+    def take(self, t_end: float) -> np.ndarray:
+        """Indices (into t_eval) of the not yet handed out points ≤ t_end."""
+        hi = int(np.searchsorted(self.sorted, t_end + 1e-9, side='right'))
+        cols = self.order[self.pos:hi]
+        self.pos = max(self.pos, hi)
+        return cols
+
+    def rest(self) -> np.ndarray:
+        cols = self.order[self.pos:]
+        self.pos = self.sorted.size
+        return cols
+
+
+def regimen_period(doses: List[Dict]) -> Union[float, None]:
+    """
+    Common dosing interval of the repeated doses (``repeat_every`` with
+    ``repeat_until``), or None if there are none or their intervals differ.
+    """
+    periods = {float(d["repeat_every"]) for d in doses or []
+               if d.get("repeat_every") and float(d["repeat_every"]) > 0 and d.get("repeat_until")}
+    if not periods:
+        return None
+    period = min(periods)
+    return period if all(np.isclose(p, period) for p in periods) else None
+
+
+def _repeat_cycles(timeline: DoseTimeline, g_prev: int, g: int, period: float, t_end: float) -> int:
+    """
+    Number of whole periods after group ``g`` whose event groups repeat those of
+    the cycle [times[g_prev], times[g]) (same offsets, same bolus/infusion) and
+    that end no later than ``t_end``.
+    """
+    times = timeline.times
+    c = g - g_prev
+    ref_t = times[g_prev:g] - times[g_prev]
+    ref_b, ref_i = timeline.bolus[g_prev:g], timeline.infusion[g_prev:g]
+    m = 0
+    while True:
+        start = times[g] + m * period
+        a, b = g + m * c, g + (m + 1) * c
+        if start + period > t_end + 1e-9 or b > len(times):
+            return m
+        if not (np.allclose(times[a:b] - start, ref_t, atol=1e-9)
+                and np.array_equal(timeline.bolus[a:b], ref_b)
+                and np.array_equal(timeline.infusion[a:b], ref_i)):
+            return m
+        if b < len(times) and times[b] < start + period - 1e-9:
+            return m
+        m += 1
+
+
+def _ss_converged(delta: float, delta_prev: float, y: np.ndarray, rtol: float) -> bool:
+    """
+    Periodic steady-state test on successive cycle-to-cycle changes (max-norm).
+
+    Assuming geometric convergence with ratio rho = delta / delta_prev, the
+    remaining distance to steady state is delta * rho / (1 - rho); it must be
+    below ``rtol`` times the state magnitude.
+    """
+    scale = rtol * max(np.max(np.abs(y), initial=0.0), 1e-12)
+    if delta <= 1e-3 * scale:
+        return True
+    if not np.isfinite(delta_prev) or delta_prev <= 0 or delta >= delta_prev:
+        return False
+    rho = delta / delta_prev
+    return delta * rho / (1.0 - rho) <= scale
+
+
+class _ShiftedSolution:
+    """구간 보간 함수를 시간축으로 shift 만큼 평행이동 (정상상태 주기 복제용)"""
+    __slots__ = ('sol', 'shift', 't_min', 't_max')
+
+    def __init__(self, sol, shift: float):
+        self.sol, self.shift = sol, shift
+        self.t_min, self.t_max = sol.t_min + shift, sol.t_max + shift
+
+    def __call__(self, t):
+        return self.sol(np.asarray(t) - self.shift)
+
+
+def _segment_eval_points(t: np.ndarray, t0: float, t1: float):
+    """구간 [t0, t1] 에서 solve_ivp 에 넘길 (정렬·중복 제거·끝점 포함) t_eval 과 역매핑"""
+    pts, inverse = np.unique(np.clip(t, t0, t1), return_inverse=True)
+    if pts.size == 0 or pts[-1] < t1:
+        pts = np.r_[pts, t1]
+    return pts, inverse
+
+
+def _iter_timeline(
+    fun: Callable,
+    jac: Callable,
+    y0: np.ndarray,
+    timeline: DoseTimeline,
+    t_span: Sequence[float],
+    t_eval: Union[Sequence[float], np.ndarray],
+    method: str = 'LSODA',
+    period: float = None,
+    ss_rtol: float = 1e-4,
+    stats: Dict[str, int] = None,
+    fun_into: Callable = None,
+    **ivp_options
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Integrate dy/dt = fun(t, y) + infusion(t) segment by segment between the
+    event groups of ``timeline``, yielding ``(cols, y_block)`` as each segment
+    finishes: ``cols`` indexes ``t_eval`` (in time order) and ``y_block`` has
+    shape (len(y0), len(cols)). Points after the last segment get the final
+    state; points before ``t_span[0]`` are not yielded.
+
+    Each segment is sampled by solve_ivp at its own t_eval points (plus its end
+    point), so no interpolant outlives its segment and memory does not grow
+    with the number of doses.
+
+    ``fun_into(t, y, out)``, if given, is used instead of ``fun``: it writes the
+    RHS into a buffer and infusion rates are added in place. LSODA copies the
+    returned array immediately, so it gets one buffer for all calls; the other
+    solve_ivp methods keep references to returned arrays and get a fresh one.
+
+    ``ivp_options`` are passed through to solve_ivp (rtol/atol/max_step/
+    first_step, or lband/uband for banded LSODA). If ``stats`` is given,
+    nfev/njev/nlu of every segment are added to it.
+
+    With a dosing ``period``, the pre-dose state at each event group is compared
+    with the one a period earlier. Once they agree within ``ss_rtol`` (periodic
+    steady state) and the following cycles have identical dosing, those cycles
+    are not integrated: their output is the last simulated cycle shifted in time.
+    Only the interpolants of the most recent cycle are kept for this.
+    """
+    y_current = np.array(y0, dtype=float)
+    t_current = t_span[0]
+    points = _EvalCursor(np.asarray(t_eval, dtype=float), t_current)
+
+    # 현재 활성화된 infusion rate 저장 배열
+    active_infusion_rates = np.zeros(y_current.size)
+
+    infusing = False
+
+    if fun_into is not None:
+        n = y_current.size
+        shared_out = np.empty(n) if method == 'LSODA' else None
+
+        def effective_rhs(t, y_arr):
+            out = shared_out if shared_out is not None else np.empty(n)
+            fun_into(t, y_arr, out)
+            if infusing:
+                np.add(out, active_infusion_rates, out=out)
+            return out
+    else:
+        def effective_rhs(t, y_arr):
+            return np.asarray(fun(t, y_arr)) + active_infusion_rates
+
+    if jac is not None and method in ('LSODA', 'BDF', 'Radau'):   # explicit 방법은 jac 인자를 받지 않음
+        ivp_options['jac'] = jac
+
+    n_groups = len(timeline.times)
+    cursor = timeline.first_index(t_current)  # 시작 시각 이전 이벤트는 적용하지 않음
+    pre_dose = {}      # 그룹 인덱스 → (투여 직전 상태, infusion rate, 구간 번호, 주기간 변화량)
+    recent = deque()   # 정상상태 복제용: 최근 한 주기 남짓의 (구간 번호, 보간 함수)
+    n_segments = 0
+
+    while t_current < t_span[1]:
+        # 현재 시간에서 발생하는 이벤트 그룹 적용 (동시 이벤트는 이미 합산됨)
+        if cursor < n_groups and np.isclose(timeline.times[cursor], t_current):
+            if period:
+                # 정상상태 판정: 한 주기 전 같은 위치의 투여 직전 상태와 비교
+                g_prev = timeline.first_index(t_current - period)
+                prev = pre_dose.get(g_prev) if np.isclose(timeline.times[g_prev], t_current - period) else None
+                delta = np.max(np.abs(y_current - prev[0])) if prev is not None else np.inf
+                if prev is not None and np.allclose(prev[1], active_infusion_rates) \
+                        and _ss_converged(delta, prev[3], y_current, ss_rtol):
+                    m = _repeat_cycles(timeline, g_prev, cursor, period, t_span[1])
+                    cycle = [sol for k, sol in recent if k >= prev[2]]
+                    if m > 0 and cycle:
+                        for j in range(1, m + 1):
+                            for sol in cycle:
+                                shifted = _ShiftedSolution(sol, j * period)
+                                cols = points.take(shifted.t_max)
+                                if cols.size:
+                                    t_cols = np.clip(points.t_eval[cols], shifted.t_min, shifted.t_max)
+                                    yield cols, shifted(t_cols)
+                        cursor += m * (cursor - g_prev)
+                        t_current = t_current + m * period
+                        pre_dose.clear()
+                        continue
+                pre_dose[cursor] = (y_current.copy(), active_infusion_rates.copy(), n_segments, delta)
+                horizon = t_current - 1.5 * period
+                for g in [g for g in pre_dose if timeline.times[g] < horizon]:
+                    del pre_dose[g]
+
+            y_current += timeline.bolus[cursor]
+            active_infusion_rates += timeline.infusion[cursor]
+            np.maximum(active_infusion_rates, 0, out=active_infusion_rates)
+            infusing = bool(active_infusion_rates.any())
+            cursor += 1
+
+        # 다음 이벤트 시간 = 커서가 가리키는 그룹
+        t_next_event = timeline.times[cursor] if cursor < n_groups else t_span[1]
+
+        # 현재 구간 [t_current, t_next_event]에 대해 시뮬레이션 (구간에 속한 t_eval 만 샘플링)
+        cols = points.take(t_next_event)
+        seg_t, inverse = _segment_eval_points(points.t_eval[cols], t_current, t_next_event)
+        sol_segment = solve_ivp(
+            fun=effective_rhs,
+            t_span=(t_current, t_next_event),
+            y0=y_current,
+            method=method,        # 기본 LSODA: Stiff 시스템에 강건한 솔버
+            t_eval=seg_t,
+            dense_output=bool(period),   # 정상상태 주기 복제에만 보간 함수가 필요
+            **ivp_options
+        )
+        if stats is not None:
+            for k in ('nfev', 'njev', 'nlu'):
+                stats[k] = stats.get(k, 0) + int(getattr(sol_segment, k))
+
+        failed = sol_segment.status != 0 and sol_segment.status != 1
+        if failed and sol_segment.t.size < seg_t.size:
+            # 실패 지점 이후의 점은 마지막으로 계산된 상태로 채움
+            last = sol_segment.y[:, -1:] if sol_segment.t.size else y_current[:, None]
+            y_seg = np.hstack([sol_segment.y, np.repeat(last, seg_t.size - sol_segment.t.size, axis=1)])
+        else:
+            y_seg = sol_segment.y
+        if cols.size:
+            yield cols, y_seg[:, inverse]
+
+        if period and sol_segment.sol is not None:
+            recent.append((n_segments, sol_segment.sol))
+            while recent and recent[0][1].t_min < t_current - 1.5 * period:
+                recent.popleft()
+        n_segments += 1
+
+        # 다음 루프를 위해 현재 상태 업데이트
+        if sol_segment.t.size:
+            t_current = sol_segment.t[-1]
+            y_current = sol_segment.y[:, -1].copy()
+
+        if failed: # 솔버 실패 시
+            print(f"Warning: ODE solver failed at t={t_current}. Message: {sol_segment.message}")
+            break
+
+    # 마지막 구간 이후의 t_eval 은 최종 상태
+    cols = points.rest()
+    if cols.size:
+        yield cols, np.repeat(y_current[:, None], cols.size, axis=1)
+
+
+def _integrate_timeline(fun: Callable, jac: Callable, y0: np.ndarray, timeline: DoseTimeline,
+                        t_span: Sequence[float], t_eval: Union[Sequence[float], np.ndarray],
+                        method: str = 'LSODA', **kwargs) -> np.ndarray:
+    """
+    _iter_timeline collected into a preallocated array of shape
+    (len(y0), len(t_eval)); points before ``t_span[0]`` stay zero.
+    """
+    out = np.zeros((np.size(y0), np.size(t_eval)))
+    for cols, y_block in _iter_timeline(fun, jac, y0, timeline, t_span, t_eval, method, **kwargs):
+        out[:, cols] = y_block
+    return out
+
+
+SOLVER_METHODS = ('auto', 'LSODA', 'BDF', 'Radau', 'RK45', 'RK23', 'DOP853')
+STIFF_RATIO = 1e3       # auto: 빠른/느린 고유값 비율이 이 이상이고
+STIFF_STEPS = 100       #       explicit 안정성 한계 스텝 수(|λ|max·T)가 이 이상이면 implicit
+
+
+def parse_solver_options(raw: Dict = None) -> Dict:
+    """
+    Validate a ``solver_options`` payload: method (one of SOLVER_METHODS),
+    rtol, atol, max_step, first_step. Unknown keys are rejected.
+    Raises ValueError with a user-facing message.
+    """
+    raw = raw or {}
+    unknown = set(raw) - {'method', 'rtol', 'atol', 'max_step', 'first_step'}
+    if unknown:
+        raise ValueError(f"Unknown solver option(s): {', '.join(sorted(unknown))}")
+    opts = {}
+    method = raw.get('method')
+    if method not in (None, ''):
+        if method not in SOLVER_METHODS:
+            raise ValueError(f"Unknown solver method '{method}'. Choose one of: {', '.join(SOLVER_METHODS)}")
+        opts['method'] = method
+    for key in ('rtol', 'atol', 'max_step', 'first_step'):
+        value = raw.get(key)
+        if value is None or str(value).strip() == '':
+            continue
+        value = float(value)
+        if not value > 0:
+            raise ValueError(f"Solver option '{key}' must be positive.")
+        opts[key] = value
+    return opts
+
+
+def choose_method(jac_at_start: np.ndarray, span_length: float) -> str:
+    """
+    Explicit vs implicit choice from the Jacobian spectrum at the start of the
+    first segment: stiff when the fastest decay rate is far beyond both the
+    slowest one and the span (an explicit method would be stability-limited).
+    """
+    if hasattr(jac_at_start, 'toarray'):      # 희소 Jacobian
+        jac_at_start = jac_at_start.toarray()
+    if not np.all(np.isfinite(jac_at_start)):
+        return 'LSODA'
+    rates = -np.real(np.linalg.eigvals(jac_at_start))
+    fast = float(np.max(rates, initial=0.0))
+    decaying = rates[rates > 1e-12]
+    slow = max(float(np.min(decaying)) if decaying.size else 0.0, 1.0 / max(span_length, 1e-12))
+    stiff = fast * span_length > STIFF_STEPS and fast / slow > STIFF_RATIO
+    return 'BDF' if stiff else 'RK45'
+
+
+def _probe_method(jac_fn: Callable, y0: np.ndarray, timeline: DoseTimeline, t_span) -> str:
+    """'auto' 해석: 첫 구간 시작 상태(t0 의 bolus 반영)에서 Jacobian 으로 choose_method"""
+    if jac_fn is None:
+        return 'LSODA'
+    y_first = y0
+    if len(timeline.times) and np.isclose(timeline.times[0], t_span[0]):
+        y_first = y0 + timeline.bolus[0]
+    return choose_method(jac_fn(t_span[0], y_first), t_span[1] - t_span[0])
+
+
+def bind_params_into(rhs_into: Callable, p_arr: np.ndarray) -> Callable:
+    """
+    f(t, y, out) for a generated ``rhs_into(t, y, p, out)`` with parameters fixed.
+
+    States and parameters are passed as Python floats, whose arithmetic is
+    several times cheaper than NumPy scalars'. Python floats raise where NumPy
+    returns inf/nan (division by zero, overflow, complex powers), so such calls
+    are re-evaluated on the arrays to keep NumPy semantics.
+    """
+    p_list = p_arr.tolist()
+
+    def f(t, y_arr, out):
+        try:
+            return rhs_into(t, y_arr.tolist(), p_list, out)
+        except (ZeroDivisionError, OverflowError, TypeError, ValueError):
+            return rhs_into(t, y_arr, p_arr, out)
+    return f
+
+
 def solve_ode_system(
     equations_callable: Callable, # parser.py에서 생성: f(t, y_arr, p_arr) -> dy_arr
     compartments: List[str],
@@ -49,124 +479,443 @@ def solve_ode_system(
     param_values: Dict[str, float],# 파라미터 값 딕셔너리
     t_span: Sequence[float],
     t_eval: Union[Sequence[float], np.ndarray],
-    doses: List[Dict] = None
+    doses: List[Dict] = None,
+    jac: Callable = None,         # 해석적 Jacobian: J(t, y_arr, p_arr) -> (n, n)
+    method: str = 'LSODA',
+    accelerate: bool = False,     # 정상상태 도달 후 동일 투여 주기 적분 생략
+    solver_options: Dict = None,  # rtol / atol / max_step / first_step
+    rhs_into: Callable = None     # compiler 생성 코드: f(t, y_arr, p_arr, out) (equations_callable 대신 사용)
 ) -> pd.DataFrame:
     """
     Solves an ODE system with dosing events using scipy.solve_ivp's event handling feature.
+
+    If ``jac`` is given (e.g. ``CompiledModel.jac_for(method)``) it is passed to
+    implicit methods (LSODA/BDF/Radau) instead of finite-difference estimation.
+    Dosing only adds constant terms to the RHS, so the Jacobian is unaffected.
+
+    With ``accelerate``, repeated dosing cycles after periodic steady state is
+    reached are replayed from the last simulated cycle instead of integrated.
+
+    ``method='auto'`` probes stiffness with ``jac`` at the start of the first
+    segment (see choose_method). The method used and the summed
+    nfev/njev/nlu are reported in ``df.attrs['solver']``.
+
+    ``rhs_into`` (``CompiledModel.rhs_into``) evaluates the RHS into a reused
+    buffer instead of building a list per call.
     """
     if doses is None:
         doses = []
 
     # --- 1. 설정 및 변수 초기화 ---
-    p_values_arr = np.array([param_values.get(p_name, 0) for p_name in parameters])
+    p_values_arr = np.array([param_values.get(p_name, 0) for p_name in parameters], dtype=float)
     comp_map_idx = {name: i for i, name in enumerate(compartments)}
-    y_current = np.array([init_values.get(c, 0) for c in compartments])
-    t_current = t_span[0]
-    
-    # 현재 활성화된 infusion rate 저장 배열
-    active_infusion_rates = np.zeros(len(compartments))
-
-    # --- 2. 모든 투여 이벤트를 시간순으로 사전 처리 ---
-    processed_dose_events = []
-    for dose_item in doses:
-        start_time = dose_item.get("start_time", 0)
-        # ... (이전 답변과 동일한 Dose 전처리 로직) ...
-        current_t = start_time
-        typ = dose_item.get("type")
-        amount = dose_item.get("amount", 0)
-        comp_name = dose_item.get("compartment")
-        if comp_name not in comp_map_idx: continue
-        comp_idx = comp_map_idx[comp_name]
-        duration = dose_item.get("duration", 0)
-        repeat_every = dose_item.get("repeat_every")
-        repeat_until = dose_item.get("repeat_until")
-
-        while True:
-            if current_t > t_span[1] + 1e-9: break
-            
-            if typ == "bolus":
-                processed_dose_events.append({"time": current_t, "type": "bolus", "comp_idx": comp_idx, "value": amount})
-            elif typ == "infusion" and duration > 0:
-                infusion_end_time = current_t + duration
-                rate = amount / duration
-                processed_dose_events.append({"time": current_t, "type": "infusion_start", "comp_idx": comp_idx, "value": rate})
-                if infusion_end_time <= t_span[1] + 1e-9:
-                    processed_dose_events.append({"time": infusion_end_time, "type": "infusion_end", "comp_idx": comp_idx, "value": rate})
-
-            if repeat_every and repeat_every > 0 and repeat_until and current_t < repeat_until:
-                current_t += repeat_every
-                if current_t > repeat_until + 1e-9: break
-            else:
-                break
-    
-    # 시간순으로 이벤트 정렬
-    processed_dose_events.sort(key=lambda x: x["time"])
-    
-    # --- 3. RHS 함수 정의 (Infusion 포함) ---
-    def effective_rhs(t, y_arr):
-        base_dy = equations_callable(t, y_arr, p_values_arr)
-        return np.array(base_dy) + active_infusion_rates
+    y0 = np.array([init_values.get(c, 0) for c in compartments], dtype=float)
 
-    # --- 4. 이벤트 기반 시뮬레이션 루프 ---
-    all_solutions = [] # 각 구간의 solution 객체를 저장할 리스트
-    
-    while t_current < t_span[1]:
-        # 현재 시간에서 발생하는 모든 이벤트 적용
-        events_at_this_time = [e for e in processed_dose_events if np.isclose(e['time'], t_current)]
-        for event in events_at_this_time:
-            if event["type"] == "bolus":
-                y_current[event["comp_idx"]] += event["value"]
-            elif event["type"] == "infusion_start":
-                active_infusion_rates[event["comp_idx"]] += event["value"]
-            elif event["type"] == "infusion_end":
-                active_infusion_rates[event["comp_idx"]] -= event["value"]
-                active_infusion_rates[event["comp_idx"]] = max(0, active_infusion_rates[event["comp_idx"]])
-
-        # 다음 이벤트 시간 찾기
-        upcoming_event_times = [event['time'] for event in processed_dose_events if event['time'] > t_current + 1e-9]
-        t_next_event = upcoming_event_times[0] if upcoming_event_times else t_span[1]
-        
-        # 현재 구간 [t_current, t_next_event]에 대해 시뮬레이션
-        sol_segment = solve_ivp(
-            fun=effective_rhs,
-            t_span=(t_current, t_next_event),
-            y0=y_current,
-            method='LSODA',       # Stiff 시스템에 강건한 솔버
-            dense_output=True,    # 보간을 위해 dense_output 활성화
-        )
-        
-        all_solutions.append(sol_segment.sol) # 보간 함수(dense output) 저장
-        
-        # 다음 루프를 위해 현재 상태 업데이트
-        t_current = sol_segment.t[-1]
-        y_current = sol_segment.y[:, -1].copy()
+    # --- 2. 모든 투여 이벤트를 시간순 타임라인으로 사전 컴파일 ---
+    timeline = build_dose_timeline(doses, comp_map_idx, t_span)
 
-        if sol_segment.status != 0 and sol_segment.status != 1: # 솔버 실패 시
-            print(f"Warning: ODE solver failed at t={t_current}. Message: {sol_segment.message}")
-            break
+    # --- 3. 파라미터를 고정한 RHS / Jacobian ---
+    def base_rhs(t, y_arr):
+        return equations_callable(t, y_arr, p_values_arr)
 
-    # --- 5. 최종 결과 생성 ---
-    # 요청된 t_eval 시간점들에 대한 값을 각 구간의 보간 함수를 사용하여 계산
-    final_y_values = np.zeros((len(compartments), len(t_eval)))
-
-    for i, t_point in enumerate(t_eval):
-        # t_point가 포함된 solution segment 찾기
-        found = False
-        for sol_func in all_solutions:
-            if sol_func.t_min - 1e-9 <= t_point <= sol_func.t_max + 1e-9:
-                final_y_values[:, i] = sol_func(t_point)
-                found = True
-                break
-        if not found and t_point > t_span[0]: # 모든 구간 이후의 시간점이라면 마지막 값 사용
-             if all_solutions:
-                 final_y_values[:, i] = all_solutions[-1](all_solutions[-1].t_max)
+    base_rhs_into = bind_params_into(rhs_into, p_values_arr) if rhs_into is not None else None
+
+    base_jac = None
+    if jac is not None:
+        def base_jac(t, y_arr):
+            return jac(t, y_arr, p_values_arr)
+
+    # --- 4~5. 이벤트 기반 구간 적분 및 t_eval 샘플링 ---
+    if method == 'auto':
+        method = _probe_method(base_jac, y0, timeline, t_span)
+
+    period = regimen_period(doses) if accelerate else None
+    stats = {'method': method, 'nfev': 0, 'njev': 0, 'nlu': 0}
+    final_y_values = _integrate_timeline(base_rhs, base_jac, y0, timeline, t_span, t_eval, method,
+                                         period=period, stats=stats, fun_into=base_rhs_into, **(solver_options or {}))
 
     # DataFrame으로 변환하여 반환
     df_output = pd.DataFrame(final_y_values.T, columns=compartments)
     df_output.insert(0, 'Time', t_eval)
+    df_output.attrs['solver'] = stats
     
     return df_output
 
+def _iter_linear(A: np.ndarray, b: np.ndarray, y0: np.ndarray, t_span: Sequence[float],
+                 t_eval: np.ndarray, timeline: DoseTimeline) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Exact piecewise solution of dy/dt = A y + b + u(t) for piecewise-constant
+    infusion input u and bolus jumps, yielded per segment as ``(cols, y_block)``
+    like _iter_timeline (points after t_end get the t_end value).
+
+    Each segment between event groups is propagated in closed form, which is the
+    superposition of the free response and every earlier bolus/infusion input.
+    Uses the eigendecomposition of A when it is well conditioned; otherwise
+    (defective/near-defective A, e.g. equal rate constants) the augmented
+    matrix exponential expm([[A, c], [0, 0]] τ).
+    """
+    from scipy.linalg import expm
+
+    n = A.shape[0]
+    t0, t_end = float(t_span[0]), float(t_span[1])
+
+    lam, V = np.linalg.eig(A)
+    use_eig = np.linalg.cond(V) < 1e8
+    if use_eig:
+        V_inv = np.linalg.inv(V)
+        small = np.abs(lam) < 1e-12
+        lam_safe = np.where(small, 1.0, lam)
+
+    def propagate(y_start, c, tau):
+        """y(t_start + tau) for every tau ≥ 0; returns shape (n, len(tau))"""
+        if use_eig:
+            lt = np.outer(lam, tau)
+            phi = np.where(small[:, None], tau[None, :], np.expm1(lt) / lam_safe[:, None])
+            z = np.exp(lt) * (V_inv @ y_start)[:, None] + phi * (V_inv @ c)[:, None]
+            return np.real(V @ z)
+        M = np.zeros((n + 1, n + 1))
+        M[:n, :n] = A
+        M[:n, n] = c
+        Phi = expm(M[None, :, :] * tau[:, None, None])
+        return (Phi[:, :n, :n] @ y_start + Phi[:, :n, n]).T
+
+    # 구간 경계: 시작 시각 + (t0, t_end) 내부의 이벤트 그룹
+    cursor = timeline.first_index(t0)
+    y = y0.copy()
+    rates = np.zeros(n)
+    if cursor < len(timeline.times) and np.isclose(timeline.times[cursor], t0):
+        y += timeline.bolus[cursor]
+        rates = np.maximum(rates + timeline.infusion[cursor], 0)
+        cursor += 1
+    inner = timeline.times[cursor:]
+    inner = inner[inner < t_end]
+    seg_starts = np.r_[t0, inner]
+    seg_ends = np.r_[inner, t_end]
+
+    # t_eval → 구간 (경계 시각은 이전 구간 = 투여 직전 값), t_end 이후는 t_end 값
+    t_clip = np.minimum(t_eval, t_end)
+    seg_idx = np.minimum(np.searchsorted(seg_ends, t_clip - 1e-9, side='left'), len(seg_ends) - 1)
+    valid = t_eval >= t0 - 1e-9
+    order = np.flatnonzero(valid)[np.argsort(seg_idx[valid], kind='stable')]
+    seg_bounds = np.searchsorted(seg_idx[order], np.arange(len(seg_ends) + 1), side='left')
+
+    for k, (ts, te) in enumerate(zip(seg_starts, seg_ends)):
+        c = b + rates
+        cols = order[seg_bounds[k]:seg_bounds[k + 1]]
+        if cols.size:
+            yield cols, propagate(y, c, np.maximum(t_clip[cols] - ts, 0.0))
+        y = propagate(y, c, np.array([te - ts]))[:, 0]
+        if k < len(inner):
+            g = cursor + k
+            y = y + timeline.bolus[g]
+            rates = np.maximum(rates + timeline.infusion[g], 0)
+
+
+def _linear_segments(A: np.ndarray, b: np.ndarray, y0: np.ndarray, t_span: Sequence[float],
+                     t_eval: np.ndarray, timeline: DoseTimeline) -> np.ndarray:
+    """_iter_linear collected into an array of shape (n, len(t_eval))."""
+    out = np.zeros((A.shape[0], np.size(t_eval)))
+    for cols, y_block in _iter_linear(A, b, y0, t_span, np.asarray(t_eval, dtype=float), timeline):
+        out[:, cols] = y_block
+    return out
+
+
+def solve_linear_system(
+    A: np.ndarray,
+    b: np.ndarray,
+    compartments: List[str],
+    init_values: Dict[str, float],
+    t_span: Sequence[float],
+    t_eval: Union[Sequence[float], np.ndarray],
+    doses: List[Dict] = None
+) -> pd.DataFrame:
+    """
+    Closed-form counterpart of solve_ode_system for linear time-invariant models
+    dy/dt = A y + b (see CompiledModel.linear_system). Same dosing semantics and
+    output layout, no numerical integration.
+    """
+    comp_map_idx = {name: i for i, name in enumerate(compartments)}
+    y0 = np.array([init_values.get(c, 0) for c in compartments], dtype=float)
+    timeline = build_dose_timeline(doses, comp_map_idx, t_span)
+    t_eval = np.asarray(t_eval, dtype=float)
+
+    y_values = _linear_segments(np.asarray(A, dtype=float), np.asarray(b, dtype=float), y0, t_span, t_eval, timeline)
+
+    df_output = pd.DataFrame(y_values.T, columns=compartments)
+    df_output.insert(0, 'Time', t_eval)
+    df_output.attrs['solver'] = {'method': 'analytic', 'nfev': 0, 'njev': 0, 'nlu': 0}
+    return df_output
+
+
+def solve_model(
+    model,                        # compiler.CompiledModel
+    init_values: Dict[str, float],
+    param_values: Dict[str, float],
+    t_span: Sequence[float],
+    t_eval: Union[Sequence[float], np.ndarray],
+    doses: List[Dict] = None,
+    solver_options: Dict = None,  # parse_solver_options() 결과 (method 포함)
+    accelerate: bool = False
+) -> pd.DataFrame:
+    """
+    Simulate a compiled model, choosing the engine automatically.
+
+    Linear time-invariant models are solved exactly with solve_linear_system
+    (already cheap per dosing cycle, so ``accelerate`` does not apply);
+    everything else (or an LTI model whose rate matrix is not finite for the
+    given parameters) goes through solve_ode_system with the analytic Jacobian.
+    """
+    p_arr = model.param_array(param_values)
+    if model.is_linear:
+        A, b = model.linear_system(p_arr)
+        if np.all(np.isfinite(A)) and np.all(np.isfinite(b)):
+            return solve_linear_system(A, b, model.compartments, init_values, t_span, t_eval, doses)
+
+    ivp_options = dict(solver_options or {})
+    method = ivp_options.pop('method', 'LSODA')
+    return solve_ode_system(
+        equations_callable=model.rhs,
+        rhs_into=model.rhs_into,
+        compartments=model.compartments,
+        parameters=model.parameters,
+        init_values=init_values,
+        param_values=param_values,
+        t_span=t_span,
+        t_eval=t_eval,
+        doses=doses,
+        jac=model.jac_for('BDF' if method == 'auto' else method),
+        method=method,
+        accelerate=accelerate,
+        solver_options=ivp_options,
+    )
+
+
+def iter_model(
+    model,                        # compiler.CompiledModel
+    init_values: Dict[str, float],
+    param_values: Dict[str, float],
+    t_span: Sequence[float],
+    t_eval: Union[Sequence[float], np.ndarray],
+    doses: List[Dict] = None,
+    solver_options: Dict = None,
+    accelerate: bool = False,
+    stats: Dict = None
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Streaming counterpart of solve_model: yields ``(t_block, y_block)`` as each
+    dosing segment completes, ``y_block`` having shape (n_compartments,
+    len(t_block)) in ``model.compartments`` order.
+
+    Blocks arrive in time order and together cover the ``t_eval`` points at or
+    after ``t_span[0]``. Nothing is retained between segments (apart from one
+    dosing cycle with ``accelerate``), so memory stays flat however long the
+    regimen is. ``stats``, if given, receives the method and nfev/njev/nlu.
+    """
+    t_eval = np.asarray(t_eval, dtype=float)
+    for cols, y_block in _model_blocks(model, init_values, param_values, t_span, t_eval, doses,
+                                       solver_options, accelerate, stats):
+        yield t_eval[cols], y_block
+
+
+def simulate_states(
+    model,                        # compiler.CompiledModel
+    init_values: Dict[str, float],
+    param_values: Dict[str, float],
+    t_span: Sequence[float],
+    t_eval: Union[Sequence[float], np.ndarray],
+    doses: List[Dict] = None,
+    solver_options: Dict = None,
+    accelerate: bool = False
+) -> Tuple[np.ndarray, Dict]:
+    """
+    solve_model without the DataFrame: states of shape (n_compartments,
+    len(t_eval)) in ``t_eval`` order, and the solver stats. Used on hot paths
+    such as fitting residuals.
+    """
+    t_eval = np.asarray(t_eval, dtype=float)
+    stats = {}
+    out = np.zeros((len(model.compartments), t_eval.size))
+    for cols, y_block in _model_blocks(model, init_values, param_values, t_span, t_eval, doses,
+                                       solver_options, accelerate, stats):
+        out[:, cols] = y_block
+    return out, stats
+
+
+def _model_blocks(model, init_values, param_values, t_span, t_eval: np.ndarray, doses, solver_options,
+                  accelerate, stats) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """iter_model / simulate_states 공통: 엔진 선택 후 (t_eval 인덱스, 상태 블록) 스트림"""
+    doses = doses or []
+    p_arr = model.param_array(param_values)
+    y0 = np.array([init_values.get(c, 0) for c in model.compartments], dtype=float)
+    timeline = build_dose_timeline(doses, model.comp_index, t_span)
+    stats = stats if stats is not None else {}
+
+    if model.is_linear:
+        A, b = model.linear_system(p_arr)
+        if np.all(np.isfinite(A)) and np.all(np.isfinite(b)):
+            stats.update(method='analytic', nfev=0, njev=0, nlu=0)
+            yield from _iter_linear(A, b, y0, t_span, t_eval, timeline)
+            return
+
+    ivp_options = dict(solver_options or {})
+    method = ivp_options.pop('method', 'LSODA')
+    jac = model.jac_for('BDF' if method == 'auto' else method)
+    jac_fixed = lambda t, y_arr: jac(t, y_arr, p_arr)
+    if method == 'auto':
+        method = _probe_method(jac_fixed, y0, timeline, t_span)
+    stats.update(method=method, nfev=0, njev=0, nlu=0)
+    yield from _iter_timeline(None, jac_fixed, y0, timeline, t_span, t_eval, method,
+                              period=regimen_period(doses) if accelerate else None, stats=stats,
+                              fun_into=bind_params_into(model.rhs_into, p_arr), **ivp_options)
+
+
+def solve_sensitivities(
+    sens,                         # compiler.SensitivityModel
+    init_values: Dict[str, float],
+    param_values: Dict[str, float],
+    t_span: Sequence[float],
+    t_eval: Union[Sequence[float], np.ndarray],
+    doses: List[Dict] = None,
+    solver_options: Dict = None
+) -> Tuple[np.ndarray, Dict]:
+    """
+    Integrate states and forward sensitivities together.
+
+    Returns the augmented trajectory z of shape (n·(q+1), len(t_eval)) (see
+    ``sens.split``) and solver stats. Dose events only move the state part;
+    LTI models use the exact propagator on the (also LTI) augmented system.
+    """
+    model = sens.model
+    t_eval = np.asarray(t_eval, dtype=float)
+    p_arr = model.param_array(param_values)
+    m = sens.n * (sens.q + 1)
+    z0 = np.zeros(m)
+    z0[:sens.n] = [init_values.get(c, 0) for c in model.compartments]
+
+    tl = build_dose_timeline(doses or [], model.comp_index, t_span)
+    pad = ((0, 0), (0, m - sens.n))
+    timeline = DoseTimeline(tl.times, np.pad(tl.bolus, pad), np.pad(tl.infusion, pad))
+
+    if model.is_linear:
+        A, b = sens.linear_system(p_arr)
+        if np.all(np.isfinite(A)) and np.all(np.isfinite(b)):
+            stats = {'method': 'analytic', 'nfev': 0, 'njev': 0, 'nlu': 0}
+            return _linear_segments(A, b, z0, t_span, t_eval, timeline), stats
+
+    ivp_options = dict(solver_options or {})
+    method = ivp_options.pop('method', 'LSODA')
+    jac_fixed = lambda t, z: sens.jac(t, z, p_arr)
+    if method == 'auto':
+        method = _probe_method(lambda t, y: model.jac(t, y, p_arr), z0[:sens.n], tl, t_span)
+    stats = {'method': method, 'nfev': 0, 'njev': 0, 'nlu': 0}
+    z = _integrate_timeline(None, jac_fixed, z0, timeline, t_span, t_eval, method, stats=stats,
+                            fun_into=bind_params_into(sens.rhs_into, p_arr), **ivp_options)
+    return z, stats
+
+
+def resolve_method(model, init_values: Dict[str, float], param_values: Dict[str, float],
+                   t_span: Sequence[float], doses: List[Dict] = None) -> str:
+    """
+    Method ``solve_model`` would use under 'auto' for this problem, so that
+    repeated solves (e.g. fitting iterations) can pin it once.
+    """
+    p_arr = model.param_array(param_values)
+    y0 = np.array([init_values.get(c, 0) for c in model.compartments], dtype=float)
+    timeline = build_dose_timeline(doses or [], model.comp_index, t_span)
+    jac = model.jac_for('BDF')
+    return _probe_method(lambda t, y_arr: jac(t, y_arr, p_arr), y0, timeline, t_span)
+
+
+def _cycle_doses(doses: List[Dict], period: float) -> List[Dict]:
+    """반복 투여를 한 주기 [0, period) 안의 단회 투여로 변환 (비반복 투여는 제외)"""
+    repeating = [d for d in doses if d.get("repeat_every") and np.isclose(float(d["repeat_every"]), period)
+                 and d.get("repeat_until")]
+    origin = min(float(d.get("start_time", 0)) for d in repeating)
+    cycle = []
+    for d in repeating:
+        if d.get("type") == "infusion" and float(d.get("duration", 0) or 0) > period + 1e-9:
+            raise ValueError("Steady-state mode requires infusion durations not longer than the dosing interval.")
+        offset = (float(d.get("start_time", 0)) - origin) % period
+        cycle.append({**d, "start_time": offset, "repeat_every": None, "repeat_until": None})
+    return cycle
+
+
+def solve_steady_state(
+    model,                        # compiler.CompiledModel
+    init_values: Dict[str, float],
+    param_values: Dict[str, float],
+    doses: List[Dict],
+    n_points: int = 200,
+    solver_options: Dict = None,
+    tol: float = 1e-6,
+    max_cycles: int = 1000
+) -> pd.DataFrame:
+    """
+    One dosing interval at periodic steady state of the repeated doses.
+
+    ``Time`` runs from 0 to the dosing interval (time since the first dose of
+    the cycle). For LTI models the pre-dose steady state solves
+    (I - e^{A·tau}) y = F(0) directly, F being one cycle from zero; other models
+    iterate the one-cycle map from ``init_values`` until the estimated distance
+    to steady state is within ``tol`` (relative, see _ss_converged). ``df.attrs['steady_state']`` reports
+    the interval, the number of cycles simulated and convergence;
+    ``df.attrs['solver']`` the method and summed nfev/njev/nlu.
+    """
+    period = regimen_period(doses)
+    if period is None:
+        raise ValueError("Steady-state mode requires repeated doses with a common repeat_every interval.")
+
+    cycle_doses = _cycle_doses(doses, period)
+    span = [0.0, period]
+    timeline = build_dose_timeline(cycle_doses, model.comp_index, span)
+    t_eval = np.linspace(0.0, period, n_points)
+    y = np.array([init_values.get(c, 0) for c in model.compartments], dtype=float)
+    p_arr = model.param_array(param_values)
+
+    linear = model.is_linear
+    if linear:
+        A, b = model.linear_system(p_arr)
+        linear = bool(np.all(np.isfinite(A)) and np.all(np.isfinite(b)))
+
+    if linear:
+        from scipy.linalg import expm
+        one_cycle = lambda y_start: _linear_segments(A, b, y_start, span, np.array([period]), timeline)[:, 0]
+        I_minus_M = np.eye(len(y)) - expm(A * period)
+        if np.linalg.cond(I_minus_M) > 1e12:
+            raise ValueError("The model has no steady state (a compartment accumulates without elimination).")
+        y = np.linalg.solve(I_minus_M, one_cycle(np.zeros_like(y)))
+        cycles, converged = 0, True
+        y_values = _linear_segments(A, b, y, span, t_eval, timeline)
+        stats = {'method': 'analytic', 'nfev': 0, 'njev': 0, 'nlu': 0}
+    else:
+        ivp_options = dict(solver_options or {})
+        method = ivp_options.pop('method', 'LSODA')
+        jac = model.jac_for('BDF' if method == 'auto' else method)
+        fun = lambda t, y_arr: model.rhs(t, y_arr, p_arr)
+        fun_into = bind_params_into(model.rhs_into, p_arr)
+        jac_fixed = (lambda t, y_arr: jac(t, y_arr, p_arr)) if jac is not None else None
+        if method == 'auto':
+            method = _probe_method(jac_fixed, y, timeline, span)
+        stats = {'method': method, 'nfev': 0, 'njev': 0, 'nlu': 0}
+        converged, delta = False, np.inf
+        for cycles in range(1, max_cycles + 1):
+            y_next = _integrate_timeline(fun, jac_fixed, y, timeline, span, np.array([period]), method,
+                                         stats=stats, fun_into=fun_into, **ivp_options)[:, 0]
+            delta, delta_prev = np.max(np.abs(y_next - y)), delta
+            y = y_next
+            if _ss_converged(delta, delta_prev, y, tol):
+                converged = True
+                break
+        y_values = _integrate_timeline(fun, jac_fixed, y, timeline, span, t_eval, method,
+                                       stats=stats, fun_into=fun_into, **ivp_options)
+
+    df_output = pd.DataFrame(y_values.T, columns=model.compartments)
+    df_output.insert(0, 'Time', t_eval)
+    df_output.attrs['steady_state'] = {"interval": period, "cycles": cycles, "converged": converged}
+    df_output.attrs['solver'] = stats
+    return df_output
+
+
 def solve_ode_system_old(
     equations: Dict[str, Expr],
     compartments: List[str],
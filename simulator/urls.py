@@ -5,5 +5,10 @@ urlpatterns = [
     path('', views.index, name='index'),
     path("parse/", views.parse_ode_view, name="parse_ode"),
     path("fit/", views.fit, name="fit"),
+    path("fit_jobs/", views.fit_jobs, name="fit_jobs"),
+    path("fit_jobs/<uuid:job_id>/", views.fit_job_detail, name="fit_job_detail"),
+    path("fit_jobs/<uuid:job_id>/cancel/", views.fit_job_cancel, name="fit_job_cancel"),
     path('simulate/', views.simulate, name='simulate'),  # POST로 받을 API endpoint
+    path('simulate_population/', views.simulate_population, name='simulate_population'),
+    path('cache_stats/', views.cache_stats, name='cache_stats'),
 ]
@@ -1,24 +1,25 @@
 from django.http import JsonResponse
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 from django.views.decorators.csrf import csrf_exempt
 from django.shortcuts import render
-from django.core.cache import cache
 import numpy as np
-import pandas as pd
 import json
-import hashlib
 import traceback
 
-# Sympy lambdify를 view에서 직접 사용하기 위해 임포트
-from sympy import symbols, lambdify
-
-from .parser import parse_ode_input
-from .solver import solve_ode_system
-from .analyzer import analyze_pk
+# solver·analyzer·population·fitting 은 SciPy/pandas 를 끌어오므로 쓰는 view 안에서 임포트
+# (/parse/ 는 SymPy 만으로 응답, 워커 예열은 warmup.py)
+from .compiler import get_compiled_model, get_parsed_payload, parse_cache_stats, registry_stats
+from .fit_cache import fit_cache_stats
+from .jobs import cancel_job, get_job, submit_fit
+from .model_store import store_stats
+from .models import FitJob
 
 
 @require_POST
 def simulate(request):
+    from .solver import parse_solver_options, solve_model, solve_steady_state
+    from .analyzer import analyze_pk
+
     try:
         data = json.loads(request.body)
 
@@ -34,70 +35,56 @@ def simulate(request):
         t_steps = int(data.get("t_steps", 200))
         doses = data.get("doses", [])
         t_eval = np.linspace(t_start, t_end, t_steps)
+        try:
+            solver_options = parse_solver_options(data.get("solver_options"))
+        except ValueError as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=400)
 
-        # 2. 캐시에서 파싱된 결과(SymPy 객체) 가져오기
-        cache_key = 'parsed_ode_sympy_' + hashlib.md5(ode_text.encode('utf-8')).hexdigest()
-        parsed = cache.get(cache_key)
-
-        if parsed is None:
-            # Cache Miss: 파싱 수행 및 캐시 저장
-            print(f"CACHE MISS: Parsing ODEs for key {cache_key}")
-            parsed = parse_ode_input(ode_text)
-            cache.set(cache_key, parsed, timeout=3600)
-        else:
-            print(f"CACHE HIT: Using cached SymPy objects for key {cache_key}")
-
-        # 3. 파싱된 결과를 바탕으로 view에서 lambdify 수행
-        all_compartments = parsed.get("compartments", [])
-        all_parameters = parsed.get("parameters", [])
-        equations = parsed.get("equations", {})
+        # 2. 컴파일된 모델 가져오기 (프로세스 레지스트리 → 디스크 저장소 → 파싱·컴파일 순)
+        # 구획마다 ODE 가 하나씩 있으므로 구획 목록만 확인 (model.equations 는 저장소에서 읽은
+        # 모델의 SymPy 식을 복원하므로 요청 경로에서 건드리지 않음)
+        model = get_compiled_model(ode_text)
+        all_compartments = model.compartments
 
-        if not all_compartments or not equations:
+        if not all_compartments:
             return JsonResponse({"status": "error", "message": "Failed to parse compartments or equations from input."}, status=400)
 
-        # lambdify를 위한 심볼 및 표현식 준비
-        comp_syms = symbols(all_compartments)
-        param_syms = symbols(all_parameters)
-        t_sym = symbols('t')
-        
-        y_args = tuple(comp_syms) if isinstance(comp_syms, (list, tuple)) else (comp_syms,)
-        p_args = tuple(param_syms) if isinstance(param_syms, (list, tuple)) else (param_syms,)
-        
-        rhs_exprs = [equations[c] for c in all_compartments]
-        
-        # 실제 수치 계산 함수 생성
-        rhs_callable_lambdified = lambdify((t_sym, y_args, p_args), rhs_exprs, modules='numpy')
-        def equations_callable(t, y_array, p_array):
-            return rhs_callable_lambdified(t, y_array, p_array)
-
-        # 4. solver.py를 사용하여 전체 시스템 시뮬레이션 수행
-        df_full = solve_ode_system(
-            equations_callable=equations_callable,
-            compartments=all_compartments,
-            parameters=all_parameters,
-            init_values=init_values,
-            param_values=param_values,
-            t_span=[t_start, t_end],
-            t_eval=t_eval,
-            doses=doses
-        )
+        # 4. solver.py를 사용하여 전체 시스템 시뮬레이션 수행 (선형 모델은 해석해, 그 외 ODE 적분)
+        steady_state_info = None
+        if data.get("steady_state"):
+            # 정상상태의 대표 투여 간격 하나만 계산 (Time = 투여 후 경과 시간)
+            try:
+                df_full = solve_steady_state(model, init_values, param_values, doses, n_points=t_steps,
+                                             solver_options=solver_options)
+            except ValueError as e:
+                return JsonResponse({"status": "error", "message": str(e)}, status=400)
+            steady_state_info = df_full.attrs["steady_state"]
+        else:
+            df_full = solve_model(
+                model,
+                init_values=init_values,
+                param_values=param_values,
+                t_span=[t_start, t_end],
+                t_eval=t_eval,
+                doses=doses,
+                solver_options=solver_options,
+                accelerate=data.get("accelerate", False),  # opt-in: 정상상태 이후 반복 주기 생략 (ss_rtol 이내 근사)
+            )
+        solver_info = df_full.attrs.get("solver")
 
         # 4-2. 파생 변수(Derived Variable) 계산 로직
-        derived_expressions = parsed.get("derived_expressions", {})
-        
-        # 계산에 필요한 모든 변수와 파라미터를 하나의 사전으로 합칩니다.
-        # DataFrame의 컬럼들과 사용자가 입력한 파라미터 값을 모두 포함합니다.
-        available_vars = {**df_full.to_dict(orient='series'), **param_values}
-        
-        # 각 파생 표현식을 순회하며 계산하고, 결과를 DataFrame에 새 컬럼으로 추가합니다.
-        for new_col, expr_str in derived_expressions.items():
-            try:
-                # pandas.eval을 사용하여 안전하고 효율적으로 표현식을 계산합니다.
-                df_full[new_col] = pd.eval(expr_str, local_dict=available_vars, engine='python')
-            except Exception as e:
-                # 계산 중 오류가 발생하면 경고를 출력하고 넘어갑니다.
-                print(f"Warning: Could not evaluate derived expression '{new_col} = {expr_str}': {e}")
-        
+        # 모델과 함께 컴파일된 평가기로 각 파생 변수를 계산해 새 컬럼으로 추가합니다.
+        derived_expressions = model.derived_expressions
+        derived_errors = {}
+        derived_values = model.evaluate_derived(
+            df_full["Time"].to_numpy(),
+            df_full[all_compartments].to_numpy().T,
+            model.param_array(param_values),
+            errors=derived_errors,
+        )
+        for new_col, values in derived_values.items():
+            df_full[new_col] = values
+
         # 5. 사용자가 선택한 플로팅 변수 목록 가져오기
         all_plottable_vars = all_compartments + list(derived_expressions.keys())
         selected_vars_raw = data.get("compartments", all_plottable_vars)
@@ -108,7 +95,10 @@ def simulate(request):
             valid_selected_vars = all_compartments
 
         # 6. analyzer.py로 PK 파라미터 계산 (선택된 변수에 대해서만)
-        total_dose = sum(dose.get('amount', 0) for dose in data.get('doses', []))
+        if steady_state_info:
+            total_dose = sum(dose.get('amount', 0) for dose in doses if dose.get('repeat_every'))
+        else:
+            total_dose = sum(dose.get('amount', 0) for dose in data.get('doses', []))
         # PK 분석은 주요 Compartment에 대해서만 수행하는 것이 일반적이므로, all_compartments를 기준으로 필터링
         # pk_analysis_targets = [comp for comp in valid_selected_vars if comp in all_compartments]
         pk_summary = analyze_pk(df_full, valid_selected_vars, total_dose)
@@ -119,12 +109,90 @@ def simulate(request):
         df_filtered = df_full.reindex(columns=columns_to_return, fill_value=np.nan)
         
         # 8. JSON 응답 반환
+        response_data = {
+            "profile": df_filtered.to_dict(orient="list"),
+            "pk": pk_summary,
+            "solver": solver_info,
+        }
+        if steady_state_info:
+            response_data["steady_state"] = steady_state_info
+        if derived_errors:
+            response_data["warnings"] = list(derived_errors.values())
+        return JsonResponse({
+            "status": "ok",
+            "data": response_data
+        })
+
+    except json.JSONDecodeError:
+        return JsonResponse({"status": "error", "message": "Invalid JSON format in request body."}, status=400)
+    except Exception as e:
+        traceback.print_exc()
+        return JsonResponse({"status": "error", "message": f"An unexpected error occurred: {str(e)}"}, status=500)
+
+@require_POST
+def simulate_population(request):
+    from .population import MAX_SUBJECTS, build_parameter_matrix, population_summary
+    from .population import simulate_population as run_population
+
+    try:
+        data = json.loads(request.body)
+
+        ode_text = data.get("equations", "")
+        if not ode_text.strip():
+            return JsonResponse({"status": "error", "message": "ODE input cannot be empty."}, status=400)
+
+        model = get_compiled_model(ode_text)
+        if not model.compartments:
+            return JsonResponse({"status": "error", "message": "Failed to parse compartments or equations from input."}, status=400)
+
+        # 1. 시간축 & 공통 설정
+        t_start = float(data.get("t_start", 0))
+        t_end = float(data.get("t_end", 48))
+        t_steps = int(data.get("t_steps", 200))
+        t_eval = np.linspace(t_start, t_end, t_steps)
+        initials = data.get("initials", {})
+        doses = data.get("doses", [])
+
+        # 2. 대상자 구성: 명시적 subjects 목록 또는 n_subjects + iiv(CV) 로 생성
+        subjects = data.get("subjects") or []
+        n_subjects = len(subjects) if subjects else int(data.get("n_subjects", 100))
+        if not 0 < n_subjects <= MAX_SUBJECTS:
+            return JsonResponse({"status": "error", "message": f"Number of subjects must be between 1 and {MAX_SUBJECTS}."}, status=400)
+
+        param_matrix = build_parameter_matrix(
+            model, data.get("parameters", {}), n_subjects,
+            iiv=data.get("iiv", {}),
+            overrides=[subj.get("parameters", {}) for subj in subjects],
+            seed=data.get("seed"),
+        )
+        init_matrix = np.array([
+            [{**initials, **(subjects[s].get("initials", {}) if subjects else {})}.get(c, 0) for c in model.compartments]
+            for s in range(n_subjects)
+        ], dtype=float)
+        subject_doses = [subj.get("doses", doses) for subj in subjects] if subjects else [doses] * n_subjects
+
+        # 3. 일괄 시뮬레이션 → 백분위수 요약
+        states = run_population(model, param_matrix, [t_start, t_end], t_eval,
+                                init_matrix=init_matrix, doses=subject_doses)
+
+        all_plottable_vars = model.compartments + list(model.derived_expressions.keys())
+        variables = data.get("compartments", all_plottable_vars)
+        percentiles = [float(p) for p in data.get("percentiles", [5, 50, 95])]
+        derived_errors = {}
+        summary = population_summary(model, states, param_matrix, t_eval, variables, percentiles,
+                                     errors=derived_errors)
+
+        response_data = {
+            "Time": t_eval.tolist(),
+            "n_subjects": n_subjects,
+            "percentiles": percentiles,
+            "summary": summary,
+        }
+        if derived_errors:
+            response_data["warnings"] = list(derived_errors.values())
         return JsonResponse({
             "status": "ok",
-            "data": {
-                "profile": df_filtered.to_dict(orient="list"),
-                "pk": pk_summary
-            }
+            "data": response_data
         })
 
     except json.JSONDecodeError:
@@ -139,17 +207,12 @@ def parse_ode_view(request):
         data = json.loads(request.body)
         ode_text = data.get("text", "")
         
-        # 이 view는 순수하게 파싱 결과만 보여주므로, 캐싱을 적용할 수 있지만 필수는 아님
-        # 만약 적용한다면 simulate view와 동일한 캐시 키 사용
-        cache_key = 'parsed_ode_sympy_' + hashlib.md5(ode_text.encode('utf-8')).hexdigest()
-        parsed = cache.get(cache_key)
-        if parsed is None:
-            parsed = parse_ode_input(ode_text)
-            cache.set(cache_key, parsed, timeout=3600)
-
-        # JSON 응답을 위해 Sympy Expr 객체를 문자열로 변환
-        response_data = {k: v for k, v in parsed.items() if k != 'equations'}
-        response_data['equations'] = {k: str(v) for k, v in parsed.get('equations', {}).items()}
+        # 이 view는 순수하게 파싱 결과만 보여주므로 컴파일 없이 파싱 결과만 사용
+        # (simulate view와 동일한 캐시 키 = 정규화된 모델 지문 사용)
+        # 캐시에는 JSON 형태가 들어 있으므로 SymPy 식을 복원하지 않고 그대로 응답
+        payload = get_parsed_payload(ode_text)
+        response_data = {k: payload[k] for k in ("compartments", "parameters", "derived_expressions", "processed_ode")}
+        response_data['equations'] = payload['equations']
 
         return JsonResponse({
             "status": "ok",
@@ -173,6 +236,47 @@ def fit(request):
         traceback.print_exc()
         return JsonResponse({"status": "error", "message": str(e)}, status=500)
 
+@require_POST
+def fit_jobs(request):
+    """피팅을 비동기 작업으로 제출 → 202 + job_id (같은 입력의 활성 작업이 있으면 그 작업)"""
+    try:
+        data = json.loads(request.body)
+        if not str(data.get("equations", "")).strip():
+            return JsonResponse({"status": "error", "message": "ODE input cannot be empty."}, status=400)
+        job, created = submit_fit(data)
+        return JsonResponse({"status": "ok", "data": {**job.as_dict(), "created": created}}, status=202)
+    except json.JSONDecodeError:
+        return JsonResponse({"status": "error", "message": "Invalid JSON format in request body."}, status=400)
+    except Exception as e:
+        traceback.print_exc()
+        return JsonResponse({"status": "error", "message": str(e)}, status=500)
+
+@require_GET
+def fit_job_detail(request, job_id):
+    try:
+        job = get_job(job_id)
+    except FitJob.DoesNotExist:
+        return JsonResponse({"status": "error", "message": "Fit job not found."}, status=404)
+    return JsonResponse({"status": "ok", "data": job.as_dict()})
+
+@require_POST
+def fit_job_cancel(request, job_id):
+    try:
+        job = cancel_job(job_id)
+    except FitJob.DoesNotExist:
+        return JsonResponse({"status": "error", "message": "Fit job not found."}, status=404)
+    return JsonResponse({"status": "ok", "data": job.as_dict()})
+
+@require_GET
+def cache_stats(request):
+    """이 워커 프로세스의 캐시 적중률 (파싱 결과 · 컴파일 모델 · 디스크 저장소 · 피팅 결과)"""
+    return JsonResponse({"status": "ok", "data": {
+        "parsed": parse_cache_stats(),
+        "compiled": registry_stats(),
+        "store": store_stats(),
+        "fit": fit_cache_stats(),
+    }})
+
 def index(request):
     return render(request, "simulator/index.html")
 
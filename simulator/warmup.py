@@ -0,0 +1,104 @@
+"""
+warmup.py  ──  워커가 요청을 받기 전 예열 (무거운 모듈 임포트 + 자주 쓰는 모델 컴파일)
+───────────────────────────────────────────────
+  import_heavy_modules()    : URLconf·solver·fitting 등 SciPy/pandas 를 쓰는 모듈 임포트 → 소요 시간 [s]
+  warm_model_paths(patterns): SIMULATOR_WARM_MODELS 의 파일 경로·glob 패턴 → 파일 목록
+  warm_up(paths, notify)    : 위 두 단계를 실행하고 결과 요약(dict) 반환
+
+views.py 는 /parse/ 가 SymPy 만으로 응답하도록 무거운 모듈을 view 안에서 임포트한다.
+그 비용과 첫 컴파일을 첫 요청이 떠안지 않도록 gunicorn.conf.py 의 post_worker_init 과
+`manage.py warm_models` 가 warm_up 을 호출한다. 모델 파일 하나 = /simulate/ 의 "equations" 텍스트 하나.
+컴파일된 모델은 프로세스 레지스트리와 디스크 저장소(model_store) 양쪽에 들어간다.
+"""
+import glob
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# 순서대로 임포트 (뒤 모듈이 앞 모듈을 다시 임포트해도 비용 없음)
+HEAVY_MODULES = (
+    "simulator.solver",         # scipy.integrate, pandas
+    "simulator.analyzer",       # scipy.stats
+    "simulator.population",
+    "simulator.fitting",        # scipy.optimize, scipy.stats.qmc
+    "simulator.nlme",
+    "simulator.jobs",
+)
+
+
+def import_heavy_modules() -> float:
+    from django.conf import settings
+
+    t0 = time.perf_counter()
+    # URLconf 도 첫 요청 때에야 임포트됨. importlib.import_module 은 -X importtime 에 잡히지 않아 __import__
+    for name in (settings.ROOT_URLCONF, *HEAVY_MODULES):
+        __import__(name)
+    return time.perf_counter() - t0
+
+
+def warm_model_paths(patterns=None) -> List[str]:
+    """파일 경로 또는 glob 패턴 목록 → 중복 없는 파일 목록 (패턴 순서 유지, 패턴 안에서는 정렬)"""
+    if patterns is None:
+        from django.conf import settings
+        patterns = getattr(settings, 'SIMULATOR_WARM_MODELS', [])
+    paths: List[str] = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(os.path.expanduser(pattern)))
+        if not matches:
+            print(f"Warning: No warm-up model file matches '{pattern}'.")
+        paths.extend(p for p in matches if os.path.isfile(p) and p not in paths)
+    return paths
+
+
+def _warm_model(path: str) -> Dict[str, Any]:
+    from .compiler import get_compiled_model, registry_stats
+    from .model_store import store_stats
+
+    with open(path, encoding='utf-8') as f:
+        ode_text = f.read()
+    registry_hits, store_hits = registry_stats()["hits"], store_stats()["hits"]
+    t0 = time.perf_counter()
+    model = get_compiled_model(ode_text)
+    elapsed = time.perf_counter() - t0
+    if not model.compartments:                            # /simulate/ 와 같은 기준 (SymPy 식 복원 없이)
+        raise ValueError("Failed to parse compartments or equations from input.")
+    if registry_stats()["hits"] > registry_hits:
+        source = "registry"
+    elif store_stats()["hits"] > store_hits:
+        source = "store"
+    else:
+        source = "compiled"
+    return {"path": path, "compartments": len(model.compartments), "source": source, "ms": elapsed * 1e3}
+
+
+def warm_up(paths=None, notify: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """
+    Import the SciPy/pandas-backed modules and compile the warm-up models.
+
+    ``paths`` defaults to the files matched by ``SIMULATOR_WARM_MODELS``.
+    ``notify`` is called after each step (gunicorn's ``worker.notify`` keeps
+    the worker from being timed out while large models compile). A model that
+    fails to load is reported with an ``error`` and skipped.
+    """
+    from .compiler import registry_stats
+
+    t0 = time.perf_counter()
+    report: Dict[str, Any] = {"imports_ms": import_heavy_modules() * 1e3, "models": []}
+    if notify is not None:
+        notify()
+
+    paths = warm_model_paths(paths)
+    maxsize = registry_stats()["maxsize"]
+    if len(paths) > maxsize:
+        print(f"Warning: {len(paths)} warm-up models exceed the compiled-model registry size ({maxsize}); "
+              f"only the last {maxsize} stay in memory.")
+    for path in paths:
+        try:
+            report["models"].append(_warm_model(path))
+        except Exception as e:
+            print(f"Warning: Could not warm up model '{path}': {e}")
+            report["models"].append({"path": path, "error": str(e)})
+        if notify is not None:
+            notify()
+    report["total_ms"] = (time.perf_counter() - t0) * 1e3
+    return report